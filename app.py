@@ -5,6 +5,7 @@ from dash import dcc, html
 import dash_bootstrap_components as dbc
 
 from src.layout import layout
+from src.api import register_api
 from src.callbacks.dimension_rows import register_dim_row_callbacks
 from src.callbacks.param_display import register_param_display_callback
 from src.callbacks.parse_parameters import register_param_parse_callback
@@ -15,15 +16,28 @@ from src.callbacks.mle_estimation import register_mle_callback
 from src.callbacks.mle_visual_feedback import register_mle_visual_feedback_callback
 from src.callbacks.bayesian_estimation import register_bayesian_callback
 from src.callbacks.bayesian_visual_feedback import register_bayesian_visual_feedback_callback
+from src.callbacks.upload_jobs import register_upload_job_callback
 from src.callbacks.chain_summary import register_chain_summary_callback
 from src.callbacks.view_dim_distribution import register_view_dim_distribution_callback
 from src.callbacks.final_dimension_simulation import register_final_dimension_simulation_callback
+from src.callbacks.tolerance_allocation import register_tolerance_allocation_callback
+from src.stores.global_store import init_session_scope
+from src.utils.metrics import instrument_callbacks
 
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css"], suppress_callback_exceptions=True)
 app.title = "BayesTolSim"
 app.layout = layout
 
+# Dimension data is kept per browser session (or per project, see src/stores/global_store.py)
+init_session_scope(app.server)
+
+# JSON API for scripts and other tools, see docs/user-guide/api.md
+register_api(app.server)
+
+# Latency of every callback registered below, served with the stage metrics at /api/v1/metrics
+instrument_callbacks(app)
+
 
 register_dim_row_callbacks(app)
 register_param_display_callback(app)
@@ -35,9 +49,11 @@ register_mle_callback(app)
 register_mle_visual_feedback_callback(app)
 register_bayesian_callback(app)
 register_bayesian_visual_feedback_callback(app)
+register_upload_job_callback(app)
 register_chain_summary_callback(app)
 register_view_dim_distribution_callback(app)
 register_final_dimension_simulation_callback(app)
+register_tolerance_allocation_callback(app)
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,114 @@
+// assets/final_dimension_hover.js
+
+// Plotly may ship numeric arrays as base64 typed arrays ({dtype, bdata})
+function toNumberArray(values) {
+    if (!values) {
+        return [];
+    }
+    if (Array.isArray(values)) {
+        return values;
+    }
+    if (values.bdata !== undefined) {
+        const types = {
+            f8: Float64Array, f4: Float32Array,
+            i4: Int32Array, u4: Uint32Array,
+            i2: Int16Array, u2: Uint16Array,
+            i1: Int8Array, u1: Uint8Array
+        };
+        const binary = atob(values.bdata);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return Array.from(new (types[values.dtype] || Float64Array)(bytes.buffer));
+    }
+    return Array.from(values);
+}
+
+// Linear interpolation of ys at x, clamped to the end points like np.interp
+function interpolate(x, xs, ys) {
+    if (!xs.length || !ys.length) {
+        return 0;
+    }
+    if (x <= xs[0]) {
+        return ys[0];
+    }
+    if (x >= xs[xs.length - 1]) {
+        return ys[ys.length - 1];
+    }
+    let lo = 0;
+    let hi = xs.length - 1;
+    while (hi - lo > 1) {
+        const mid = (lo + hi) >> 1;
+        if (xs[mid] <= x) {
+            lo = mid;
+        } else {
+            hi = mid;
+        }
+    }
+    const t = (x - xs[lo]) / (xs[hi] - xs[lo]);
+    return ys[lo] + t * (ys[hi] - ys[lo]);
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    final_dimension: {
+        // Shade the area left of the cursor and mark the hovered point, entirely in the browser
+        shade_to_cursor: function(hoverData, figure, simulationData) {
+            if (!hoverData || !hoverData.points || !hoverData.points.length || !figure || !figure.data) {
+                return window.dash_clientside.no_update;
+            }
+
+            const curve = figure.data.find(trace => trace.name === "Final Dimension Distribution");
+            if (!curve) {
+                return window.dash_clientside.no_update;
+            }
+
+            // Prefer the session's stored curve; fall back to the arrays in the figure
+            const source = simulationData || {};
+            const xs = toNumberArray(source.x_data || curve.x);
+            const ys = toNumberArray(source.y_data || curve.y);
+            const cdf = toNumberArray(source.cdf_data || curve.customdata);
+            const hoveredX = Number(hoverData.points[0].x);
+
+            // Fill area from the left edge to the hovered point
+            const xFill = [];
+            const yFill = [];
+            for (let i = 0; i < xs.length && xs[i] <= hoveredX; i++) {
+                xFill.push(xs[i]);
+                yFill.push(ys[i]);
+            }
+
+            const traces = [];
+            if (xFill.length > 0) {
+                traces.push({
+                    type: "scatter",
+                    x: xFill.concat([xFill[xFill.length - 1], xFill[0]]),
+                    y: yFill.concat([0, 0]),
+                    fill: "toself",
+                    fillcolor: "rgba(255, 0, 0, 0.5)",  // Red with 50% transparency
+                    line: {width: 0},
+                    showlegend: false,
+                    hoverinfo: "skip"
+                });
+            }
+
+            traces.push(curve);
+
+            const hoveredY = interpolate(hoveredX, xs, ys);
+            const hoveredCdf = interpolate(hoveredX, xs, cdf);
+            traces.push({
+                type: "scatter",
+                x: [hoveredX],
+                y: [hoveredY],
+                mode: "markers",
+                marker: {size: 10, color: "orange", symbol: "circle", line: {width: 2, color: "white"}},
+                showlegend: false,
+                hovertemplate: "<b>Hovered Point</b><br>Value: " + hoveredX.toFixed(4) +
+                    "<br>Density: " + hoveredY.toFixed(4) +
+                    "<br>CDF: " + hoveredCdf.toFixed(4) + "<extra></extra>"
+            });
+
+            return Object.assign({}, figure, {data: traces});
+        }
+    }
+});
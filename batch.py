@@ -0,0 +1,61 @@
+# batch.py
+
+"""Headless stack-up of many tolerance chains: python batch.py chains/ -o results.csv
+
+Runs the dashboard's prior/MLE/Bayesian parameter logic and final dimension
+engines over chain definition files on a worker pool, writing one result
+row per chain as it completes. Imports neither Dash nor Plotly.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from src.utils.batch_runner import BATCH_ENGINES, iter_batch_results, open_result_writer
+from src.utils.chain_definitions import load_chain_definitions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate tolerance chain definitions without the dashboard")
+    parser.add_argument("definitions", help="chain definition file (.json/.jsonl) or a directory of them")
+    parser.add_argument("-o", "--output", required=True, help="result file (.csv, or .parquet with pyarrow installed)")
+    parser.add_argument("--format", choices=("csv", "parquet"), help="output format (default: from the file extension)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: all CPUs)")
+    parser.add_argument("--engine", choices=BATCH_ENGINES, help="engine for chains that do not set one (default: standard)")
+    parser.add_argument("--samples", type=int, help="samples per chain for chains that do not set them")
+    parser.add_argument("--seed", type=int, help="seed for chains that do not set one")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no per-chain progress lines")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    defaults = {"engine": args.engine, "samples": args.samples, "seed": args.seed}
+    jobs = ((source, base_dir, definition, defaults) for source, base_dir, definition in load_chain_definitions(args.definitions))
+
+    started = time.perf_counter()
+    try:
+        writer = open_result_writer(args.output, args.format)
+    except ImportError as e:
+        print(e, file=sys.stderr)
+        return 2
+    count = failed = 0
+    try:
+        for row in iter_batch_results(jobs, workers=max(1, args.workers)):
+            writer.write(row)
+            count += 1
+            if row["status"] != "ok":
+                failed += 1
+            if not args.quiet:
+                detail = f"cpk={row['cpk']:.3f}" if row["cpk"] is not None else row["error"] or ""
+                print(f"[{count}] {row['chain']}: {row['status']} {detail} ({row['elapsed']:.2f} s)", file=sys.stderr)
+    finally:
+        writer.close()
+
+    print(f"{count} chains, {failed} failed, {time.perf_counter() - started:.1f} s -> {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# benchmark.py
+
+"""Benchmark suite of the simulation, plot, statistics, MLE, Bayesian and CSV hot paths
+
+    python benchmark.py -o results.json                    # quick preset
+    python benchmark.py --preset full -o results.json --compare baseline.json
+
+Every case runs in a fresh worker process, so its peak RSS is its own.
+Results are written as JSON; a results file from an earlier run (for
+example of the main branch) serves as the baseline. Exits with 1 when a
+case regressed beyond the thresholds.
+"""
+
+import argparse
+import json
+import sys
+
+from src.utils.benchmarks import (BENCHMARK_PRESETS, DEFAULT_RSS_THRESHOLD, DEFAULT_TIME_THRESHOLD, benchmark_cases,
+                                  compare_results, environment_info, iter_benchmark_results)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time the app's hot paths on reproducible synthetic chains")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="results file (default: %(default)s)")
+    parser.add_argument("--preset", choices=tuple(BENCHMARK_PRESETS), default="quick",
+                        help="problem sizes (default: %(default)s; full goes up to 300 dimensions and 1e8 samples)")
+    parser.add_argument("--only", nargs="+", metavar="PATTERN", help="run only cases whose name contains one of these")
+    parser.add_argument("--repeat", type=int, default=3, help="timed calls per case; the fastest counts (default: %(default)s)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_TIME_THRESHOLD,
+                        help="relative wall time increase reported as a regression (default: %(default)s)")
+    parser.add_argument("--rss-threshold", type=float, default=DEFAULT_RSS_THRESHOLD,
+                        help="relative peak RSS increase reported as a regression (default: %(default)s)")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    return parser.parse_args(argv)
+
+
+def format_result(result):
+    if "error" in result:
+        return f"{result['name']:<40} ERROR {result['error']}"
+    rss = f"{result['peak_rss_mb']:8.0f} MB" if result["peak_rss_mb"] is not None else "       - MB"
+    return f"{result['name']:<40} {result['wall_time'] * 1e3:11.2f} ms {rss} {result['throughput']:12.4g} {result['unit']}/s"
+
+
+def format_ratio(ratio):
+    return f"{ratio:6.2f}x" if ratio is not None else "     -"
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cases = benchmark_cases(args.preset, args.only)
+    if args.list:
+        for case in cases:
+            print(case["name"])
+        return 0
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = []
+    for result in iter_benchmark_results(cases, repeat=max(1, args.repeat)):
+        results.append(result)
+        print(format_result(result), file=sys.stderr)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment_info(), "preset": args.preset, "repeat": args.repeat, "results": results},
+                  f, indent=2)
+    print(f"{len(results)} cases -> {args.output}", file=sys.stderr)
+
+    failed = any("error" in result for result in results)
+    if baseline is None:
+        return 1 if failed else 0
+
+    rows = compare_results(results, baseline, args.threshold, args.rss_threshold)
+    print(f"\n{'case':<40}   time    rss", file=sys.stderr)
+    for row in rows:
+        flag = f"  REGRESSION ({', '.join(row['regression'])})" if row["regression"] else ""
+        print(f"{row['name']:<40} {format_ratio(row['time_ratio'])} {format_ratio(row['rss_ratio'])}{flag}", file=sys.stderr)
+    regressions = [row for row in rows if row["regression"]]
+    print(f"{len(rows)} cases compared, {len(regressions)} regressed", file=sys.stderr)
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
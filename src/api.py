@@ -0,0 +1,81 @@
+# src/api.py
+
+import time
+from flask import Blueprint, Response, jsonify, request
+from src.utils.api_service import (API_MAX_ITEMS, API_MAX_SAMPLES, API_WORKERS, ApiRequestError, batch_items,
+                                   batch_response, evaluate_stackups, map_items, posterior_result, prior_result)
+from src.utils.batch_runner import BATCH_ENGINES
+from src.utils.metrics import metrics as metrics_registry
+from src.utils.simulation_engine import DIST_CODES
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+
+def respond(results, batched, started):
+    """A batch response, or the single result with status 400 when it failed"""
+    if batched:
+        return jsonify(batch_response(results, started))
+    result = results[0]
+    return jsonify(result), 200 if result.get("status") == "ok" else 400
+
+
+def request_body():
+    body = request.get_json(silent=True)
+    if body is None:
+        raise ApiRequestError("Send a JSON body with Content-Type: application/json")
+    return body
+
+
+@api.errorhandler(ApiRequestError)
+def bad_request(e):
+    return jsonify({"status": "error", "error": str(e)}), 400
+
+
+@api.get("/health")
+def health():
+    return jsonify({
+        "status": "ok",
+        "workers": API_WORKERS,
+        "engines": list(BATCH_ENGINES),
+        "distributions": list(DIST_CODES),
+        "max_items": API_MAX_ITEMS,
+        "max_samples": API_MAX_SAMPLES,
+    })
+
+
+@api.get("/metrics")
+def metrics():
+    """Callback and stage metrics: Prometheus text, or JSON with ?format=json"""
+    if request.args.get("format") == "json":
+        return jsonify(metrics_registry.snapshot())
+    return Response(metrics_registry.prometheus_text(), mimetype="text/plain; version=0.0.4")
+
+
+@api.post("/prior")
+def prior():
+    """Prior from tolerances: one dimension, or {"dimensions": [...]}"""
+    started = time.perf_counter()
+    items, batched = batch_items(request_body(), "dimensions")
+    # Cheap closed-form work; a round trip to the pool would cost more than it saves
+    return respond([prior_result(item) for item in items], batched, started)
+
+
+@api.post("/posterior")
+def posterior():
+    """Posterior from measurement data or summaries: one dimension, or {"dimensions": [...]}"""
+    started = time.perf_counter()
+    items, batched = batch_items(request_body(), "dimensions")
+    return respond(map_items(posterior_result, items), batched, started)
+
+
+@api.post("/stackup")
+def stackup():
+    """Final dimension statistics: one chain definition, or {"chains": [...]}"""
+    started = time.perf_counter()
+    results, batched = evaluate_stackups(request_body())
+    return respond(results, batched, started)
+
+
+def register_api(server):
+    """Serve the JSON API from the Flask server behind the Dash app"""
+    server.register_blueprint(api)
@@ -5,23 +5,22 @@ import pandas as pd
 import numpy as np
 import base64
 import io
-from src.stores.global_store import dimensions_store
+from src.stores.dimension_state import DimensionState
+from src.stores.global_store import current_scope, get_dimension, update_dimension
 from src.utils.bayesian_calculations import (
     calculate_prior_parameters, 
-    bayesian_update_normal,
-    bayesian_update_gamma, 
-    bayesian_update_lognormal,
-    bayesian_update_uniform,
     calculate_likelihood_params,
-    create_prior_from_posterior  # Added this import
+    create_prior_from_posterior,  # Added this import
+    perform_bayesian_update
 )
+from src.utils.jobs import check_cancelled, job_manager
+from src.utils.measurements import match_dimension_column
+from src.utils.metrics import stage
 
 def register_bayesian_callback(app):
     @app.callback(
-        Output({"type": "dim-para1", "index": MATCH}, "value", allow_duplicate=True),
-        Output({"type": "dim-para2", "index": MATCH}, "value", allow_duplicate=True),
-        Output({"type": "dim-bayes-status", "index": MATCH}, "data"),
-        Output({"type": "dim-bayes-error", "index": MATCH}, "data"),
+        Output({"type": "dim-job", "index": MATCH}, "data", allow_duplicate=True),
+        Output({"type": "dim-job-poll", "index": MATCH}, "disabled", allow_duplicate=True),
         Input({"type": "dim-bayes", "index": MATCH}, "contents"),
         State({"type": "dim-bayes", "index": MATCH}, "filename"),
         State({"type": "dim-name", "index": MATCH}, "value"),
@@ -30,180 +29,151 @@ def register_bayesian_callback(app):
         State({"type": "dim-tol-upper", "index": MATCH}, "value"),
         State({"type": "dim-tol-lower", "index": MATCH}, "value"),
         State({"type": "dim-mle-status", "index": MATCH}, "data"),
+        State({"type": "dim-job", "index": MATCH}, "data"),
         prevent_initial_call=True
     )
     def process_bayesian_upload(contents, filename, dim_name, distribution, nominal, 
-                              upper_tol, lower_tol, mle_status):
+                              upper_tol, lower_tol, mle_status, previous_job):
+        # Update in the background; the row's job poll applies the result (see upload_jobs.py)
+        if previous_job:
+            job_manager.cancel(previous_job.get("id"), owner=current_scope())
+        index = callback_context.triggered_id["index"]
+        job = job_manager.submit("bayes", process_bayesian_data, index, contents, filename, dim_name, distribution,
+                                 nominal, upper_tol, lower_tol, mle_status, owner=current_scope())
+        return {"id": job.id, "kind": "bayes"}, False
+
+def process_bayesian_data(index, contents, filename, dim_name, distribution, nominal, upper_tol, lower_tol, mle_status):
+    """Update the dimension with the uploaded CSV; returns (para1, para2, bayes_status, bayes_error)"""
+    
+    # Check if MLE was already applied
+    if mle_status:
+        error_msg = "Error: MLE has already been applied to this dimension. Please remove and re-create the dimension to use Bayesian updating."
+        return "", "", False, error_msg
+        
+    # Check if all required tolerance inputs are provided
+    if nominal is None or upper_tol is None or lower_tol is None:
+        error_msg = "Error: Please provide nominal, upper tolerance, and lower tolerance values before uploading Bayesian data."
+        return "", "", False, error_msg
         
-        # Check if MLE was already applied
-        if mle_status:
-            error_msg = "Error: MLE has already been applied to this dimension. Please remove and re-create the dimension to use Bayesian updating."
+    if contents is None or distribution is None or dim_name is None:
+        return no_update, no_update, no_update, no_update
+        
+    try:
+        # Parse the uploaded file
+        content_type, content_string = contents.split(',')
+        decoded = base64.b64decode(content_string)
+        
+        # Read CSV
+        if filename.endswith('.csv'):
+            with stage("csv_parsing") as record:
+                df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
+                record["samples"] = len(df)
+        else:
+            error_msg = f"Invalid file format: {filename}. Please upload a CSV file."
             return "", "", False, error_msg
             
-        # Check if all required tolerance inputs are provided
-        if nominal is None or upper_tol is None or lower_tol is None:
-            error_msg = "Error: Please provide nominal, upper tolerance, and lower tolerance values before uploading Bayesian data."
+        print(f"CSV loaded successfully. Columns: {list(df.columns)}")
+        print(f"Looking for dimension: '{dim_name}' in distribution: '{distribution}'")
+            
+        # Find the column that matches the dimension name
+        column_name = match_dimension_column(df.columns, dim_name)
+                    
+        if column_name is None:
+            error_msg = f"No matching column found for dimension '{dim_name}' in the uploaded data."
             return "", "", False, error_msg
             
-        if contents is None or distribution is None or dim_name is None:
-            return no_update, no_update, no_update, no_update
+        print(f"Found matching column: '{column_name}'")
             
-        try:
-            # Get the index from the callback context first
-            from dash import callback_context
-            if callback_context.triggered:
-                prop_id = callback_context.triggered[0]['prop_id']
-                if '"index":' in prop_id:
-                    index = prop_id.split('"index":')[1].split(',')[0]
-                else:
-                    index = "0"  # fallback
-            else:
-                index = "0"  # fallback
-                
-            # Parse the uploaded file
-            content_type, content_string = contents.split(',')
-            decoded = base64.b64decode(content_string)
+        # Extract data points
+        data = df[column_name].dropna().values
+        print(f"Data points: {len(data)}, Range: [{np.min(data):.3f}, {np.max(data):.3f}]")
+        
+        if len(data) < 2:
+            error_msg = "Insufficient data points for Bayesian updating. Please provide at least 2 data points."
+            return "", "", False, error_msg
             
-            # Read CSV
-            if filename.endswith('.csv'):
-                df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-            else:
-                error_msg = f"Invalid file format: {filename}. Please upload a CSV file."
-                return "", "", False, error_msg
-                
-            print(f"CSV loaded successfully. Columns: {list(df.columns)}")
-            print(f"Looking for dimension: '{dim_name}' in distribution: '{distribution}'")
-                
-            # Find the column that matches the dimension name
-            column_name = None
-            for col in df.columns:
-                if col.strip().lower() == dim_name.strip().lower():
-                    column_name = col
-                    break
-                    
-            if column_name is None:
-                # If exact match not found, try partial match
-                for col in df.columns:
-                    if dim_name.strip().lower() in col.strip().lower() or col.strip().lower() in dim_name.strip().lower():
-                        column_name = col
-                        break
-                        
-            if column_name is None:
-                error_msg = f"No matching column found for dimension '{dim_name}' in the uploaded data."
-                return "", "", False, error_msg
-                
-            print(f"Found matching column: '{column_name}'")
-                
-            # Extract data points
-            data = df[column_name].dropna().values
-            print(f"Data points: {len(data)}, Range: [{np.min(data):.3f}, {np.max(data):.3f}]")
+        # Calculate prior parameters from tolerances OR use previous posterior
+        dim_key = f"dim_{index}"
+        stored_dim = get_dimension(dim_key) or DimensionState()
+        
+        if stored_dim.bayes_applied:
+            # Sequential update: use previous posterior as new prior
+            previous_para1 = stored_dim.posterior_para1
+            previous_para2 = stored_dim.posterior_para2
+            
+            print(f"Sequential Bayesian Update - Using previous posterior as prior:")
+            print(f"Previous posterior: para1={previous_para1:.6f}, para2={previous_para2:.6f}")
             
-            if len(data) < 2:
-                error_msg = "Insufficient data points for Bayesian updating. Please provide at least 2 data points."
+            # Create prior parameters from previous posterior
+            prior_params = create_prior_from_posterior(distribution, previous_para1, previous_para2)
+            if prior_params is None:
+                error_msg = "Error creating prior from previous posterior."
                 return "", "", False, error_msg
-                
-            # Calculate prior parameters from tolerances OR use previous posterior
-            dim_key = f"dim_{index}"
-            stored_dim = dimensions_store.get(dim_key, {})
+        else:
+            # First-time update: use tolerance-based prior
+            print(f"Debug: Calculating prior for {distribution}, nominal={nominal}, upper_tol={upper_tol}, lower_tol={lower_tol}")
             
-            if stored_dim.get('bayes_applied', False):
-                # Sequential update: use previous posterior as new prior
-                previous_para1 = stored_dim.get('posterior_para1')
-                previous_para2 = stored_dim.get('posterior_para2')
+            try:
+                prior_result = calculate_prior_parameters(distribution, nominal, upper_tol, lower_tol)
+                print(f"Debug: Prior calculation result: {prior_result}")
                 
-                print(f"Sequential Bayesian Update - Using previous posterior as prior:")
-                print(f"Previous posterior: para1={previous_para1:.6f}, para2={previous_para2:.6f}")
-                
-                # Create prior parameters from previous posterior
-                prior_params = create_prior_from_posterior(distribution, previous_para1, previous_para2)
-                if prior_params is None:
-                    error_msg = "Error creating prior from previous posterior."
+                if prior_result is None:
+                    error_msg = "Error: calculate_prior_parameters returned None"
                     return "", "", False, error_msg
-            else:
-                # First-time update: use tolerance-based prior
-                print(f"Debug: Calculating prior for {distribution}, nominal={nominal}, upper_tol={upper_tol}, lower_tol={lower_tol}")
-                
-                try:
-                    prior_result = calculate_prior_parameters(distribution, nominal, upper_tol, lower_tol)
-                    print(f"Debug: Prior calculation result: {prior_result}")
                     
-                    if prior_result is None:
-                        error_msg = "Error: calculate_prior_parameters returned None"
-                        return "", "", False, error_msg
-                        
-                    if not isinstance(prior_result, tuple) or len(prior_result) != 2:
-                        error_msg = f"Error: calculate_prior_parameters returned invalid format: {type(prior_result)}"
-                        return "", "", False, error_msg
-                        
-                    prior_params, error = prior_result
-                    if prior_params is None:
-                        error_msg = f"Error calculating prior parameters: {error or 'Invalid tolerance values'}"
-                        return "", "", False, error_msg
-                        
-                except Exception as e:
-                    error_msg = f"Exception in calculate_prior_parameters: {str(e)}"
+                if not isinstance(prior_result, tuple) or len(prior_result) != 2:
+                    error_msg = f"Error: calculate_prior_parameters returned invalid format: {type(prior_result)}"
                     return "", "", False, error_msg
-                
-            # Perform Bayesian updating
-            para1_post, para2_post = perform_bayesian_update(data, distribution, prior_params)
-            
-            if para1_post is not None and para2_post is not None:
-                # Store additional information for plotting
-                index = callback_context.triggered[0]['prop_id'].split('"index":')[1].split(',')[0]
-                dim_key = f"dim_{index}"
-                
-                # Calculate likelihood parameters for plotting
-                like_para1, like_para2 = calculate_likelihood_params(data, distribution)
-                
-                # Store all parameters in dimensions store
-                if dim_key not in dimensions_store:
-                    dimensions_store[dim_key] = {}
-
-                # Get current iteration count and increment it
-                current_iterations = dimensions_store[dim_key].get('bayes_iterations', 0) + 1
                     
-                dimensions_store[dim_key].update({
-                    'bayes_applied': True,
-                    'bayes_iterations': current_iterations,  
-                    'prior_para1': prior_params.get('mu_prior', prior_params.get('k_prior', prior_params.get('a_prior'))),
-                    'prior_para2': prior_params.get('sigma_prior', prior_params.get('theta_prior', prior_params.get('b_prior'))),
-                    'likelihood_para1': like_para1,
-                    'likelihood_para2': like_para2,
-                    'posterior_para1': para1_post,
-                    'posterior_para2': para2_post,
-                    'prior_params_full': prior_params,
-                    'data': data.tolist()  # Store data for plotting
-                })
-                
-                print(f"Bayesian updating successful: para1={para1_post:.6f}, para2={para2_post:.6f}")
-                return f"{para1_post:.6f}", f"{para2_post:.6f}", True, ""
-            else:
-                error_msg = "Bayesian updating calculation failed. Please check your data and distribution."
+                prior_params, error = prior_result
+                if prior_params is None:
+                    error_msg = f"Error calculating prior parameters: {error or 'Invalid tolerance values'}"
+                    return "", "", False, error_msg
+                    
+            except Exception as e:
+                error_msg = f"Exception in calculate_prior_parameters: {str(e)}"
                 return "", "", False, error_msg
-                
-        except Exception as e:
-            error_msg = f"Error processing Bayesian data: {str(e)}"
-            print(f"Bayesian upload processing error: {e}")
-            import traceback
-            traceback.print_exc()
-            return "", "", False, error_msg
+            
+        # Perform Bayesian updating
+        para1_post, para2_post = perform_bayesian_update(data, distribution, prior_params)
+        
+        if para1_post is not None and para2_post is not None:
+            # Store additional information for plotting
+            dim_key = f"dim_{index}"
+            
+            # Calculate likelihood parameters for plotting
+            like_para1, like_para2 = calculate_likelihood_params(data, distribution)
+            
+            # A cancelled job (e.g. superseded by a newer upload) must not apply its posterior
+            check_cancelled()
 
-def perform_bayesian_update(data, distribution, prior_params):
-    """Perform Bayesian updating based on distribution type"""
-    try:
-        if distribution == "normal":
-            return bayesian_update_normal(data, prior_params)
-        elif distribution == "gamma":
-            return bayesian_update_gamma(data, prior_params)
-        elif distribution == "lognormal":
-            return bayesian_update_lognormal(data, prior_params)
-        elif distribution == "uniform":
-            return bayesian_update_uniform(data, prior_params)
+            # Get current iteration count and increment it
+            current_iterations = (get_dimension(dim_key) or DimensionState()).bayes_iterations + 1
+                
+            # Store all parameters in dimensions store
+            update_dimension(
+                dim_key,
+                bayes_applied=True,
+                bayes_iterations=current_iterations,
+                prior_para1=prior_params.get('mu_prior', prior_params.get('k_prior', prior_params.get('a_prior'))),
+                prior_para2=prior_params.get('sigma_prior', prior_params.get('theta_prior', prior_params.get('b_prior'))),
+                likelihood_para1=like_para1,
+                likelihood_para2=like_para2,
+                posterior_para1=para1_post,
+                posterior_para2=para2_post,
+                prior_params_full=prior_params,
+                bayes_data=data  # Store data for plotting
+            )
+            
+            print(f"Bayesian updating successful: para1={para1_post:.6f}, para2={para2_post:.6f}")
+            return f"{para1_post:.6f}", f"{para2_post:.6f}", True, ""
         else:
-            print(f"Unsupported distribution for Bayesian updating: {distribution}")
-            return None, None
+            error_msg = "Bayesian updating calculation failed. Please check your data and distribution."
+            return "", "", False, error_msg
+            
     except Exception as e:
-        print(f"Error in Bayesian updating for {distribution}: {e}")
+        error_msg = f"Error processing Bayesian data: {str(e)}"
+        print(f"Bayesian upload processing error: {e}")
         import traceback
         traceback.print_exc()
-        return None, None
\ No newline at end of file
+        return "", "", False, error_msg
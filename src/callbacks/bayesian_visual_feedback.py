@@ -2,7 +2,8 @@
 
 from dash import Input, Output, MATCH, html, callback_context
 import dash_bootstrap_components as dbc
-from src.stores.global_store import dimensions_store
+from src.stores.dimension_state import DimensionState
+from src.stores.global_store import get_dimension
 
 def register_bayesian_visual_feedback_callback(app):
     @app.callback(
@@ -25,8 +26,8 @@ def register_bayesian_visual_feedback_callback(app):
             
         # Get iteration count from store
         dim_key = f"dim_{index}"
-        stored_dim = dimensions_store.get(dim_key, {})
-        bayes_iterations = stored_dim.get('bayes_iterations', 0)
+        stored_dim = get_dimension(dim_key) or DimensionState()
+        bayes_iterations = stored_dim.bayes_iterations
         
         # Only show error state if there's an actual error message (not empty string)
         if error_message and error_message.strip():
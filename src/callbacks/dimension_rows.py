@@ -2,7 +2,8 @@
 
 from dash import Input, Output, State, ctx, ALL
 from src.components.dimension_row import generate_dimension_row
-from src.stores.global_store import dimensions_store
+from src.stores.dimension_state import DimensionState
+from src.stores.global_store import get_all_dimensions, remove_dimension, set_dimension, update_dimension
 
 
 def register_dim_row_callbacks(app):
@@ -22,30 +23,26 @@ def register_dim_row_callbacks(app):
 
         if ctx.triggered_id == "add-dim":
             children.append(generate_dimension_row(count))
-            dimensions_store[f"dim_{count}"] = {
-                "name": f"Dim {count}",  
-                "dist": None,
-                "para1": None,
-                "para2": None,
-            }
+            set_dimension(f"dim_{count}", DimensionState(name=f"Dim {count}"))
             count += 1
 
         elif ctx.triggered_id == "remove-dim" and count > 0:
             count -= 1
             children = children[:-1]
-            dimensions_store.pop(f"dim_{count}", None)
+            remove_dimension(f"dim_{count}")
 
         # Update dimension names in store when names change
+        all_dims = get_all_dimensions()
         if names:
             for i, name in enumerate(names):
                 dim_key = f"dim_{i}"
-                if dim_key in dimensions_store and name:
-                    dimensions_store[dim_key]["name"] = name
+                if dim_key in all_dims and name:
+                    all_dims[dim_key] = update_dimension(dim_key, name=name)
 
         # Create dropdown options using actual dimension names
         dropdown_options = []
-        for k in dimensions_store:
-            dim_name = dimensions_store[k]["name"]
+        for k in all_dims:
+            dim_name = all_dims[k].name
             if dim_name:  # Only add if name is not empty
                 dropdown_options.append({"label": dim_name, "value": k})
 
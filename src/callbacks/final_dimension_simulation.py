@@ -1,33 +1,96 @@
 # src/callbacks/final_dimension_simulation.py
 
-from dash import Input, Output, State, ALL, callback_context, html, dcc
+from dash import Input, Output, State, ALL, ClientsideFunction, callback_context, html, dcc, no_update
+from dash.exceptions import PreventUpdate
 import plotly.graph_objects as go
+import dash_bootstrap_components as dbc
 import numpy as np
 import pandas as pd
 from scipy.stats import norm, lognorm, gamma, uniform
-from src.stores.global_store import dimensions_store
+from src.stores.dimension_state import DimensionState
+from src.stores.global_store import current_scope, get_dimension
+from src.utils.simulation_engine import (
+    DEFAULT_CHUNK_SIZE,
+    DIST_CODES,
+    DIST_NAMES,
+    build_chain,
+    chain_moments,
+    draw_dimension,
+    is_valid_parameters,
+    sample_matrix,
+    simulate_chain
+)
+from src.utils.streaming_stats import summarize_chain_stream
+from src.utils.parallel_engine import resolve_worker_count, summarize_chain_parallel
+from src.utils.adaptive_sampling import (
+    DEFAULT_RELATIVE_PRECISION,
+    DEFAULT_TIME_BUDGET,
+    format_adaptive_notes,
+    run_adaptive_chain
+)
+from src.utils.convolution_engine import (
+    convolution_cdf,
+    convolution_quantile,
+    convolve_chain,
+    summarize_convolution
+)
+from src.utils.distributions import distribution_moments
+from src.utils.ecdf import EmpiricalCDF
+from src.utils.incremental_engine import fits_incremental_cache, get_incremental_simulator, incremental_cache_bytes
+from src.utils.importance_sampling import IMPORTANCE_PILOT_SAMPLES, format_rare_event_notes, rare_event_tails
+from src.utils.result_cache import chain_fingerprint, simulation_cache
+from src.utils.qmc_engine import DEFAULT_REPLICATES, QMC_SEQUENCES, format_qmc_notes, run_qmc_replicates
+from src.utils.global_sensitivity import chain_sobol_analysis, format_sobol_notes
+from src.utils.stack_expression import StackExpression
+from src.utils.sensitivity import SENSITIVITY_MAX_SAMPLES, dimension_contributions, variance_contributions
+from src.utils.kde import estimate_density, kde_from_counts
+from src.utils.final_statistics import (format_final_dimension_statistics, format_partial_statistics, numeric_summary,
+                                        summarize_samples)
+from src.utils.jobs import job_manager
+from src.utils.metrics import format_stage_timings, instrumented, record_stages
+import hashlib
+import json
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
 def register_final_dimension_simulation_callback(app):
     
-    # Store simulation data for hover handling
-    app._final_simulation_data = {}
-    
     @app.callback(
         Output("final-dimension-content", "children"),
+        Output("final-simulation-store", "data"),
+        Output("simulation-job", "data"),
+        Output("simulation-job-poll", "disabled"),
         Input("run-simulation-btn", "n_clicks"),
-        Input({"type": "dim-name", "index": ALL}, "value"),
-        Input({"type": "dim-dist", "index": ALL}, "value"),
-        Input({"type": "dim-para1", "index": ALL}, "value"),
-        Input({"type": "dim-para2", "index": ALL}, "value"),
-        Input({"type": "dim-dir", "index": ALL}, "value"),
+        Input("auto-run-timer", "n_intervals"),
+        # Parameter edits only mark the result stale (see update_simulation_status)
+        State({"type": "dim-name", "index": ALL}, "value"),
+        State({"type": "dim-dist", "index": ALL}, "value"),
+        State({"type": "dim-para1", "index": ALL}, "value"),
+        State({"type": "dim-para2", "index": ALL}, "value"),
+        State({"type": "dim-dir", "index": ALL}, "value"),
         State("num-samples-input", "value"),
         State("final-dim-tol-upper", "value"),  # Added final dimension tolerances
         State("final-dim-tol-lower", "value"),  # Added final dimension tolerances
+        State("simulation-seed-input", "value"),
+        State("simulation-float32", "value"),
+        State("simulation-engine", "value"),
+        State("simulation-workers", "value"),
+        State("kde-bandwidth", "value"),
+        State("adaptive-precision-input", "value"),
+        State("adaptive-time-budget-input", "value"),
+        State("stack-expression", "value"),
+        State("simulation-show-timings", "value"),
+        State("simulation-job", "data"),
         prevent_initial_call=True
     )
-    def update_final_dimension_simulation(n_clicks, names, dists, para1s, para2s, dirs, num_samples, final_upper_tol, final_lower_tol):
+    def update_final_dimension_simulation(n_clicks, auto_runs, names, dists, para1s, para2s, dirs, num_samples, final_upper_tol,
+                                          final_lower_tol, seed, float32_options, engine, workers, kde_bandwidth, precision_percent,
+                                          time_budget, stack_expression, timing_options, previous_job):
+        # Restarting the auto-run timer resets n_intervals to 0, which also lands here; only a timer that fired runs
+        if callback_context.triggered_id == "auto-run-timer" and not auto_runs:
+            raise PreventUpdate
+
         # Check if dimensions are properly set
         if not names or all(v in [None, "", []] for v in names):
             return [
@@ -44,10 +107,10 @@ def register_final_dimension_simulation_callback(app):
                         "justifyContent": "center"
                     }
                 )
-            ]
+            ], None, None, True
         
-        # Check if simulation button was clicked
-        if not n_clicks:
+        # Check if simulation button was clicked (or the auto-run delay elapsed)
+        if not n_clicks and not auto_runs:
             return [
                 html.Div(
                     "Click 'Run Simulation' to generate final dimension distribution.",
@@ -62,7 +125,7 @@ def register_final_dimension_simulation_callback(app):
                         "justifyContent": "center"
                     }
                 )
-            ]
+            ], None, None, True
         
         # Validate number of samples
         if num_samples is None or num_samples <= 0:
@@ -80,51 +143,44 @@ def register_final_dimension_simulation_callback(app):
                         "justifyContent": "center"
                     }
                 )
-            ]
+            ], None, None, True
         
         try:
             # Run Monte Carlo simulation
-            final_samples = run_monte_carlo_simulation(names, dists, para1s, para2s, dirs, num_samples)
-            
-            if final_samples is None:
-                return [
-                    html.Div(
-                        "Error: Unable to run simulation. Please check dimension parameters.",
-                        style={
-                            "textAlign": "center",
-                            "color": "red",
-                            "fontSize": "14px",
-                            "padding": "100px 20px",
-                            "height": "300px",
-                            "display": "flex",
-                            "alignItems": "center",
-                            "justifyContent": "center"
-                        }
-                    )
-                ]
-            
-            # Create plot and statistics
-            fig, x_data, y_data, cdf_data = create_final_dimension_plot_with_data(final_samples)
-            stats_text = calculate_final_dimension_statistics(final_samples, num_samples, final_upper_tol, final_lower_tol, names, dirs)
-            
-            # Store data for hover handling
-            app._final_simulation_data = {
-                'x_data': x_data,
-                'y_data': y_data,
-                'cdf_data': cdf_data
-            }
-            
-            return [
-                dcc.Graph(
-                    id="final-dimension-plot",
-                    figure=fig,
-                    style={"height": "400px"}
-                ),
-                html.Pre(
-                    stats_text,
-                    style={"whiteSpace": "pre-wrap", "fontSize": "0.9rem", "marginTop": "10px"}
-                )
-            ]
+            use_float32 = "float32" in (float32_options or [])
+            engine = engine or "standard"
+            stack_expression = (stack_expression or "").strip() or None
+            if stack_expression:
+                # Surface expression errors here rather than as a generic engine failure
+                build_simulation_chain(names, dists, para1s, para2s, dirs, stack_expression)
+
+            cache_key = simulation_cache_key(names, dists, para1s, para2s, dirs, num_samples, final_upper_tol, final_lower_tol,
+                                             seed, use_float32, engine, workers, kde_bandwidth, precision_percent, time_budget,
+                                             expression=stack_expression)
+            cached = simulation_cache.get(cache_key) if cache_key is not None else None
+
+            signature = chain_input_signature(names, dists, para1s, para2s, dirs, final_upper_tol, final_lower_tol,
+                                              stack_expression)
+
+            if cached is not None:
+                x_data, y_data, cdf_data = cached["x_data"], cached["y_data"], cached["cdf_data"]
+                fig = build_final_dimension_figure(x_data, y_data, cdf_data)
+                stats_text = cached["stats_text"] + "\nResult served from cache"
+                simulation_data = simulation_store_data(x_data, y_data, cdf_data, stats_text, cache_key, signature,
+                                                        cached["summary"])
+                return create_simulation_content(fig, cached.get("contributions"), stats_text), simulation_data, None, True
+
+            # Run in the background so this worker stays free; poll_simulation_job shows progress and the result
+            if previous_job:
+                job_manager.cancel(previous_job.get("id"), owner=current_scope())
+            job = job_manager.submit(
+                "simulation", run_simulation_job, cache_key, signature,
+                names, dists, para1s, para2s, dirs, num_samples, final_upper_tol, final_lower_tol,
+                seed=seed, use_float32=use_float32, engine=engine, workers=workers, kde_bandwidth=kde_bandwidth,
+                precision_percent=precision_percent, time_budget=time_budget, expression=stack_expression,
+                show_timings="timings" in (timing_options or []), owner=current_scope()
+            )
+            return create_progress_content(job.snapshot()), no_update, {"id": job.id}, False
             
         except Exception as e:
             return [
@@ -141,450 +197,837 @@ def register_final_dimension_simulation_callback(app):
                         "justifyContent": "center"
                     }
                 )
-            ]
+            ], None, None, True
+
+    @app.callback(
+        Output("simulation-status", "children"),
+        Output("auto-run-timer", "disabled"),
+        Output("auto-run-timer", "interval"),
+        Output("auto-run-timer", "n_intervals"),
+        Input({"type": "dim-name", "index": ALL}, "value"),
+        Input({"type": "dim-dist", "index": ALL}, "value"),
+        Input({"type": "dim-para1", "index": ALL}, "value"),
+        Input({"type": "dim-para2", "index": ALL}, "value"),
+        Input({"type": "dim-dir", "index": ALL}, "value"),
+        Input("final-dim-tol-upper", "value"),
+        Input("final-dim-tol-lower", "value"),
+        Input("stack-expression", "value"),
+        Input("final-simulation-store", "data"),
+        State("auto-run-delay", "value"),
+        prevent_initial_call=True
+    )
+    def update_simulation_status(names, dists, para1s, para2s, dirs, final_upper_tol, final_lower_tol, stack_expression,
+                                 simulation_data, auto_run_delay):
+        """Cheap work on every edit: mark the result stale and show an analytic preview"""
+        stack_expression = (stack_expression or "").strip() or None
+        try:
+            chain = build_simulation_chain(names, dists, para1s, para2s, dirs, stack_expression) if names else None
+        except ValueError as e:
+            return html.Span(str(e), style={"color": "red"}), True, no_update, no_update
+        if chain is None:
+            return "", True, no_update, no_update
+
+        preview = analytic_preview_text(chain, final_upper_tol, final_lower_tol, names, dirs)
+        signature = chain_input_signature(names, dists, para1s, para2s, dirs, final_upper_tol, final_lower_tol, stack_expression)
+
+        if simulation_data and simulation_data.get("signature") == signature:
+            return html.Span(f"Results up to date. {preview}", style={"color": "gray"}), True, no_update, no_update
+
+        status = html.Span(f"Results out of date - press Run Simulation. {preview}", style={"color": "#e67e22"})
+        if auto_run_delay:
+            # Restart the one-shot timer; every further edit pushes the run back again. The reset to 0 also
+            # reaches update_final_dimension_simulation, which ignores it until the timer actually fires
+            return status, False, int(float(auto_run_delay) * 1000), 0
+        return status, True, no_update, no_update
 
     @app.callback(
+        Output("final-dimension-content", "children", allow_duplicate=True),
+        Output("final-simulation-store", "data", allow_duplicate=True),
+        Output("simulation-job", "data", allow_duplicate=True),
+        Output("simulation-job-poll", "disabled", allow_duplicate=True),
+        Input("simulation-job-poll", "n_intervals"),
+        State("simulation-job", "data"),
+        prevent_initial_call=True
+    )
+    def poll_simulation_job(n_intervals, job_data):
+        """Show a running job's progress and partial statistics, then its result"""
+        job = job_manager.get((job_data or {}).get("id"), owner=current_scope())
+        if job is None:
+            return create_message_content("Simulation job not found (expired or server restarted). Please run again.",
+                                          "red"), no_update, None, True
+        if not job.done:
+            return create_progress_content(job.snapshot()), no_update, no_update, no_update
+
+        if job.state == "cancelled":
+            return create_message_content("Simulation cancelled."), no_update, None, True
+        if job.state == "failed":
+            return create_message_content(f"Simulation Error: {job.error}", "red"), no_update, None, True
+        if job.result is None:
+            return create_message_content("Error: Unable to run simulation. Please check dimension parameters.",
+                                          "red"), no_update, None, True
+
+        result = job.result
+        return create_simulation_content(result["figure"], result["contributions"], result["data"]["stats_text"]), \
+            result["data"], None, True
+
+    @app.callback(
+        Input("cancel-simulation-btn", "n_clicks"),
+        State("simulation-job", "data"),
+        prevent_initial_call=True
+    )
+    def cancel_simulation_job(n_clicks, job_data):
+        # The job stops at its next progress check; the poll then reports the cancellation
+        if job_data:
+            job_manager.cancel(job_data.get("id"), owner=current_scope())
+
+    # Hover shading runs in the browser (assets/final_dimension_hover.js) on the
+    # session's stored curve, so mouse moves never reach the server
+    app.clientside_callback(
+        ClientsideFunction(namespace="final_dimension", function_name="shade_to_cursor"),
         Output("final-dimension-plot", "figure"),
         Input("final-dimension-plot", "hoverData"),
+        State("final-dimension-plot", "figure"),
+        State("final-simulation-store", "data"),
         prevent_initial_call=True
     )
-    def handle_plot_hover(hover_data):
-        """Handle hover on the final dimension plot"""
-        if not hover_data or not hasattr(app, '_final_simulation_data'):
-            return go.Figure()  # Return empty figure if no data
-            
-        try:
-            # Get stored simulation data
-            stored_data = app._final_simulation_data
-            x_data = np.array(stored_data['x_data'])
-            y_data = np.array(stored_data['y_data'])
-            cdf_data = stored_data['cdf_data']
-            
-            # Get hovered point
-            hovered_x = float(hover_data['points'][0]['x'])
-            
-            # Find indices for fill area (from left edge to hovered point)
-            fill_indices = x_data <= hovered_x
-            x_fill = x_data[fill_indices]
-            y_fill = y_data[fill_indices]
-            
-            # Create new figure
-            fig = go.Figure()
-            
-            # Add red fill area under the curve
-            if len(x_fill) > 0:
-                fig.add_trace(go.Scatter(
-                    x=np.concatenate([x_fill, [x_fill[-1]], [x_fill[0]]]),
-                    y=np.concatenate([y_fill, [0], [0]]),
-                    fill="toself",
-                    fillcolor="rgba(255, 0, 0, 0.5)",  # Red with 50% transparency
-                    line=dict(width=0),
-                    showlegend=False,
-                    hoverinfo="skip"
-                ))
-            
-            # Add main purple curve
-            fig.add_trace(go.Scatter(
-                x=x_data,
-                y=y_data,
-                mode="lines",
-                name="Final Dimension Distribution",
-                line=dict(width=3, color="purple"),
-                hovertemplate="<b>Value:</b> %{x:.4f}<br><b>Density:</b> %{y:.4f}<br><b>CDF:</b> %{customdata:.4f}<extra></extra>",
-                customdata=cdf_data
-            ))
-            
-            # Add hover point marker
-            hovered_y = np.interp(hovered_x, x_data, y_data)
-            hovered_cdf = np.interp(hovered_x, x_data, cdf_data) if cdf_data else 0
-            
-            fig.add_trace(go.Scatter(
-                x=[hovered_x],
-                y=[hovered_y],
-                mode="markers",
-                marker=dict(size=10, color="orange", symbol="circle", line=dict(width=2, color="white")),
-                showlegend=False,
-                hovertemplate=f"<b>Hovered Point</b><br>Value: {hovered_x:.4f}<br>Density: {hovered_y:.4f}<br>CDF: {hovered_cdf:.4f}<extra></extra>"
-            ))
-            
-            # Update layout
-            fig.update_layout(
-                title="Monte Carlo Simulation - Final Dimension Distribution",
-                margin=dict(l=40, r=20, t=60, b=40),
-                xaxis_title="Final Dimension Value",
-                yaxis_title="Probability Density",
-                height=400,
-                plot_bgcolor="white",
-                paper_bgcolor="white",
-                font=dict(size=12),
-                title_font_size=14,
-                showlegend=False
-            )
-            
-            # Add grid lines
-            fig.update_xaxes(
-                showgrid=True, 
-                gridwidth=0.8, 
-                gridcolor='rgba(180,180,180,0.4)',
-                zeroline=True,
-                zerolinewidth=1,
-                zerolinecolor='rgba(100,100,100,0.6)'
-            )
-            fig.update_yaxes(
-                showgrid=True, 
-                gridwidth=0.8, 
-                gridcolor='rgba(180,180,180,0.4)',
-                zeroline=True,
-                zerolinewidth=1,
-                zerolinecolor='rgba(100,100,100,0.6)'
-            )
-            
-            return fig
-            
-        except Exception as e:
-            print(f"Hover handler error: {e}")
-            import traceback
-            traceback.print_exc()
-            # Return original plot without hover effects
-            return create_original_plot_from_stored_data(app._final_simulation_data)
-
-def run_monte_carlo_simulation(names, dists, para1s, para2s, dirs, num_samples):
-    """Run Monte Carlo simulation for final dimension chain"""
-    try:
-        # Generate samples for each dimension
-        all_samples = []
-        
-        for i in range(len(names)):
-            if names[i] is None or dists[i] is None or para1s[i] is None or para2s[i] is None:
-                continue
-                
-            # Get parameters from dimensions store or use input values
-            dim_key = f"dim_{i}"
-            dim_data = dimensions_store.get(dim_key, {})
-            
-            # Use posterior parameters if Bayesian was applied, else use current parameters
-            if dim_data.get("bayes_applied", False):
-                para1 = dim_data.get("posterior_para1", para1s[i])
-                para2 = dim_data.get("posterior_para2", para2s[i])
-            elif dim_data.get("mle_applied", False):
-                para1 = dim_data.get("mle_para1", para1s[i])
-                para2 = dim_data.get("mle_para2", para2s[i])
+
+def compute_final_dimension_result(names, dists, para1s, para2s, dirs, num_samples, final_upper_tol, final_lower_tol,
+                                   seed=None, use_float32=False, engine="standard", workers=None, kde_bandwidth="silverman",
+                                   precision_percent=None, time_budget=None, expression=None):
+    """Run the selected engine and build the plot data and statistics text
+
+    Returns (figure, x_data, y_data, cdf_data, stats_text, contributions,
+    summary), or None when the chain cannot be simulated. x_data/y_data are
+    the density (KDE) grid, cdf_data the ECDF on that grid and summary the
+    numeric statistics behind stats_text, plus the spec limits.
+    """
+    if engine == "convolution" and expression:
+        raise ValueError("The convolution engine needs a linear stack; clear the stack expression or pick a sampling engine")
+
+    contributions = None
+    if engine == "convolution":
+        spec_limits, spec_message = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+        simulation_result = run_convolution_stackup(names, dists, para1s, para2s, dirs, expression=expression)
+        # Analytic shares: drawing a sample matrix would add noise and most of the run time to this engine
+        contributions = run_variance_contributions(names, dists, para1s, para2s, dirs)
+    elif engine == "adaptive":
+        spec_limits, spec_message = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+        relative_precision = (precision_percent or DEFAULT_RELATIVE_PRECISION * 100) / 100
+        simulation_result = run_adaptive_simulation(names, dists, para1s, para2s, dirs, num_samples, relative_precision,
+                                                    time_budget or DEFAULT_TIME_BUDGET, spec_limits,
+                                                    seed=seed, use_float32=use_float32, expression=expression)
+    elif engine in QMC_SEQUENCES:
+        spec_limits, _ = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+        simulation_result = run_qmc_simulation(names, dists, para1s, para2s, dirs, num_samples, engine, spec_limits, seed=seed,
+                                               expression=expression)
+    elif engine == "sensitivity":
+        simulation_result = run_sensitivity_analysis(names, dists, para1s, para2s, dirs, num_samples, seed=seed,
+                                                     expression=expression)
+    elif engine in ("streaming", "parallel", "importance"):
+        spec_limits, spec_message = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+        if engine == "importance":
+            # The plot and central statistics only need a pilot run; the tails get their own budget below
+            num_samples = min(num_samples, IMPORTANCE_PILOT_SAMPLES)
+        simulation_result = run_streaming_simulation(names, dists, para1s, para2s, dirs, num_samples, spec_limits,
+                                                     seed=seed, use_float32=use_float32,
+                                                     workers=resolve_worker_count(workers) if engine == "parallel" else None,
+                                                     expression=expression)
+    else:
+        simulation_result = run_monte_carlo_simulation(names, dists, para1s, para2s, dirs, num_samples,
+                                                       seed=seed, use_float32=use_float32, return_vectors=True,
+                                                       expression=expression)
+        if simulation_result is not None:
+            simulation_result, vectors, chain_names = simulation_result
+            if vectors is not None:
+                # Same draws as the plot: the kept per-dimension vectors and their (not yet sorted) sum,
+                # subsampled so the report stays cheap next to the sampling
+                spec_limits, _ = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+                contributions = dimension_contributions(vectors, simulation_result, chain_names, spec_limits,
+                                                        max_samples=SENSITIVITY_MAX_SAMPLES)
+
+    if simulation_result is None:
+        return None
+
+    if contributions is None:
+        report_limits, _ = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+        contributions = run_contribution_analysis(names, dists, para1s, para2s, dirs, num_samples, report_limits, seed=seed,
+                                                  expression=expression)
+
+    if engine == "sensitivity" and contributions is not None:
+        attach_sobol_indices(contributions, simulation_result[1])
+
+    # Create plot and statistics
+    if engine == "convolution":
+        summary = summarize_convolution(simulation_result, spec_limits)
+        fig, x_data, y_data, cdf_data = create_final_dimension_plot_from_convolution(simulation_result)
+        notes = [f"Engine: Numerical convolution ({len(simulation_result['x']):,} grid points, no sampling noise)"]
+        stats_text = format_final_dimension_statistics(summary, None, spec_limits, spec_message, notes=notes,
+                                                       title="STACK-UP CONVOLUTION RESULTS")
+    elif engine == "adaptive":
+        stream = simulation_result.stream
+        summary = stream.summary()
+        fig, x_data, y_data, cdf_data = create_final_dimension_plot_from_histogram(
+            stream.hist_counts, stream.hist_edges, summary["min"], summary["max"], kde_bandwidth=kde_bandwidth)
+        notes = format_adaptive_notes(simulation_result, relative_precision)
+        stats_text = format_final_dimension_statistics(summary, simulation_result.samples_used, spec_limits, spec_message,
+                                                       notes=notes)
+    elif engine in ("streaming", "parallel", "importance"):
+        stream = simulation_result
+        summary = stream.summary()
+        fig, x_data, y_data, cdf_data = create_final_dimension_plot_from_histogram(
+            stream.hist_counts, stream.hist_edges, summary["min"], summary["max"], kde_bandwidth=kde_bandwidth)
+        if engine == "importance":
+            tails = run_rare_event_tails(names, dists, para1s, para2s, dirs, spec_limits, seed=seed,
+                                         expression=expression)
+            if tails is not None:
+                # The reweighted estimates replace the plain (often zero) tail counts
+                summary["cdf_at_lsl"] = tails["cdf_at_lsl"]["probability"]
+                summary["cdf_right_of_usl"] = tails["cdf_right_of_usl"]["probability"]
+                notes = format_rare_event_notes(tails)
             else:
-                para1 = para1s[i]
-                para2 = para2s[i]
-            
-            # Convert to float if needed
-            try:
-                para1 = float(para1)
-                para2 = float(para2)
-            except:
-                continue
-            
-            # Generate samples based on distribution
-            samples = generate_distribution_samples(dists[i], para1, para2, num_samples)
-            if samples is None:
-                continue
-                
-            # Apply direction (+ or -)
-            direction = dirs[i] if i < len(dirs) else "+"
-            if direction == "-":
-                samples = -samples
-                
-            all_samples.append(samples)
-        
-        if not all_samples:
+                notes = ["Rare-event tails need both final dimension tolerances; showing plain sampling counts"]
+        elif engine == "parallel":
+            notes = [f"Engine: Parallel ({resolve_worker_count(workers)} worker processes, percentiles from quantile sketch)"]
+        else:
+            notes = [f"Engine: Streaming ({DEFAULT_CHUNK_SIZE:,}-sample chunks, percentiles from quantile sketch)"]
+        stats_text = format_final_dimension_statistics(summary, num_samples, spec_limits, spec_message, notes=notes)
+    else:
+        notes = None
+        if engine in QMC_SEQUENCES:
+            final_samples, std_errors = simulation_result
+            notes = format_qmc_notes(engine, DEFAULT_REPLICATES, final_samples.size // DEFAULT_REPLICATES, std_errors)
+        elif engine == "sensitivity":
+            final_samples, indices = simulation_result
+            notes = format_sobol_notes(indices, len(indices["first"]))
+        else:
+            final_samples = simulation_result
+        # Sort once (in place) and share the ECDF between plot and statistics
+        ecdf = EmpiricalCDF(final_samples, copy=False)
+        fig, x_data, y_data, cdf_data = create_final_dimension_plot_with_data(final_samples, ecdf=ecdf, kde_bandwidth=kde_bandwidth)
+        spec_limits, spec_message = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+        summary = summarize_samples(final_samples, spec_limits, ecdf=ecdf)
+        stats_text = format_final_dimension_statistics(summary, final_samples.size, spec_limits, spec_message, notes=notes)
+
+    summary = numeric_summary(summary)
+    summary["spec_limits"] = [float(limit) for limit in spec_limits] if spec_limits is not None else None
+    return fig, x_data, y_data, cdf_data, stats_text, contributions, summary
+
+def run_simulation_job(cache_key, signature, *args, show_timings=False, **kwargs):
+    """Background job body: compute a run, cache it and return what the poll callback renders
+
+    With show_timings, the statistics text ends with the run's per-stage
+    timing breakdown; the cached text does not, since a cache hit skips
+    those stages.
+    """
+    started = time.perf_counter()
+    with record_stages() as stages:
+        result = compute_final_dimension_result(*args, **kwargs)
+    if result is None:
+        return None
+
+    fig, x_data, y_data, cdf_data, stats_text, contributions, summary = result
+    if cache_key is not None:
+        simulation_cache.set(cache_key, {
+            "x_data": x_data,
+            "y_data": y_data,
+            "cdf_data": cdf_data,
+            "summary": summary,
+            "stats_text": stats_text,
+            "contributions": contributions
+        })
+    if show_timings:
+        stats_text += "\n" + format_stage_timings(stages, time.perf_counter() - started)
+    return {
+        "figure": fig,
+        "contributions": contributions,
+        "data": simulation_store_data(x_data, y_data, cdf_data, stats_text, cache_key, signature, summary)
+    }
+
+def simulation_store_data(x_data, y_data, cdf_data, stats_text, cache_key, signature, summary=None):
+    """Per-session result state; it lives in the browser, not on the app object"""
+    return {
+        "x_data": x_data,
+        "y_data": y_data,
+        "cdf_data": cdf_data,
+        "summary": summary,
+        "stats_text": stats_text,
+        "cache_key": cache_key,
+        "signature": signature
+    }
+
+def resolve_effective_parameters(index, para1, para2):
+    """Pick posterior, MLE or entered parameters for a dimension, in that order"""
+    dim_data = get_dimension(f"dim_{index}") or DimensionState()
+
+    # Use posterior parameters if Bayesian was applied, else use current parameters
+    if dim_data.bayes_applied:
+        return dim_data.posterior_para1, dim_data.posterior_para2
+    elif dim_data.mle_applied:
+        return dim_data.mle_para1, dim_data.mle_para2
+    return para1, para2
+
+def build_simulation_chain(names, dists, para1s, para2s, dirs, expression=None):
+    """Build the compact chain description used by the simulation engine
+
+    A non-blank stack expression is compiled over the kept dimensions' names
+    and replaces the signed sum; invalid expressions raise ValueError.
+    """
+    chain_dists, chain_para1s, chain_para2s, chain_dirs, chain_names = [], [], [], [], []
+
+    for i in range(len(names)):
+        if names[i] is None or dists[i] is None or para1s[i] is None or para2s[i] is None:
+            continue
+
+        para1, para2 = resolve_effective_parameters(i, para1s[i], para2s[i])
+        chain_dists.append(dists[i])
+        chain_para1s.append(para1)
+        chain_para2s.append(para2)
+        chain_dirs.append(dirs[i] if i < len(dirs) else "+")
+        chain_names.append(names[i])
+
+    chain = build_chain(chain_dists, chain_para1s, chain_para2s, chain_dirs, names=chain_names)
+    if chain is not None and expression and str(expression).strip():
+        chain["expression"] = StackExpression(expression, chain["names"])
+    return chain
+
+def chain_input_signature(names, dists, para1s, para2s, dirs, final_upper_tol, final_lower_tol, expression=None):
+    """Hash of the chain inputs, used to tell whether the shown result is stale"""
+    payload = json.dumps([names, dists, para1s, para2s, dirs, final_upper_tol, final_lower_tol, expression or ""], default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def analytic_preview_text(chain, final_upper_tol, final_lower_tol, names, dirs):
+    """Mean and RSS standard deviation of the chain, plus Cpk under a normal approximation"""
+    if chain.get("expression") is not None:
+        return "Analytic preview not available for stack expressions."
+    mean, std = chain_moments(chain)
+    text = f"Analytic preview: mean = {mean:.4f}, RSS std = {std:.4f}"
+
+    spec_limits, _ = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs)
+    if spec_limits is not None and std > 0:
+        LSL, USL = spec_limits
+        text += f", Cpk ~ {min(USL - mean, mean - LSL) / (3 * std):.3f} (normal approx.)"
+    return text
+
+def simulation_cache_key(names, dists, para1s, para2s, dirs, num_samples, final_upper_tol, final_lower_tol, seed, use_float32,
+                         engine, workers, kde_bandwidth, precision_percent, time_budget, expression=None):
+    """Cache key of a run, or None when the run is not reproducible (no seed)
+
+    The key covers the effective (prior/MLE/posterior) parameters actually
+    simulated and the spec limits they are judged against.
+    """
+    if seed is None and engine != "convolution":
+        return None
+
+    chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+    if chain is None:
+        return None
+
+    spec_limits, _ = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+    settings = {
+        "expression": chain["expression"].text if chain.get("expression") is not None else None,
+        "engine": engine,
+        "num_samples": None if engine == "convolution" else num_samples,
+        "seed": None if engine == "convolution" else seed,
+        "spec_limits": spec_limits,
+        "use_float32": use_float32,
+        "kde_bandwidth": kde_bandwidth,
+    }
+    if engine == "parallel":
+        settings["workers"] = resolve_worker_count(workers)
+    if engine == "adaptive":
+        settings["precision_percent"] = precision_percent
+        settings["time_budget"] = time_budget
+    return chain_fingerprint(chain, **settings)
+
+def run_monte_carlo_simulation(names, dists, para1s, para2s, dirs, num_samples, seed=None, use_float32=False,
+                               return_vectors=False, expression=None):
+    """Run Monte Carlo simulation for final dimension chain
+
+    With return_vectors, returns (final_samples, vectors, names) where vectors are
+    the per-dimension signed samples when the incremental simulator kept them, else None.
+    Stack expressions always take the chunked path of simulate_chain.
+    """
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None:
             return None
-            
-        # Sum all dimension samples to get final dimension
-        final_samples = np.sum(all_samples, axis=0)
-        return final_samples
-        
+
+        # Redraw only the dimensions that changed since this session's last run
+        if chain.get("expression") is None and fits_incremental_cache(len(chain["codes"]), num_samples, use_float32):
+            simulator = get_incremental_simulator(
+                current_scope(), incremental_cache_bytes(len(chain["codes"]), num_samples, use_float32))
+            result = simulator.simulate(chain, num_samples, seed=seed, use_float32=use_float32, return_vectors=return_vectors)
+            return result + (chain["names"],) if return_vectors else result
+
+        # Sum all dimension samples in place to get final dimension
+        final_samples = simulate_chain(chain, num_samples, seed=seed, use_float32=use_float32)
+        return (final_samples, None, chain["names"]) if return_vectors else final_samples
+
     except Exception as e:
         print(f"Monte Carlo simulation error: {e}")
         return None
 
-def generate_distribution_samples(dist_type, para1, para2, num_samples):
+def run_contribution_analysis(names, dists, para1s, para2s, dirs, num_samples, spec_limits=None, seed=None, expression=None):
+    """Contribution report from a separate sample matrix, for engines that keep no per-dimension samples"""
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None:
+            return None
+
+        # Same per-dimension streams as simulate_chain, capped to bound the matrix size
+        expression = chain.get("expression")
+        matrix = sample_matrix(chain, min(int(num_samples), SENSITIVITY_MAX_SAMPLES), seed=seed, signed=expression is None)
+        if expression is not None:
+            # Stack expressions take the samples as drawn; shares become squared correlations
+            return dimension_contributions(matrix, expression.evaluate(matrix), chain["names"], spec_limits, additive=False)
+        return dimension_contributions(matrix, matrix.sum(axis=0), chain["names"], spec_limits)
+
+    except Exception as e:
+        print(f"Contribution analysis error: {e}")
+        return None
+
+def run_variance_contributions(names, dists, para1s, para2s, dirs):
+    """Contribution report of a linear stack from the analytic dimension variances"""
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs)
+        if chain is None:
+            return None
+
+        variances = [distribution_moments(DIST_NAMES[int(code)], para1, para2)[1]
+                     for code, para1, para2 in zip(chain["codes"], chain["para1"], chain["para2"])]
+        return variance_contributions(variances, chain["names"])
+
+    except Exception as e:
+        print(f"Contribution analysis error: {e}")
+        return None
+
+def run_sensitivity_analysis(names, dists, para1s, para2s, dirs, num_samples, seed=None, expression=None):
+    """Final dimension samples and Sobol indices from one pair of sample matrices"""
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None:
+            return None
+
+        return chain_sobol_analysis(chain, num_samples, seed=seed)
+
+    except Exception as e:
+        print(f"Sensitivity analysis error: {e}")
+        return None
+
+def attach_sobol_indices(contributions, indices):
+    """Add first/total-order indices and their CIs to the contribution rows"""
+    for row in contributions["rows"]:
+        k = row["position"]
+        row["first"] = float(indices["first"][k])
+        row["total"] = float(indices["total"][k])
+        if indices["first_ci"] is not None:
+            row["first_ci"] = [float(v) for v in indices["first_ci"][:, k]]
+            row["total_ci"] = [float(v) for v in indices["total_ci"][:, k]]
+    # Rank by total-order index, which also covers interaction effects
+    contributions["rows"].sort(key=lambda row: row["total"], reverse=True)
+    return contributions
+
+def run_streaming_simulation(names, dists, para1s, para2s, dirs, num_samples, spec_limits=None, seed=None, use_float32=False,
+                             workers=None, expression=None):
+    """Run the chain in fixed-size chunks and return its streaming statistics
+
+    With ``workers`` set, the sample count is sharded across a process pool.
+    """
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None:
+            return None
+
+        if workers is not None:
+            return summarize_chain_parallel(chain, num_samples, workers=workers, seed=seed,
+                                            spec_limits=spec_limits, use_float32=use_float32)
+        return summarize_chain_stream(chain, num_samples, seed=seed, spec_limits=spec_limits, use_float32=use_float32)
+
+    except Exception as e:
+        print(f"Streaming simulation error: {e}")
+        return None
+
+def run_adaptive_simulation(names, dists, para1s, para2s, dirs, max_samples, relative_precision, time_budget,
+                            spec_limits=None, seed=None, use_float32=False, expression=None):
+    """Draw batches until the statistics reach the target precision or a budget runs out"""
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None:
+            return None
+
+        return run_adaptive_chain(chain, max_samples, relative_precision=relative_precision, time_budget=time_budget,
+                                  seed=seed, spec_limits=spec_limits, use_float32=use_float32)
+
+    except Exception as e:
+        print(f"Adaptive simulation error: {e}")
+        return None
+
+def run_qmc_simulation(names, dists, para1s, para2s, dirs, num_samples, sequence, spec_limits=None, seed=None, expression=None):
+    """Randomized quasi-Monte Carlo run: pooled samples and replicate standard errors"""
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None:
+            return None
+
+        return run_qmc_replicates(chain, num_samples, sequence=sequence, seed=seed, spec_limits=spec_limits)
+
+    except Exception as e:
+        print(f"QMC simulation error: {e}")
+        return None
+
+def run_rare_event_tails(names, dists, para1s, para2s, dirs, spec_limits, seed=None, expression=None):
+    """Importance-sampling estimates of both out-of-spec fractions, with IMPORTANCE_SAMPLES draws per tail"""
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None or spec_limits is None:
+            return None
+
+        return rare_event_tails(chain, spec_limits, seed=seed)
+
+    except Exception as e:
+        print(f"Rare-event estimation error: {e}")
+        return None
+
+def run_convolution_stackup(names, dists, para1s, para2s, dirs, expression=None):
+    """Sampling-free stack-up by FFT convolution of the component PDFs"""
+    try:
+        chain = build_simulation_chain(names, dists, para1s, para2s, dirs, expression)
+        if chain is None:
+            return None
+
+        return convolve_chain(chain)
+
+    except Exception as e:
+        print(f"Convolution stack-up error: {e}")
+        return None
+
+def generate_distribution_samples(dist_type, para1, para2, num_samples, rng=None):
     """Generate samples from specified distribution"""
     try:
-        if dist_type == "normal":
-            if para2 <= 0:
-                return None
-            return np.random.normal(para1, para2, num_samples)
-            
-        elif dist_type == "lognormal":
-            if para2 <= 0:
-                return None
-            return np.random.lognormal(para1, para2, num_samples)
-            
-        elif dist_type == "gamma":
-            if para1 <= 0 or para2 <= 0:
-                return None
-            return np.random.gamma(para1, para2, num_samples)
-            
-        elif dist_type == "uniform":
-            if para2 <= para1:
-                return None
-            return np.random.uniform(para1, para2, num_samples)
-            
-        else:
+        if dist_type not in DIST_CODES or not is_valid_parameters(dist_type, para1, para2):
             return None
-            
+
+        rng = rng if rng is not None else np.random.default_rng()
+        samples = np.empty(int(num_samples), dtype=np.float64)
+        return draw_dimension(DIST_CODES[dist_type], para1, para2, rng, samples)
+
     except Exception as e:
         print(f"Sample generation error for {dist_type}: {e}")
         return None
 
-def create_final_dimension_plot_with_data(final_samples):
+@instrumented("figure")
+def build_final_dimension_figure(x_data, y_data, cdf_data):
+    """Build the final dimension figure from curve and CDF data"""
+    fig = go.Figure()
+
+    # Add the purple curve with hover information
+    fig.add_trace(go.Scatter(
+        x=x_data,
+        y=y_data,
+        mode="lines",
+        name="Final Dimension Distribution",
+        line=dict(width=3, color="purple"),
+        hovertemplate="<b>Value:</b> %{x:.4f}<br><b>Density:</b> %{y:.4f}<br><b>CDF:</b> %{customdata:.4f}<extra></extra>",
+        customdata=cdf_data
+    ))
+
+    fig.update_layout(
+        title="Monte Carlo Simulation - Final Dimension Distribution",
+        margin=dict(l=40, r=20, t=60, b=40),
+        xaxis_title="Final Dimension Value",
+        yaxis_title="Probability Density",
+        height=400,
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(size=12),
+        title_font_size=14,
+        showlegend=False
+    )
+
+    # Add grid lines
+    fig.update_xaxes(
+        showgrid=True, 
+        gridwidth=0.8, 
+        gridcolor='rgba(180,180,180,0.4)',
+        zeroline=True,
+        zerolinewidth=1,
+        zerolinecolor='rgba(100,100,100,0.6)'
+    )
+    fig.update_yaxes(
+        showgrid=True, 
+        gridwidth=0.8, 
+        gridcolor='rgba(180,180,180,0.4)',
+        zeroline=True,
+        zerolinewidth=1,
+        zerolinecolor='rgba(100,100,100,0.6)'
+    )
+
+    return fig
+
+def create_simulation_content(fig, contributions, stats_text):
+    """Plot, contribution table and statistics shown for a finished run"""
+    return [
+        dcc.Graph(
+            id="final-dimension-plot",
+            figure=fig,
+            style={"height": "400px"}
+        ),
+        create_contribution_table(contributions),
+        html.Pre(
+            stats_text,
+            style={"whiteSpace": "pre-wrap", "fontSize": "0.9rem", "marginTop": "10px"}
+        )
+    ]
+
+def create_message_content(message, color="gray"):
+    """Centered placeholder message in the final dimension card"""
+    return [
+        html.Div(
+            message,
+            style={
+                "textAlign": "center",
+                "color": color,
+                "fontSize": "14px",
+                "padding": "100px 20px",
+                "height": "300px",
+                "display": "flex",
+                "alignItems": "center",
+                "justifyContent": "center"
+            }
+        )
+    ]
+
+def create_progress_content(snapshot):
+    """Progress bar and partial statistics of a running simulation job"""
+    percent = 100 * snapshot["progress"]
+    status = "Queued" if snapshot["state"] == "queued" else f"Running in the background ({snapshot['elapsed']:.1f} s)"
+    if snapshot["message"]:
+        status += f" - {snapshot['message']}"
+
+    return [
+        html.Div([
+            html.Div(status, style={"color": "gray", "fontSize": "14px", "marginBottom": "10px"}),
+            dbc.Progress(value=percent, label=f"{percent:.0f}%", striped=True, animated=True, style={"height": "20px"}),
+            html.Pre(
+                format_partial_statistics(snapshot["partial"]) if snapshot["partial"] else "",
+                style={"whiteSpace": "pre-wrap", "fontSize": "0.9rem", "marginTop": "15px", "color": "gray"}
+            )
+        ], style={"padding": "80px 20px", "height": "300px"})
+    ]
+
+def create_contribution_table(contributions):
+    """Ranked table of each dimension's share of the final variance and of the rejects"""
+    if not contributions or not contributions.get("rows"):
+        return html.Div()
+
+    def percent(value):
+        return "-" if value is None else f"{value * 100:.1f}%"
+
+    def index_with_ci(row, key):
+        text = f"{row[key]:.3f}"
+        if row.get(f"{key}_ci") is not None:
+            low, high = row[f"{key}_ci"]
+            text += f" [{low:.3f}, {high:.3f}]"
+        return text
+
+    has_sobol = "first" in contributions["rows"][0]
+    labels = ["#", "Dimension", "Variance share", "Corr. ratio", "Tail share"]
+    if has_sobol:
+        labels += ["First-order S", "Total-order ST"]
+
+    body = []
+    for rank, row in enumerate(contributions["rows"], start=1):
+        cells = [
+            html.Td(rank),
+            html.Td(row["name"]),
+            html.Td(percent(row["variance_share"])),
+            html.Td(f"{row['eta2']:.3f}"),
+            html.Td(percent(row["tail_share"]))
+        ]
+        if has_sobol:
+            cells += [html.Td(index_with_ci(row, "first")), html.Td(index_with_ci(row, "total"))]
+        body.append(html.Tr(cells))
+    header = html.Tr([html.Th(label) for label in labels])
+
+    if contributions["samples"] is None:
+        caption = "Contributions from the analytic dimension variances"
+    else:
+        caption = f"Contributions from {contributions['samples']:,} samples"
+    if contributions["rejected"]:
+        caption += f" ({contributions['rejected']:,} out of spec)"
+
+    return html.Div([
+        html.Table(
+            [html.Thead(header), html.Tbody(body)],
+            className="table table-sm",
+            style={"fontSize": "0.85rem", "marginBottom": "2px"}
+        ),
+        html.Small(caption, style={"color": "gray"})
+    ], style={"marginTop": "10px"})
+
+def create_error_figure(message):
+    """Empty figure with an error message"""
+    fig = go.Figure()
+    fig.update_layout(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        plot_bgcolor="white",
+        margin=dict(l=40, r=40, t=40, b=40),
+        height=400
+    )
+    fig.add_annotation(
+        text=message,
+        xref="paper", yref="paper",
+        x=0.5, y=0.5,
+        showarrow=False,
+        font=dict(size=14, color="red"),
+        align="center"
+    )
+    return fig
+
+def create_final_dimension_plot_with_data(final_samples, ecdf=None, kde_bandwidth="silverman"):
     """Create the final dimension distribution plot and return data"""
     try:
-        # Calculate histogram for the samples
-        n_bins = min(50, max(10, len(final_samples) // 100))
-        counts, bin_edges = np.histogram(final_samples, bins=n_bins)
-        bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
-        bin_widths = bin_edges[1:] - bin_edges[:-1]
-        total_area = np.sum(counts * bin_widths)
-        densities = counts / total_area
-        
+        if ecdf is None:
+            ecdf = EmpiricalCDF(final_samples)
+
         # Create x range for smooth curve
-        x_min, x_max = np.min(final_samples), np.max(final_samples)
+        x_min, x_max = ecdf.min, ecdf.max
         x_range = x_max - x_min
         x_min -= x_range * 0.1
         x_max += x_range * 0.1
         x_smooth = np.linspace(x_min, x_max, 500)
         
-        # Fit kernel density estimation for smooth curve
-        from scipy.stats import gaussian_kde
-        kde = gaussian_kde(final_samples)
-        y_smooth = kde(x_smooth)
+        # Binned FFT kernel density estimation for smooth curve
+        y_smooth = estimate_density(final_samples, x_smooth, bandwidth=kde_bandwidth)
         
         # Calculate CDF for hover information
-        cdf_values = []
-        for x_val in x_smooth:
-            cdf_val = np.sum(final_samples <= x_val) / len(final_samples)
-            cdf_values.append(cdf_val)
-        
-        # Create figure
-        fig = go.Figure()
-        
-        # Add the purple curve with hover information
-        fig.add_trace(go.Scatter(
-            x=x_smooth,
-            y=y_smooth,
-            mode="lines",
-            name="Final Dimension Distribution",
-            line=dict(width=3, color="purple"),
-            hovertemplate="<b>Value:</b> %{x:.4f}<br><b>Density:</b> %{y:.4f}<br><b>CDF:</b> %{customdata:.4f}<extra></extra>",
-            customdata=cdf_values
-        ))
-        
-        fig.update_layout(
-            title="Monte Carlo Simulation - Final Dimension Distribution",
-            margin=dict(l=40, r=20, t=60, b=40),
-            xaxis_title="Final Dimension Value",
-            yaxis_title="Probability Density",
-            height=400,
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            font=dict(size=12),
-            title_font_size=14,
-            showlegend=False
-        )
-        
-        # Add grid lines
-        fig.update_xaxes(
-            showgrid=True, 
-            gridwidth=0.8, 
-            gridcolor='rgba(180,180,180,0.4)',
-            zeroline=True,
-            zerolinewidth=1,
-            zerolinecolor='rgba(100,100,100,0.6)'
-        )
-        fig.update_yaxes(
-            showgrid=True, 
-            gridwidth=0.8, 
-            gridcolor='rgba(180,180,180,0.4)',
-            zeroline=True,
-            zerolinewidth=1,
-            zerolinecolor='rgba(100,100,100,0.6)'
-        )
+        cdf_values = ecdf.cdf(x_smooth).tolist()
         
+        fig = build_final_dimension_figure(x_smooth, y_smooth, cdf_values)
         return fig, x_smooth.tolist(), y_smooth.tolist(), cdf_values
         
     except Exception as e:
         print(f"Plot creation error: {e}")
         # Return empty figure with error message
-        fig = go.Figure()
-        fig.update_layout(
-            xaxis=dict(visible=False),
-            yaxis=dict(visible=False),
-            plot_bgcolor="white",
-            margin=dict(l=40, r=40, t=40, b=40),
-            height=400
-        )
-        fig.add_annotation(
-            text=f"Error creating plot: {str(e)}",
-            xref="paper", yref="paper",
-            x=0.5, y=0.5,
-            showarrow=False,
-            font=dict(size=14, color="red"),
-            align="center"
-        )
-        return fig, [], [], []
+        return create_error_figure(f"Error creating plot: {str(e)}"), [], [], []
 
-def create_original_plot_from_stored_data(stored_data):
-    """Create original plot from stored data"""
+def create_final_dimension_plot_from_histogram(hist_counts, hist_edges, sample_min, sample_max, kde_bandwidth="silverman"):
+    """Create the final dimension plot from streamed histogram counts"""
     try:
-        x_data = stored_data['x_data']
-        y_data = stored_data['y_data']
-        cdf_data = stored_data['cdf_data']
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(
-            x=x_data,
-            y=y_data,
-            mode="lines",
-            name="Final Dimension Distribution",
-            line=dict(width=3, color="purple"),
-            hovertemplate="<b>Value:</b> %{x:.4f}<br><b>Density:</b> %{y:.4f}<br><b>CDF:</b> %{customdata:.4f}<extra></extra>",
-            customdata=cdf_data
-        ))
-        
-        fig.update_layout(
-            title="Monte Carlo Simulation - Final Dimension Distribution",
-            margin=dict(l=40, r=20, t=60, b=40),
-            xaxis_title="Final Dimension Value",
-            yaxis_title="Probability Density",
-            height=400,
-            plot_bgcolor="white",
-            paper_bgcolor="white",
-            font=dict(size=12),
-            title_font_size=14,
-            showlegend=False
-        )
-        
-        # Add grid lines
-        fig.update_xaxes(
-            showgrid=True, 
-            gridwidth=0.8, 
-            gridcolor='rgba(180,180,180,0.4)',
-            zeroline=True,
-            zerolinewidth=1,
-            zerolinecolor='rgba(100,100,100,0.6)'
-        )
-        fig.update_yaxes(
-            showgrid=True, 
-            gridwidth=0.8, 
-            gridcolor='rgba(180,180,180,0.4)',
-            zeroline=True,
-            zerolinewidth=1,
-            zerolinecolor='rgba(100,100,100,0.6)'
-        )
-        
-        return fig
-        
+        total = np.sum(hist_counts)
+        centers = (hist_edges[:-1] + hist_edges[1:]) / 2
+
+        # Same display range as the in-memory plot, limited to the histogram
+        x_range = sample_max - sample_min
+        x_min = max(sample_min - x_range * 0.1, hist_edges[0])
+        x_max = min(sample_max + x_range * 0.1, hist_edges[-1])
+        x_smooth = np.linspace(x_min, x_max, 500)
+
+        # The fine histogram is already binned data for the FFT KDE
+        density, _ = kde_from_counts(hist_counts, centers, bandwidth=kde_bandwidth)
+        y_smooth = np.interp(x_smooth, centers, density, left=0.0, right=0.0)
+
+        cdf_edges = np.concatenate([[0.0], np.cumsum(hist_counts) / total])
+        cdf_values = np.interp(x_smooth, hist_edges, cdf_edges).tolist()
+
+        fig = build_final_dimension_figure(x_smooth, y_smooth, cdf_values)
+        return fig, x_smooth.tolist(), y_smooth.tolist(), cdf_values
+
     except Exception as e:
-        print(f"Error creating original plot: {e}")
-        return go.Figure()
+        print(f"Plot creation error: {e}")
+        return create_error_figure(f"Error creating plot: {str(e)}"), [], [], []
 
-def calculate_final_dimension_statistics(final_samples, num_samples, final_upper_tol=None, final_lower_tol=None, names=None, dirs=None):
-    """Calculate and format statistics for final dimension"""
+def create_final_dimension_plot_from_convolution(result):
+    """Create the final dimension plot from a convolved density"""
     try:
-        mean_val = np.mean(final_samples)
-        std_val = np.std(final_samples, ddof=1)
-        min_val = np.min(final_samples)
-        max_val = np.max(final_samples)
-        p5 = np.percentile(final_samples, 5)
-        p95 = np.percentile(final_samples, 95)
-        median_val = np.median(final_samples)
-        
-        stats_text = f"""=== MONTE CARLO SIMULATION RESULTS ===
-Sample Size: {num_samples:,}
-Mean: {mean_val:.4f}
-Std Dev: {std_val:.4f}
-Median: {median_val:.4f}
-Min: {min_val:.4f}
-Max: {max_val:.4f}
-5th Percentile: {p5:.4f}
-95th Percentile: {p95:.4f}"""
-
-        # Add process capability indices if tolerances are provided
-        if final_upper_tol is not None and final_lower_tol is not None:
-            try:
-                upper_tol_val = float(final_upper_tol)
-                lower_tol_val = float(final_lower_tol)
-                
-                # Calculate final dimension nominal by summing individual dimension nominals with directions
-                final_nominal = 0.0
-                
-                if names and dirs:
-                    for i in range(len(names)):
-                        if names[i] is not None:
-                            dim_key = f"dim_{i}"
-                            dim_data = dimensions_store.get(dim_key, {})
-                            
-                            # Get nominal value from store
-                            nominal = dim_data.get('nominal')
-                            if nominal is not None:
-                                try:
-                                    nominal_val = float(nominal)
-                                    # Get direction from dirs parameter
-                                    direction = dirs[i] if i < len(dirs) and dirs[i] is not None else "+"
-                                    
-                                    if direction == '-':
-                                        final_nominal -= nominal_val
-                                    else:
-                                        final_nominal += nominal_val
-                                except (ValueError, TypeError):
-                                    continue
-                
-                # Calculate specification limits
-                USL = final_nominal + upper_tol_val  # Upper Specification Limit
-                LSL = final_nominal + lower_tol_val  # Lower Specification Limit
-                
-                # Calculate CDF values at LSL and USL using the simulation data
-                cdf_at_lsl = np.sum(final_samples <= LSL) / len(final_samples)
-                cdf_at_usl = np.sum(final_samples <= USL) / len(final_samples)
-                cdf_right_of_usl = 1 - cdf_at_usl
+        # Display the central 1 - 2e-7 of the mass with the usual 10% margin
+        x_min, x_max = convolution_quantile(result, [1e-7, 1 - 1e-7])
+        x_range = x_max - x_min
+        x_smooth = np.linspace(x_min - x_range * 0.1, x_max + x_range * 0.1, 500)
+
+        y_smooth = np.interp(x_smooth, result["x"], result["density"], left=0.0, right=0.0)
+        cdf_values = convolution_cdf(result, x_smooth).tolist()
+
+        fig = build_final_dimension_figure(x_smooth, y_smooth, cdf_values)
+        return fig, x_smooth.tolist(), y_smooth.tolist(), cdf_values
+
+    except Exception as e:
+        print(f"Plot creation error: {e}")
+        return create_error_figure(f"Error creating plot: {str(e)}"), [], [], []
+
+def calculate_final_dimension_nominal(names, dirs, expression=None):
+    """Sum individual dimension nominals with directions, or evaluate the stack expression at them"""
+    if expression and str(expression).strip():
+        return evaluate_expression_at_nominals(names, expression)
+
+    final_nominal = 0.0
+    
+    if names and dirs:
+        for i in range(len(names)):
+            if names[i] is not None:
+                dim_key = f"dim_{i}"
+                dim_data = get_dimension(dim_key) or DimensionState()
                 
-                # Calculate process capability indices
-                if std_val > 0:
-                    # Cp = (USL - LSL) / (6 * sigma)
-                    Cp = (USL - LSL) / (6 * std_val)
-                    
-                    # Cpk = min((USL - mean)/(3*sigma), (mean - LSL)/(3*sigma))
-                    Cpu = (USL - mean_val) / (3 * std_val)  # Upper capability
-                    Cpl = (mean_val - LSL) / (3 * std_val)  # Lower capability
-                    Cpk = min(Cpu, Cpl)
-                    
-                    # Add capability indices and CDF values to the statistics text
-                    stats_text += f"""
-Cp: {Cp:.3f}
-Cpk: {Cpk:.3f}
-CDF left of LSL: {cdf_at_lsl:.4f}
-CDF right of USL: {cdf_right_of_usl:.4f}"""
-                else:
-                    stats_text += f"""
-Cp: Cannot calculate (std=0)
-Cpk: Cannot calculate (std=0)
-CDF left of LSL: {cdf_at_lsl:.4f}
-CDF right of USL: {cdf_right_of_usl:.4f}"""
-                    
-            except (ValueError, TypeError):
-                # If there's an error converting tolerances to float
-                stats_text += f"""
-Cp: Error in tolerance values
-Cpk: Error in tolerance values
-CDF left of LSL: Error in tolerance values
-CDF right of USL: Error in tolerance values"""
-        else:
-            # No tolerances provided
-            stats_text += f"""
-Cp: Please set tolerance in final dimension
-Cpk: Please set tolerance in final dimension
-CDF left of LSL: Please set tolerance in final dimension
-CDF right of USL: Please set tolerance in final dimension"""
-        
-        return stats_text
+                # Get nominal value from store
+                nominal = dim_data.nominal
+                if nominal is not None:
+                    try:
+                        nominal_val = float(nominal)
+                        # Get direction from dirs parameter
+                        direction = dirs[i] if i < len(dirs) and dirs[i] is not None else "+"
+                        
+                        if direction == '-':
+                            final_nominal -= nominal_val
+                        else:
+                            final_nominal += nominal_val
+                    except (ValueError, TypeError):
+                        continue
+
+    return final_nominal
+
+def evaluate_expression_at_nominals(names, expression):
+    """Stack expression with every named dimension at its stored nominal (missing nominals count as 0)"""
+    kept_names, nominals = [], []
+    for i in range(len(names or [])):
+        if names[i] is None:
+            continue
+        nominal = (get_dimension(f"dim_{i}") or DimensionState()).nominal
+        try:
+            nominals.append(float(nominal) if nominal is not None else 0.0)
+        except (ValueError, TypeError):
+            nominals.append(0.0)
+        kept_names.append(names[i])
+
+    stack = StackExpression(expression, kept_names)
+    return float(stack.evaluate(np.array(nominals, dtype=np.float64).reshape(-1, 1))[0])
+
+def calculate_spec_limits(final_upper_tol, final_lower_tol, names=None, dirs=None, expression=None):
+    """Return ((LSL, USL), None) or (None, message) for the final dimension"""
+    if final_upper_tol is None or final_lower_tol is None:
+        return None, "Please set tolerance in final dimension"
+
+    try:
+        upper_tol_val = float(final_upper_tol)
+        lower_tol_val = float(final_lower_tol)
+    except (ValueError, TypeError):
+        return None, "Error in tolerance values"
+
+    try:
+        final_nominal = calculate_final_dimension_nominal(names, dirs, expression)
+    except ValueError as e:
+        return None, str(e)
+    USL = final_nominal + upper_tol_val  # Upper Specification Limit
+    LSL = final_nominal + lower_tol_val  # Lower Specification Limit
+    return (LSL, USL), None
+
+def calculate_final_dimension_statistics(final_samples, num_samples, final_upper_tol=None, final_lower_tol=None, names=None, dirs=None,
+                                         ecdf=None, notes=None, expression=None):
+    """Calculate and format statistics for final dimension"""
+    try:
+        spec_limits, spec_message = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs, expression)
+        summary = summarize_samples(final_samples, spec_limits, ecdf=ecdf)
+        return format_final_dimension_statistics(summary, num_samples, spec_limits, spec_message, notes=notes)
         
     except Exception as e:
-        return f"Error calculating statistics: {str(e)}"
\ No newline at end of file
+        return f"Error calculating statistics: {str(e)}"
@@ -3,7 +3,7 @@
 from dash import Input, Output, State, callback_context, ALL, no_update
 import dash
 import numexpr as ne
-from src.stores.global_store import dimensions_store
+from src.stores.global_store import update_dimension
 
 
 def register_param_display_callback(app):
@@ -23,44 +23,40 @@ def register_param_display_callback(app):
         for i in range(max_len):
             dim_key = f"dim_{i}"
             
-            # Ensure dimension exists
-            if dim_key not in dimensions_store:
-                dimensions_store[dim_key] = {
-                    "name": f"Dim {i}",
-                    "dist": None,
-                    "para1": None,
-                    "para2": None
-                }
+            # Collect the changes; the dimension is created if needed
+            fields = {}
             
             # Update name
             if i < len(names) and names[i]:
-                dimensions_store[dim_key]["name"] = names[i]
+                fields["name"] = names[i]
             
             # Update distribution type
             if i < len(dists) and dists[i]:
-                dimensions_store[dim_key]["dist"] = dists[i]
+                fields["dist"] = dists[i]
             
             # Update parameters (store directly if numeric, otherwise keep as string)
             if i < len(values1) and values1[i] is not None and values1[i] != "":
                 if isinstance(values1[i], (int, float)):
-                    dimensions_store[dim_key]["para1"] = values1[i]
+                    fields["para1"] = values1[i]
                 else:
                     # Try to evaluate expression
                     try:
                         evaluated = float(ne.evaluate(str(values1[i])))
-                        dimensions_store[dim_key]["para1"] = evaluated
+                        fields["para1"] = evaluated
                     except:
-                        dimensions_store[dim_key]["para1"] = values1[i]
+                        fields["para1"] = values1[i]
             
             if i < len(values2) and values2[i] is not None and values2[i] != "":
                 if isinstance(values2[i], (int, float)):
-                    dimensions_store[dim_key]["para2"] = values2[i]
+                    fields["para2"] = values2[i]
                 else:
                     # Try to evaluate expression
                     try:
                         evaluated = float(ne.evaluate(str(values2[i])))
-                        dimensions_store[dim_key]["para2"] = evaluated
+                        fields["para2"] = evaluated
                     except:
-                        dimensions_store[dim_key]["para2"] = values2[i]
+                        fields["para2"] = values2[i]
+
+            update_dimension(dim_key, **fields)
 
         return no_update
\ No newline at end of file
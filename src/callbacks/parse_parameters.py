@@ -2,7 +2,7 @@
 
 from dash import Input, Output, State, MATCH, ctx, no_update
 import numexpr as ne
-from src.stores.global_store import dimensions_store
+from src.stores.global_store import update_dimension
 
 def register_param_parse_callback(app):
     @app.callback(
@@ -22,16 +22,12 @@ def register_param_parse_callback(app):
         index = triggered_id["index"]
         dim_key = f"dim_{index}"
         
-        # Ensure dimension exists in store
-        if dim_key not in dimensions_store:
-            dimensions_store[dim_key] = {"name": f"Dim {index}", "dist": None, "para1": None, "para2": None}
-        
         # Process parameter 1 - convert to numerical value and display it
         val1_eval = val1
         if val1 is not None and val1 != "":
             try:
                 val1_eval = float(ne.evaluate(str(val1)))
-                dimensions_store[dim_key]["para1"] = val1_eval
+                update_dimension(dim_key, para1=val1_eval)
                 # Format the displayed value to show 6 decimal places for precision
                 val1_eval = f"{val1_eval:.6f}"
             except Exception as e:
@@ -42,7 +38,7 @@ def register_param_parse_callback(app):
         if val2 is not None and val2 != "":
             try:
                 val2_eval = float(ne.evaluate(str(val2)))
-                dimensions_store[dim_key]["para2"] = val2_eval
+                update_dimension(dim_key, para2=val2_eval)
                 # Format the displayed value to show 6 decimal places for precision
                 val2_eval = f"{val2_eval:.6f}"
             except Exception as e:
@@ -0,0 +1,149 @@
+# src/callbacks/tolerance_allocation.py
+
+from dash import Input, Output, State, ALL, html, no_update
+from src.callbacks.final_dimension_simulation import calculate_spec_limits
+from src.stores.dimension_state import DimensionState
+from src.stores.global_store import get_dimension
+from src.utils.simulation_engine import is_valid_parameters
+from src.utils.tolerance_allocation import AllocationError, allocate_tolerances
+from src.utils.tolerance_params import tolerance_to_params
+
+def register_tolerance_allocation_callback(app):
+    @app.callback(
+        Output({"type": "dim-tol-upper", "index": ALL}, "value"),
+        Output({"type": "dim-tol-lower", "index": ALL}, "value"),
+        Output({"type": "dim-para1", "index": ALL}, "value", allow_duplicate=True),
+        Output({"type": "dim-para2", "index": ALL}, "value", allow_duplicate=True),
+        Output("allocation-result", "children"),
+        Input("optimize-tolerances-btn", "n_clicks"),
+        State({"type": "dim-name", "index": ALL}, "value"),
+        State({"type": "dim-dist", "index": ALL}, "value"),
+        State({"type": "dim-dir", "index": ALL}, "value"),
+        State({"type": "dim-nominal", "index": ALL}, "value"),
+        State({"type": "dim-tol-upper", "index": ALL}, "value"),
+        State({"type": "dim-tol-lower", "index": ALL}, "value"),
+        State({"type": "dim-para1", "index": ALL}, "value"),
+        State({"type": "dim-para2", "index": ALL}, "value"),
+        State("final-dim-tol-upper", "value"),
+        State("final-dim-tol-lower", "value"),
+        State("allocation-metric", "value"),
+        State("allocation-target", "value"),
+        State("allocation-cost-exponent", "value"),
+        State("allocation-weights", "value"),
+        State("stack-expression", "value"),
+        prevent_initial_call=True
+    )
+    def optimize_tolerances(n_clicks, names, dists, dirs, nominals, upper_tols, lower_tols, para1s, para2s,
+                            final_upper_tol, final_lower_tol, metric, target, cost_exponent, weights_text, stack_expression):
+        n_rows = len(names)
+        unchanged = [no_update] * n_rows
+
+        def failure(message):
+            return unchanged, unchanged, unchanged, unchanged, html.Span(message, style={"color": "red"})
+
+        if not n_clicks:
+            return unchanged, unchanged, unchanged, unchanged, no_update
+
+        if stack_expression and stack_expression.strip():
+            # The evaluators are analytic/convolution results for the signed sum
+            return failure("Tolerance allocation supports the linear (signed sum) stack only; clear the stack expression")
+
+        spec_limits, spec_message = calculate_spec_limits(final_upper_tol, final_lower_tol, names, dirs)
+        if spec_limits is None:
+            return failure(spec_message)
+
+        metric = metric or "cpk"
+        if target is None:
+            target = 1.33 if metric == "cpk" else 63.0
+        if float(target) <= 0:
+            return failure("Target must be positive")
+
+        variable, variable_rows, fixed = split_allocation_dimensions(names, dists, dirs, nominals, upper_tols, lower_tols,
+                                                                     para1s, para2s)
+        try:
+            weights = parse_cost_weights(weights_text, len(variable))
+            result = allocate_tolerances(variable, fixed, spec_limits, tolerance_to_params, float(target), metric=metric,
+                                         cost_exponent=float(cost_exponent or 1.0), weights=weights)
+        except AllocationError as e:
+            return failure(f"Allocation failed: {e}")
+
+        # Write back the tolerances and the parameters the existing mapping derives from them
+        new_upper, new_lower, new_para1, new_para2 = list(unchanged), list(unchanged), list(unchanged), list(unchanged)
+        for j, i in enumerate(variable_rows):
+            new_upper[i] = round(float(result["upper_tols"][j]), 6)
+            new_lower[i] = round(float(result["lower_tols"][j]), 6)
+            new_para1[i], new_para2[i] = tolerance_to_params(dists[i], nominals[i], new_upper[i], new_lower[i])
+
+        return new_upper, new_lower, new_para1, new_para2, format_allocation_summary(result, len(fixed))
+
+def split_allocation_dimensions(names, dists, dirs, nominals, upper_tols, lower_tols, para1s, para2s):
+    """Separate rows whose tolerance band can be optimized from rows that stay fixed
+
+    Rows with MLE or Bayesian parameters are fixed at those parameters: their
+    spread comes from measured data, not from the tolerance band.
+    """
+    variable, variable_rows, fixed = [], [], []
+
+    def add_fixed(dist, para1, para2, direction):
+        # Rows without usable parameters are left out of the stack, as in the simulation
+        try:
+            para1, para2 = float(para1), float(para2)
+        except (TypeError, ValueError):
+            return
+        if is_valid_parameters(dist, para1, para2):
+            fixed.append({"dist": dist, "para1": para1, "para2": para2, "dir": direction})
+
+    for i in range(len(names)):
+        if names[i] is None or dists[i] is None:
+            continue
+        direction = dirs[i] if i < len(dirs) and dirs[i] is not None else "+"
+        dim_data = get_dimension(f"dim_{i}") or DimensionState()
+
+        if dim_data.bayes_applied:
+            add_fixed(dists[i], dim_data.posterior_para1, dim_data.posterior_para2, direction)
+            continue
+        if dim_data.mle_applied:
+            add_fixed(dists[i], dim_data.mle_para1, dim_data.mle_para2, direction)
+            continue
+
+        try:
+            nominal, upper_tol, lower_tol = float(nominals[i]), float(upper_tols[i]), float(lower_tols[i])
+        except (TypeError, ValueError):
+            add_fixed(dists[i], para1s[i], para2s[i], direction)
+            continue
+
+        if upper_tol > lower_tol:
+            variable.append({"dist": dists[i], "nominal": nominal, "upper_tol": upper_tol, "lower_tol": lower_tol,
+                             "dir": direction})
+            variable_rows.append(i)
+        else:
+            add_fixed(dists[i], para1s[i], para2s[i], direction)
+
+    return variable, variable_rows, fixed
+
+def parse_cost_weights(weights_text, count):
+    """Comma-separated relative cost weights, one per optimized dimension (blank: all 1)"""
+    if not weights_text or not str(weights_text).strip():
+        return None
+    try:
+        weights = [float(w) for w in str(weights_text).split(",") if w.strip()]
+    except ValueError:
+        raise AllocationError("Cost weights must be comma-separated numbers")
+    if len(weights) != count:
+        raise AllocationError(f"Expected {count} cost weights (one per optimized dimension), got {len(weights)}")
+    if any(w <= 0 for w in weights):
+        raise AllocationError("Cost weights must be positive")
+    return weights
+
+def format_allocation_summary(result, num_fixed):
+    """One-line report of the allocation next to the optimize button"""
+    if result["metric"] == "cpk":
+        achieved = f"Cpk {result['initial_value']:.3f} -> {result['value']:.3f} (target >= {result['target']:g})"
+    else:
+        achieved = f"{result['initial_value']:.1f} -> {result['value']:.1f} ppm (target <= {result['target']:g})"
+
+    text = (f"{achieved}; cost {result['initial_cost']:.4g} -> {result['cost']:.4g}; "
+            f"{result['evaluations']:,} candidates in {result['elapsed']:.2f} s")
+    if num_fixed:
+        text += f"; {num_fixed} dimension(s) held fixed"
+    return html.Span(text, style={"color": "gray"})
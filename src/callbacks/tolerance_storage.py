@@ -1,7 +1,7 @@
 # src/callbacks/tolerance_storage.py
 
 from dash import Input, Output, State, callback_context, ALL, no_update
-from src.stores.global_store import dimensions_store
+from src.stores.global_store import update_dimension
 
 def register_tolerance_storage_callback(app):
     @app.callback(
@@ -18,23 +18,17 @@ def register_tolerance_storage_callback(app):
         for i in range(max_len):
             dim_key = f"dim_{i}"
             
-            # Ensure dimension exists
-            if dim_key not in dimensions_store:
-                dimensions_store[dim_key] = {
-                    "name": f"Dim {i}",
-                    "dist": None,
-                    "para1": None,
-                    "para2": None
-                }
-            
-            # Store tolerance values
+            # Store tolerance values (the dimension is created if needed)
+            fields = {}
             if i < len(nominals) and nominals[i] is not None:
-                dimensions_store[dim_key]["nominal"] = nominals[i]
+                fields["nominal"] = nominals[i]
             
             if i < len(upper_tols) and upper_tols[i] is not None:
-                dimensions_store[dim_key]["upper_tol"] = upper_tols[i]
+                fields["upper_tol"] = upper_tols[i]
                 
             if i < len(lower_tols) and lower_tols[i] is not None:
-                dimensions_store[dim_key]["lower_tol"] = lower_tols[i]
+                fields["lower_tol"] = lower_tols[i]
+
+            update_dimension(dim_key, **fields)
 
         return no_update
\ No newline at end of file
@@ -0,0 +1,41 @@
+# src/callbacks/upload_jobs.py
+
+from dash import Input, Output, State, MATCH, no_update
+from src.stores.global_store import current_scope
+from src.utils.jobs import job_manager
+
+def register_upload_job_callback(app):
+    @app.callback(
+        Output({"type": "dim-para1", "index": MATCH}, "value", allow_duplicate=True),
+        Output({"type": "dim-para2", "index": MATCH}, "value", allow_duplicate=True),
+        Output({"type": "dim-mle-status", "index": MATCH}, "data"),
+        Output({"type": "dim-bayes-status", "index": MATCH}, "data"),
+        Output({"type": "dim-bayes-error", "index": MATCH}, "data"),
+        Output({"type": "dim-job", "index": MATCH}, "data", allow_duplicate=True),
+        Output({"type": "dim-job-poll", "index": MATCH}, "disabled", allow_duplicate=True),
+        Input({"type": "dim-job-poll", "index": MATCH}, "n_intervals"),
+        State({"type": "dim-job", "index": MATCH}, "data"),
+        prevent_initial_call=True
+    )
+    def apply_upload_job_result(n_intervals, job_data):
+        """Apply a finished MLE or Bayesian upload job to its dimension row"""
+        unchanged = (no_update,) * 5
+        job = job_manager.get((job_data or {}).get("id"), owner=current_scope())
+        if job is None:
+            return unchanged + (None, True)
+        if not job.done:
+            return unchanged + (no_update, no_update)
+
+        if job.state == "cancelled":
+            # Superseded by a newer upload on the same row
+            return unchanged + (None, True)
+
+        if job.kind == "mle":
+            para1, para2, mle_status = job.result if job.state == "done" else ("", "", False)
+            return para1, para2, mle_status, no_update, no_update, None, True
+
+        if job.state == "done":
+            para1, para2, bayes_status, bayes_error = job.result
+        else:
+            para1, para2, bayes_status, bayes_error = "", "", False, f"Error processing Bayesian data: {job.error}"
+        return para1, para2, no_update, bayes_status, bayes_error, None, True
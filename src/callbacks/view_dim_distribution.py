@@ -6,42 +6,12 @@ import numpy as np
 import numexpr as ne
 from dash.exceptions import PreventUpdate
 from scipy.stats import norm, lognorm, gamma, uniform
-from src.stores.global_store import dimensions_store
+from src.stores.dimension_state import DimensionState
+from src.stores.global_store import get_dimension
+from src.utils.distributions import calculate_cdf, calculate_pdf
 
 
 def register_view_dim_distribution_callback(app):
-    def _calculate_cdf(x_values, dist_name, para1, para2):
-        """Calculate cumulative distribution function values"""
-        try:
-            if dist_name == "normal":
-                return norm.cdf(x_values, loc=para1, scale=para2)
-            elif dist_name == "lognormal":
-                return lognorm.cdf(x_values, s=para2, scale=np.exp(para1))
-            elif dist_name == "gamma":
-                return gamma.cdf(x_values, a=para1, scale=para2)
-            elif dist_name == "uniform":
-                return uniform.cdf(x_values, loc=para1, scale=para2-para1)
-            else:
-                return np.zeros_like(x_values)
-        except:
-            return np.zeros_like(x_values)
-
-    def _calculate_pdf(x_values, dist_name, para1, para2):
-        """Calculate probability density function values"""
-        try:
-            if dist_name == "normal":
-                return norm.pdf(x_values, loc=para1, scale=para2)
-            elif dist_name == "lognormal":
-                return lognorm.pdf(x_values, s=para2, scale=np.exp(para1))
-            elif dist_name == "gamma":
-                return gamma.pdf(x_values, a=para1, scale=para2)
-            elif dist_name == "uniform":
-                return uniform.pdf(x_values, loc=para1, scale=para2-para1)
-            else:
-                return np.zeros_like(x_values)
-        except:
-            return np.zeros_like(x_values)
-
     def _get_distribution_range(dist_name, para1, para2):
         """Get appropriate x-range for plotting distribution"""
         try:
@@ -108,22 +78,10 @@ def register_view_dim_distribution_callback(app):
             
             # Add process capability indices if we have dimension key and tolerance data
             if dim_key is not None:
-                dim_data = dimensions_store.get(dim_key, {})
-                nominal = dim_data.get("nominal")
-                upper_tol = dim_data.get("upper_tol") 
-                lower_tol = dim_data.get("lower_tol")
-                
-                # Also check if tolerances are stored with different key names
-                if nominal is None:
-                    # Try to get from the dimension index
-                    dim_index = dim_key.split('_')[1] if '_' in dim_key else '0'
-                    # Search through all dimensions to find matching tolerance data
-                    for key, data in dimensions_store.items():
-                        if key == dim_key and 'nominal' in data:
-                            nominal = data.get('nominal')
-                            upper_tol = data.get('upper_tol')
-                            lower_tol = data.get('lower_tol')
-                            break
+                dim_data = get_dimension(dim_key) or DimensionState()
+                nominal = dim_data.nominal
+                upper_tol = dim_data.upper_tol
+                lower_tol = dim_data.lower_tol
                 
                 if nominal is not None and upper_tol is not None and lower_tol is not None:
                     try:
@@ -188,17 +146,17 @@ def register_view_dim_distribution_callback(app):
             )
             return fig, "Please select a dimension first"
 
-        dim = dimensions_store.get(selected_dim_key)
+        dim = get_dimension(selected_dim_key)
         if dim is None:
             return go.Figure(), "Dimension not found."
 
-        dist_name = dim.get("dist")
-        para1 = dim.get("para1")
-        para2 = dim.get("para2")
+        dist_name = dim.dist
+        para1 = dim.para1
+        para2 = dim.para2
         
         # Check if MLE or Bayesian analysis was applied
-        mle_applied = dim.get("mle_applied", False)
-        bayes_applied = dim.get("bayes_applied", False)
+        mle_applied = dim.mle_applied
+        bayes_applied = dim.bayes_applied
 
         # Check if distribution type and parameters are provided
         if dist_name is None:
@@ -250,7 +208,7 @@ def register_view_dim_distribution_callback(app):
         except Exception as e:
             return go.Figure(), f"Invalid parameters. Must be numeric expressions. Error: {str(e)}"
 
-        dim_name = dim.get("name", "Unknown")
+        dim_name = dim.name or "Unknown"
         
         try:
             # Validate distribution parameters
@@ -268,15 +226,15 @@ def register_view_dim_distribution_callback(app):
             
             if bayes_applied:
                 # Show prior, likelihood, and posterior curves
-                prior_para1 = dim.get("prior_para1")
-                prior_para2 = dim.get("prior_para2")
-                likelihood_para1 = dim.get("likelihood_para1")
-                likelihood_para2 = dim.get("likelihood_para2")
-                posterior_para1 = dim.get("posterior_para1")
-                posterior_para2 = dim.get("posterior_para2")
+                prior_para1 = dim.prior_para1
+                prior_para2 = dim.prior_para2
+                likelihood_para1 = dim.likelihood_para1
+                likelihood_para2 = dim.likelihood_para2
+                posterior_para1 = dim.posterior_para1
+                posterior_para2 = dim.posterior_para2
                 
                 # Also show histogram if we have Bayesian data
-                bayes_data = dim.get("data", [])
+                bayes_data = dim.bayes_data
                 
                 # Determine plotting range based on all three distributions
                 x_ranges = []
@@ -288,8 +246,8 @@ def register_view_dim_distribution_callback(app):
                     x_ranges.append(_get_distribution_range(dist_name, posterior_para1, posterior_para2))
                 
                 # Include data range if available
-                if bayes_data:
-                    data_min, data_max = min(bayes_data), max(bayes_data)
+                if bayes_data.size:
+                    data_min, data_max = float(bayes_data.min()), float(bayes_data.max())
                     x_ranges.append((data_min - (data_max - data_min) * 0.1, data_max + (data_max - data_min) * 0.1))
                 
                 if x_ranges:
@@ -305,7 +263,7 @@ def register_view_dim_distribution_callback(app):
                 x = np.linspace(x_min, x_max, 500)
                 
                 # Add histogram first (so it appears behind curves)
-                if bayes_data:
+                if bayes_data.size:
                     # Calculate histogram bins and counts for custom hover info
                     n_bins = min(20, max(5, len(bayes_data) // 3))
                     counts, bin_edges = np.histogram(bayes_data, bins=n_bins)
@@ -341,7 +299,7 @@ def register_view_dim_distribution_callback(app):
                 
                 # Plot prior (blue)
                 if prior_para1 is not None and prior_para2 is not None:
-                    y_prior = _calculate_pdf(x, dist_name, prior_para1, prior_para2)
+                    y_prior = calculate_pdf(x, dist_name, prior_para1, prior_para2)
                     fig.add_trace(go.Scatter(
                         x=x, y=y_prior,
                         mode="lines",
@@ -352,7 +310,7 @@ def register_view_dim_distribution_callback(app):
                 
                 # Plot likelihood (orange)
                 if likelihood_para1 is not None and likelihood_para2 is not None:
-                    y_likelihood = _calculate_pdf(x, dist_name, likelihood_para1, likelihood_para2)
+                    y_likelihood = calculate_pdf(x, dist_name, likelihood_para1, likelihood_para2)
                     fig.add_trace(go.Scatter(
                         x=x, y=y_likelihood,
                         mode="lines",
@@ -363,7 +321,7 @@ def register_view_dim_distribution_callback(app):
                 
                 # Plot posterior (green with fill)
                 if posterior_para1 is not None and posterior_para2 is not None:
-                    y_posterior = _calculate_pdf(x, dist_name, posterior_para1, posterior_para2)
+                    y_posterior = calculate_pdf(x, dist_name, posterior_para1, posterior_para2)
                     fig.add_trace(go.Scatter(
                         x=x, y=y_posterior,
                         mode="lines",
@@ -372,7 +330,7 @@ def register_view_dim_distribution_callback(app):
                         fill="tozeroy",
                         fillcolor="rgba(0, 128, 0, 0.3)",
                         hovertemplate="<b>Posterior</b><br>Value: %{x:.4f}<br>Density: %{y:.4f}<br>CDF: %{customdata:.4f}<extra></extra>",
-                        customdata=_calculate_cdf(x, dist_name, posterior_para1, posterior_para2)
+                        customdata=calculate_cdf(x, dist_name, posterior_para1, posterior_para2)
                     ))
                 
                 # Prepare combined statistics
@@ -388,14 +346,14 @@ def register_view_dim_distribution_callback(app):
                 
             elif mle_applied:
                 # Show MLE curve and data histogram
-                mle_data = dim.get("mle_data", [])
-                mle_para1 = dim.get("mle_para1", para1)
-                mle_para2 = dim.get("mle_para2", para2)
+                mle_data = dim.mle_data
+                mle_para1 = dim.mle_para1 if dim.mle_para1 is not None else para1
+                mle_para2 = dim.mle_para2 if dim.mle_para2 is not None else para2
                 
                 # Determine plotting range including data
                 x_ranges = [_get_distribution_range(dist_name, mle_para1, mle_para2)]
-                if mle_data:
-                    data_min, data_max = min(mle_data), max(mle_data)
+                if mle_data.size:
+                    data_min, data_max = float(mle_data.min()), float(mle_data.max())
                     x_ranges.append((data_min - (data_max - data_min) * 0.1, data_max + (data_max - data_min) * 0.1))
                 
                 x_min = min([r[0] for r in x_ranges])
@@ -407,7 +365,7 @@ def register_view_dim_distribution_callback(app):
                 x = np.linspace(x_min, x_max, 500)
                 
                 # Add histogram first (so it appears behind the MLE curve)
-                if mle_data:
+                if mle_data.size:
                     # Calculate histogram bins and counts for custom hover info
                     n_bins = min(20, max(5, len(mle_data) // 3))
                     counts, bin_edges = np.histogram(mle_data, bins=n_bins)
@@ -442,18 +400,18 @@ def register_view_dim_distribution_callback(app):
                     ))
                 
                 # Plot MLE curve
-                y_mle = _calculate_pdf(x, dist_name, mle_para1, mle_para2)
+                y_mle = calculate_pdf(x, dist_name, mle_para1, mle_para2)
                 fig.add_trace(go.Scatter(
                     x=x, y=y_mle, 
                     mode="lines", 
                     name="MLE Fit",
                     line=dict(width=3, color="blue"),
                     hovertemplate="<b>MLE Fit</b><br>Value: %{x:.4f}<br>Density: %{y:.4f}<br>CDF: %{customdata:.4f}<extra></extra>",
-                    customdata=_calculate_cdf(x, dist_name, mle_para1, mle_para2)
+                    customdata=calculate_cdf(x, dist_name, mle_para1, mle_para2)
                 ))
                 
                 stats_text = "=== MLE FIT ===\n" + _format_statistics(dist_name, mle_para1, mle_para2, dim_key=selected_dim_key)
-                if mle_data:
+                if mle_data.size:
                     stats_text += f"\n\n=== DATA SUMMARY ===\nSample Size: {len(mle_data)}\nSample Mean: {np.mean(mle_data):.3f}\nSample Std: {np.std(mle_data, ddof=1):.3f}\nMin: {np.min(mle_data):.3f}\nMax: {np.max(mle_data):.3f}"
                 title_text = f"MLE Analysis of Dimension '{dim_name}'"
                 
@@ -461,7 +419,7 @@ def register_view_dim_distribution_callback(app):
                 # Show only current distribution (default behavior)
                 x_min, x_max = _get_distribution_range(dist_name, para1, para2)
                 x = np.linspace(x_min, x_max, 500)
-                y = _calculate_pdf(x, dist_name, para1, para2)
+                y = calculate_pdf(x, dist_name, para1, para2)
                 
                 fig.add_trace(go.Scatter(
                     x=x, y=y, 
@@ -469,7 +427,7 @@ def register_view_dim_distribution_callback(app):
                     name=f"{dim_name} ({dist_name})",
                     line=dict(width=3, color="blue"),
                     hovertemplate="<b>Value:</b> %{x:.4f}<br><b>Density:</b> %{y:.4f}<br><b>CDF:</b> %{customdata:.4f}<extra></extra>",
-                    customdata=_calculate_cdf(x, dist_name, para1, para2)
+                    customdata=calculate_cdf(x, dist_name, para1, para2)
                 ))
                 
                 stats_text = _format_statistics(dist_name, para1, para2, dim_key=selected_dim_key)
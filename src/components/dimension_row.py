@@ -10,6 +10,9 @@ def generate_dimension_row(i):
         dcc.Store(id={"type": "dim-mle-status", "index": i}, data=False),
         dcc.Store(id={"type": "dim-bayes-status", "index": i}, data=False),
         dcc.Store(id={"type": "dim-bayes-error", "index": i}, data=""),
+        # Background MLE/Bayesian upload job of this row, polled until it finishes
+        dcc.Store(id={"type": "dim-job", "index": i}, data=None),
+        dcc.Interval(id={"type": "dim-job-poll", "index": i}, interval=300, disabled=True),
         
         html.Div([
             html.Div(dcc.Input(
@@ -2,9 +2,14 @@
 
 import dash_bootstrap_components as dbc
 from dash import html, dcc
+from src.utils.constants import ALLOCATION_METRIC_OPTIONS, KDE_BANDWIDTH_OPTIONS, SIMULATION_ENGINE_OPTIONS
 
 layout = dbc.Container([
     dcc.Store(id="dim-count", data=0),
+    dcc.Store(id="final-simulation-store", data=None),  # Latest simulation result of this browser session
+    dcc.Interval(id="auto-run-timer", interval=2000, max_intervals=1, disabled=True),  # One-shot auto-run debounce
+    dcc.Store(id="simulation-job", data=None),  # Background simulation job of this browser session
+    dcc.Interval(id="simulation-job-poll", interval=500, disabled=True),  # Progress polling while a job runs
     html.Div(id="dummy-output", style={"display": "none"}),  # Add dummy output
 
 # Card 1: Header with Professional Design and User Guide Link
@@ -176,8 +181,150 @@ layout = dbc.Container([
                                         "alignItems": "center",
                                         "justifyContent": "center"
                                     }  # Center text vertically and horizontally
+                                ),
+                                dbc.Button(
+                                    "Cancel",
+                                    id="cancel-simulation-btn",
+                                    color="secondary",
+                                    outline=True,
+                                    style={"height": "33px", "display": "flex", "alignItems": "center", "marginLeft": "10px"}
+                                ),
+                                dcc.Input(
+                                    id="auto-run-delay",
+                                    type="number",
+                                    placeholder="Auto-run (s)",
+                                    min=0.5,
+                                    step=0.5,
+                                    style={"width": "120px", "marginLeft": "10px"}
+                                )
+                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "5px"}),
+                            html.Div(id="simulation-status", style={"fontSize": "0.85rem", "marginBottom": "15px"}),
+                            html.Div([
+                                html.Label("Seed:",
+                                          style={"marginRight": "10px", "fontWeight": "bold", "alignSelf": "center"}),
+                                dcc.Input(
+                                    id="simulation-seed-input",
+                                    type="number",
+                                    placeholder="Random",
+                                    min=0,
+                                    step=1,
+                                    style={"width": "140px", "marginRight": "10px"}
+                                ),
+                                dcc.Checklist(
+                                    id="simulation-float32",
+                                    options=[{"label": " float32 (half memory)", "value": "float32"}],
+                                    value=[],
+                                    style={"alignSelf": "center"}
+                                ),
+                                dcc.Checklist(
+                                    id="simulation-show-timings",
+                                    options=[{"label": " Timing breakdown", "value": "timings"}],
+                                    value=[],
+                                    style={"alignSelf": "center", "marginLeft": "15px"}
+                                )
+                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "15px"}),
+                            html.Div([
+                                html.Label("Engine:",
+                                          style={"marginRight": "10px", "fontWeight": "bold", "alignSelf": "center"}),
+                                dcc.Dropdown(
+                                    id="simulation-engine",
+                                    options=SIMULATION_ENGINE_OPTIONS,
+                                    value="standard",
+                                    clearable=False,
+                                    style={"width": "300px", "marginRight": "10px"}
+                                ),
+                                dcc.Input(
+                                    id="simulation-workers",
+                                    type="number",
+                                    placeholder="Workers (all cores)",
+                                    min=1,
+                                    step=1,
+                                    style={"width": "160px"}
+                                )
+                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "15px"}),
+                            html.Div([
+                                html.Label("Precision (%):",
+                                          style={"marginRight": "10px", "fontWeight": "bold", "alignSelf": "center"}),
+                                dcc.Input(
+                                    id="adaptive-precision-input",
+                                    type="number",
+                                    placeholder="5",
+                                    min=0.1,
+                                    step=0.1,
+                                    style={"width": "100px", "marginRight": "10px"}
+                                ),
+                                html.Label("Time budget (s):",
+                                          style={"marginRight": "10px", "fontWeight": "bold", "alignSelf": "center"}),
+                                dcc.Input(
+                                    id="adaptive-time-budget-input",
+                                    type="number",
+                                    placeholder="30",
+                                    min=1,
+                                    step=1,
+                                    style={"width": "100px"}
+                                )
+                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "15px"}),
+                            html.Div([
+                                html.Label("Stack:",
+                                          style={"marginRight": "10px", "fontWeight": "bold", "alignSelf": "center"}),
+                                dcc.Input(
+                                    id="stack-expression",
+                                    type="text",
+                                    placeholder="Signed sum (default), or e.g. A*cos(radians(theta)) - max(B, C)",
+                                    debounce=True,
+                                    style={"width": "100%"}
+                                )
+                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "15px"}),
+                            html.Div([
+                                html.Label("Density:",
+                                          style={"marginRight": "10px", "fontWeight": "bold", "alignSelf": "center"}),
+                                dcc.Dropdown(
+                                    id="kde-bandwidth",
+                                    options=KDE_BANDWIDTH_OPTIONS,
+                                    value="silverman",
+                                    clearable=False,
+                                    style={"width": "300px"}
+                                )
+                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "15px"}),
+                            html.Div([
+                                html.Label("Allocate:",
+                                          style={"marginRight": "10px", "fontWeight": "bold", "alignSelf": "center"}),
+                                dcc.Dropdown(
+                                    id="allocation-metric",
+                                    options=ALLOCATION_METRIC_OPTIONS,
+                                    value="cpk",
+                                    clearable=False,
+                                    style={"width": "200px", "marginRight": "10px"}
+                                ),
+                                dcc.Input(
+                                    id="allocation-target",
+                                    type="number",
+                                    placeholder="1.33",
+                                    min=0,
+                                    style={"width": "80px", "marginRight": "10px"}
+                                ),
+                                dcc.Input(
+                                    id="allocation-cost-exponent",
+                                    type="number",
+                                    placeholder="Cost k (1)",
+                                    min=0.1,
+                                    step=0.1,
+                                    style={"width": "100px", "marginRight": "10px"}
+                                ),
+                                dcc.Input(
+                                    id="allocation-weights",
+                                    type="text",
+                                    placeholder="Cost weights",
+                                    style={"width": "120px", "marginRight": "10px"}
+                                ),
+                                dbc.Button(
+                                    "Optimize Tolerances",
+                                    id="optimize-tolerances-btn",
+                                    color="secondary",
+                                    style={"height": "33px", "display": "flex", "alignItems": "center"}
                                 )
-                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "15px"})
+                            ], style={"display": "flex", "alignItems": "center", "marginBottom": "5px"}),
+                            html.Div(id="allocation-result", style={"fontSize": "0.85rem", "marginBottom": "15px"})
                         ])
                     ]),
                     html.Div(id="final-dimension-content", children=[
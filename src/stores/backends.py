@@ -0,0 +1,290 @@
+# src/stores/backends.py
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from src.stores.dimension_state import DimensionState
+
+# Seconds a SQLite writer waits for another process's lock before giving up
+SQLITE_TIMEOUT = 30.0
+
+# Shared database file used when no path is configured
+DEFAULT_SQLITE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "bayestolsim", "dimensions.sqlite3")
+
+
+def dimension_position(dim_key):
+    """Numeric position of a 'dim_<i>' key, for ordering"""
+    try:
+        return int(dim_key.split("_")[1])
+    except (IndexError, ValueError):
+        return float("inf")
+
+
+class InProcessBackend:
+    """DimensionState records in a dict per scope, for the single-process dev server
+
+    Records are copied on the way in and out so callers cannot change stored
+    state without going through set/update, exactly as with SQLite.
+    """
+
+    def __init__(self):
+        self._scopes = {}
+        self._touched = {}
+        self._lock = threading.RLock()
+
+    def get(self, scope, dim_key):
+        with self._lock:
+            record = self._scopes.get(scope, {}).get(dim_key)
+            return record.copy() if record is not None else None
+
+    def set(self, scope, dim_key, data):
+        with self._lock:
+            self._scopes.setdefault(scope, {})[dim_key] = data.copy()
+            self._touched[scope] = time.time()
+
+    def update(self, scope, dim_key, fields):
+        with self._lock:
+            self._touched[scope] = time.time()
+            dims = self._scopes.setdefault(scope, {})
+            record = dims.get(dim_key)
+            record = record.copy() if record is not None else DimensionState.for_key(dim_key)
+            record.update(**fields)
+            dims[dim_key] = record
+            return record.copy()
+
+    def remove(self, scope, dim_key):
+        with self._lock:
+            self._scopes.get(scope, {}).pop(dim_key, None)
+
+    def clear(self, scope):
+        with self._lock:
+            self._scopes.pop(scope, None)
+            self._touched.pop(scope, None)
+
+    def get_all(self, scope):
+        with self._lock:
+            # Same dim_0, dim_1, ... order as the SQLite backend
+            dims = self._scopes.get(scope, {})
+            return {key: dims[key].copy() for key in sorted(dims, key=dimension_position)}
+
+    def touch(self, scope):
+        """Mark the scope as in use now"""
+        with self._lock:
+            self._touched[scope] = time.time()
+
+    def evict_idle(self, max_idle, prefix=""):
+        """Drop scopes starting with prefix that were not used for max_idle seconds; returns their number"""
+        cutoff = time.time() - max_idle
+        with self._lock:
+            idle = [scope for scope in set(self._scopes) | set(self._touched)
+                    if scope.startswith(prefix) and self._touched.setdefault(scope, time.time()) < cutoff]
+            for scope in idle:
+                self.clear(scope)
+            return len(idle)
+
+
+class SQLiteBackend:
+    """Dimension records in a SQLite file shared by several worker processes
+
+    Every read-modify-write runs in an IMMEDIATE transaction, so concurrent
+    updates from different processes are serialized instead of lost.
+    Records are pickled DimensionState objects, so their arrays stay binary.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS dimensions ("
+            "scope TEXT NOT NULL, dim_key TEXT NOT NULL, data BLOB NOT NULL, "
+            "PRIMARY KEY (scope, dim_key))"
+        )
+        # Last use of each scope, for evict_idle
+        conn.execute("CREATE TABLE IF NOT EXISTS scope_activity (scope TEXT PRIMARY KEY, touched REAL NOT NULL)")
+
+    def _connection(self):
+        # One connection per thread (and per process, after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _read(self, conn, scope, dim_key):
+        row = conn.execute("SELECT data FROM dimensions WHERE scope = ? AND dim_key = ?", (scope, dim_key)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def _write(self, conn, scope, dim_key, data):
+        conn.execute(
+            "INSERT OR REPLACE INTO dimensions (scope, dim_key, data) VALUES (?, ?, ?)",
+            (scope, dim_key, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        )
+        self._touch(conn, scope)
+
+    def _touch(self, conn, scope):
+        conn.execute("INSERT OR REPLACE INTO scope_activity (scope, touched) VALUES (?, ?)", (scope, time.time()))
+
+    def get(self, scope, dim_key):
+        return self._read(self._connection(), scope, dim_key)
+
+    def set(self, scope, dim_key, data):
+        self._write(self._connection(), scope, dim_key, data)
+
+    def update(self, scope, dim_key, fields):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            record = self._read(conn, scope, dim_key) or DimensionState.for_key(dim_key)
+            record.update(**fields)
+            self._write(conn, scope, dim_key, record)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return record
+
+    def remove(self, scope, dim_key):
+        self._connection().execute("DELETE FROM dimensions WHERE scope = ? AND dim_key = ?", (scope, dim_key))
+
+    def clear(self, scope):
+        conn = self._connection()
+        conn.execute("DELETE FROM dimensions WHERE scope = ?", (scope,))
+        conn.execute("DELETE FROM scope_activity WHERE scope = ?", (scope,))
+
+    def get_all(self, scope):
+        rows = self._connection().execute("SELECT dim_key, data FROM dimensions WHERE scope = ?", (scope,)).fetchall()
+        # Row order of dim_0, dim_1, ... as in the dimension form
+        rows.sort(key=lambda row: dimension_position(row[0]))
+        return {dim_key: pickle.loads(data) for dim_key, data in rows}
+
+    def touch(self, scope):
+        """Mark the scope as in use now"""
+        self._touch(self._connection(), scope)
+
+    def evict_idle(self, max_idle, prefix=""):
+        """Drop scopes starting with prefix that were not used for max_idle seconds; returns their number"""
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Scopes written before activity was tracked start their idle time now
+            conn.execute("INSERT OR IGNORE INTO scope_activity (scope, touched) SELECT DISTINCT scope, ? FROM dimensions",
+                         (now,))
+            idle = [row[0] for row in conn.execute(
+                "SELECT scope FROM scope_activity WHERE touched < ? AND substr(scope, 1, ?) = ?",
+                (now - max_idle, len(prefix), prefix))]
+            for scope in idle:
+                conn.execute("DELETE FROM dimensions WHERE scope = ?", (scope,))
+                conn.execute("DELETE FROM scope_activity WHERE scope = ?", (scope,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(idle)
+
+
+class SQLiteJobBackend:
+    """Background job state in the SQLite file, so any worker process can poll or cancel a job
+
+    The process running a job publishes its state here; pollers in other
+    processes read it back and cancellation requests travel the other way
+    through the cancel_requested flag. Partial statistics and results are
+    pickled.
+    """
+
+    FIELDS = ("id", "kind", "owner", "state", "progress", "message", "partial", "result", "error",
+              "created", "finished", "cancel_requested")
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, owner TEXT, state TEXT NOT NULL, progress REAL NOT NULL, "
+            "message TEXT, partial BLOB, result BLOB, error TEXT, created REAL NOT NULL, finished REAL, "
+            "cancel_requested INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def _connection(self):
+        # One connection per thread (and per process, after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def publish(self, record):
+        """Store a job's state (a dict of FIELDS but cancel_requested); returns whether cancellation was requested"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, owner, state, progress, message, partial, result, error, created, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                "state = excluded.state, progress = excluded.progress, message = excluded.message, "
+                "partial = excluded.partial, result = excluded.result, error = excluded.error, "
+                "finished = excluded.finished",
+                (record["id"], record["kind"], record["owner"], record["state"], record["progress"], record["message"],
+                 pickle.dumps(record["partial"], protocol=pickle.HIGHEST_PROTOCOL),
+                 pickle.dumps(record["result"], protocol=pickle.HIGHEST_PROTOCOL),
+                 record["error"], record["created"], record["finished"])
+            )
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (record["id"],)).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return bool(row[0])
+
+    def load(self, job_id):
+        """A job's last published state as a dict of FIELDS, or None when unknown"""
+        row = self._connection().execute(f"SELECT {', '.join(self.FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        record = dict(zip(self.FIELDS, row))
+        record["partial"] = pickle.loads(record["partial"]) if record["partial"] is not None else None
+        record["result"] = pickle.loads(record["result"]) if record["result"] is not None else None
+        record["cancel_requested"] = bool(record["cancel_requested"])
+        return record
+
+    def request_cancel(self, job_id):
+        """Flag the job for cancellation; the process running it picks the flag up at its next progress report"""
+        self._connection().execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+
+    def purge(self, cutoff):
+        """Delete jobs that finished before the cutoff time"""
+        self._connection().execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (cutoff,))
+
+
+def create_backend(kind=None, path=None):
+    """Backend from its name: 'memory' (default) or 'sqlite'"""
+    kind = kind or "memory"
+    if kind == "memory":
+        return InProcessBackend()
+    elif kind == "sqlite":
+        return SQLiteBackend(path or DEFAULT_SQLITE_PATH)
+    raise ValueError(f"Unknown dimension store backend: {kind}")
+
+
+def create_job_backend(kind=None, path=None):
+    """Shared job backend for the dimension store's backend name: None for 'memory', whose jobs stay in their process"""
+    kind = kind or "memory"
+    if kind == "memory":
+        return None
+    elif kind == "sqlite":
+        return SQLiteJobBackend(path or DEFAULT_SQLITE_PATH)
+    raise ValueError(f"Unknown dimension store backend: {kind}")
@@ -0,0 +1,73 @@
+# src/stores/dimension_state.py
+
+from dataclasses import dataclass, field, fields, replace
+import numpy as np
+
+# Fields holding raw measurements, kept as contiguous float64 arrays
+ARRAY_FIELDS = ("mle_data", "bayes_data")
+
+
+def _empty_data():
+    return np.empty(0, dtype=np.float64)
+
+
+@dataclass(slots=True)
+class DimensionState:
+    """Everything stored for one dimension of the chain
+
+    Measurement data lives in contiguous float64 arrays (8 bytes per value)
+    rather than Python lists; assigning a list through update() converts it.
+    """
+
+    # Entered definition
+    name: str | None = None
+    dist: str | None = None
+    para1: float | str | None = None
+    para2: float | str | None = None
+
+    # Design tolerances
+    nominal: float | None = None
+    upper_tol: float | None = None
+    lower_tol: float | None = None
+
+    # MLE fit of uploaded production data
+    mle_applied: bool = False
+    mle_para1: float | None = None
+    mle_para2: float | None = None
+    mle_data: np.ndarray = field(default_factory=_empty_data)
+
+    # Bayesian updating with trial data
+    bayes_applied: bool = False
+    bayes_iterations: int = 0
+    prior_para1: float | None = None
+    prior_para2: float | None = None
+    likelihood_para1: float | None = None
+    likelihood_para2: float | None = None
+    posterior_para1: float | None = None
+    posterior_para2: float | None = None
+    prior_params_full: dict | None = None
+    bayes_data: np.ndarray = field(default_factory=_empty_data)
+
+    def __post_init__(self):
+        for name in ARRAY_FIELDS:
+            setattr(self, name, np.ascontiguousarray(getattr(self, name), dtype=np.float64))
+
+    @classmethod
+    def for_key(cls, dim_key):
+        """Empty record for a 'dim_<i>' key, named after its position"""
+        return cls(name=f"Dim {dim_key.split('_')[1]}")
+
+    def update(self, **values):
+        """Set several fields at once; unknown field names raise AttributeError"""
+        for name, value in values.items():
+            if name in ARRAY_FIELDS:
+                value = np.ascontiguousarray(value, dtype=np.float64)
+            setattr(self, name, value)
+        return self
+
+    def copy(self):
+        """Shallow copy; arrays are shared, so replace them rather than editing in place"""
+        return replace(self)
+
+    def as_dict(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
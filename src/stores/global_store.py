@@ -1,43 +1,124 @@
 # src/stores/global_store.py
 
-# Global storage dictionary for saving dimension data
-dimensions_store = {}
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from src.stores.backends import create_backend
+
+# Backend is chosen at start-up: BAYESTOLSIM_STORE_BACKEND=memory (default) or sqlite,
+# with BAYESTOLSIM_STORE_PATH pointing at the shared database file
+store_backend = create_backend(os.environ.get("BAYESTOLSIM_STORE_BACKEND"), os.environ.get("BAYESTOLSIM_STORE_PATH"))
+
+# Setting BAYESTOLSIM_PROJECT shares one set of dimensions between all sessions
+PROJECT_SCOPE = os.environ.get("BAYESTOLSIM_PROJECT")
+
+# Cookie identifying a browser session when no project scope is set
+SESSION_COOKIE = "bayestolsim_session"
+
+DEFAULT_SCOPE = "default"
+
+# Browser-session scopes unused for this many seconds are deleted with their data; 0 keeps them forever.
+# Project and default scopes never expire.
+SESSION_TTL = float(os.environ.get("BAYESTOLSIM_SESSION_TTL") or 24 * 3600)
+
+# A session's last use is written at most this often, and idle sessions are looked for at most this often (seconds)
+SESSION_TOUCH_INTERVAL = 60.0
+SESSION_EVICT_INTERVAL = 600.0
+
+_session_activity = {}
+_session_lock = threading.Lock()
+_last_eviction = 0.0
+
+# Scope of the current request (set per request by init_session_scope)
+_current_scope = ContextVar("dimension_store_scope", default=None)
+
+
+def current_scope():
+    """Project name, browser session id, or the default scope outside a request"""
+    if PROJECT_SCOPE:
+        return f"project:{PROJECT_SCOPE}"
+    return _current_scope.get() or DEFAULT_SCOPE
+
+
+def set_current_scope(scope):
+    """Set the scope used by this thread/context, returning a reset token"""
+    return _current_scope.set(scope)
+
+
+def init_session_scope(server):
+    """Scope dimension data by a session cookie on every request of the Flask server"""
+    from flask import g, request
+
+    @server.before_request
+    def _bind_session_scope():
+        session_id = request.cookies.get(SESSION_COOKIE)
+        g.new_session_id = None
+        if not session_id:
+            session_id = uuid.uuid4().hex
+            g.new_session_id = session_id
+        set_current_scope(f"session:{session_id}")
+        if SESSION_TTL > 0:
+            track_session_activity(f"session:{session_id}")
+
+    @server.after_request
+    def _issue_session_cookie(response):
+        if getattr(g, "new_session_id", None):
+            response.set_cookie(SESSION_COOKIE, g.new_session_id, httponly=True, samesite="Lax")
+        return response
+
+
+def track_session_activity(scope):
+    """Record that a session scope is in use and now and then evict idle ones
+
+    Both are throttled per process, so a request normally costs a dict
+    lookup; with the SQLite backend the activity is shared by all workers.
+    """
+    global _last_eviction
+    now = time.time()
+    with _session_lock:
+        touch = now - _session_activity.get(scope, 0.0) >= SESSION_TOUCH_INTERVAL
+        if touch:
+            _session_activity[scope] = now
+        evict = now - _last_eviction >= SESSION_EVICT_INTERVAL
+        if evict:
+            _last_eviction = now
+            cutoff = now - SESSION_TTL
+            for idle in [s for s, touched in _session_activity.items() if touched < cutoff]:
+                del _session_activity[idle]
+    if touch:
+        store_backend.touch(scope)
+    if evict:
+        store_backend.evict_idle(SESSION_TTL, prefix="session:")
+
 
 def get_dimension(dim_key):
-    """Get data for specified dimension"""
-    return dimensions_store.get(dim_key)
+    """Get the DimensionState of specified dimension, or None"""
+    return store_backend.get(current_scope(), dim_key)
 
 def set_dimension(dim_key, data):
-    """Set data for specified dimension"""
-    dimensions_store[dim_key] = data
+    """Set the DimensionState of specified dimension"""
+    store_backend.set(current_scope(), dim_key, data)
 
 def update_dimension(dim_key, **kwargs):
-    """Update partial data for specified dimension"""
-    if dim_key not in dimensions_store:
-        dimensions_store[dim_key] = {
-            "name": f"Dim {dim_key.split('_')[1]}",
-            "dist": None,
-            "para1": None,
-            "para2": None
-        }
-    
-    for key, value in kwargs.items():
-        dimensions_store[dim_key][key] = value
+    """Update fields of specified dimension, creating it if needed; returns the updated DimensionState"""
+    return store_backend.update(current_scope(), dim_key, kwargs)
 
 def remove_dimension(dim_key):
     """Remove specified dimension"""
-    dimensions_store.pop(dim_key, None)
+    store_backend.remove(current_scope(), dim_key)
 
 def clear_all_dimensions():
     """Clear all dimension data"""
-    dimensions_store.clear()
+    store_backend.clear(current_scope())
 
 def get_all_dimensions():
-    """Get all dimension data"""
-    return dimensions_store.copy()
+    """Get all DimensionState records, keyed by 'dim_<i>'"""
+    return store_backend.get_all(current_scope())
 
 def print_store_status():
     """Print current storage status (for debugging)"""
-    print("Current dimensions_store:")
-    for key, value in dimensions_store.items():
-        print(f"  {key}: {value}")
\ No newline at end of file
+    print(f"Current dimensions_store ({current_scope()}):")
+    for key, value in get_all_dimensions().items():
+        print(f"  {key}: {value}")
@@ -0,0 +1,229 @@
+# src/utils/adaptive_sampling.py
+
+import time
+import numpy as np
+from scipy.stats import norm
+from src.utils.jobs import report_progress
+from src.utils.metrics import instrumented
+from src.utils.simulation_engine import (
+    DEFAULT_CHUNK_SIZE,
+    dimension_stream,
+    iter_chain_chunks,
+    resolve_seed
+)
+from src.utils.streaming_stats import DEFAULT_HIST_BINS, StreamingSummary, chain_histogram_range
+
+# Samples drawn before the first precision check
+INITIAL_BATCH_SIZE = 10_000
+
+# Default relative half-width of the confidence intervals at which to stop
+DEFAULT_RELATIVE_PRECISION = 0.05
+
+# Default two-sided confidence level of the reported intervals
+DEFAULT_CONFIDENCE = 0.95
+
+# A tail whose upper confidence bound falls below this fraction counts as resolved
+DEFAULT_TAIL_FLOOR = 1e-5
+
+# Default wall-clock budget in seconds
+DEFAULT_TIME_BUDGET = 30.0
+
+
+class CentralMoments:
+    """Running power sums up to the fourth order around a fixed shift
+
+    The shift (the analytic chain mean) keeps the float64 sums well
+    conditioned; the kurtosis drives the width of the std and Cpk intervals.
+    """
+
+    def __init__(self, shift=0.0):
+        self.shift = shift
+        self.count = 0
+        self.sums = np.zeros(4)
+
+    def update(self, values):
+        centred = np.asarray(values, dtype=np.float64) - self.shift
+        power = centred.copy()
+        self.sums[0] += power.sum()
+        for k in range(1, 4):
+            power *= centred
+            self.sums[k] += power.sum()
+        self.count += centred.size
+
+    def kurtosis(self):
+        """Sample kurtosis m4 / m2**2 (3 for a normal distribution)"""
+        n = self.count
+        if n < 4:
+            return 3.0
+        s1, s2, s3, s4 = self.sums / n
+        m2 = s2 - s1**2
+        m4 = s4 - 4 * s1 * s3 + 6 * s1**2 * s2 - 3 * s1**4
+        return float(m4 / m2**2) if m2 > 0 else 3.0
+
+
+def wilson_interval(successes, n, z):
+    """Wilson score interval for a binomial fraction"""
+    p = successes / n
+    denominator = 1 + z**2 / n
+    centre = (p + z**2 / (2 * n)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominator
+    return max(0.0, centre - half_width), min(1.0, centre + half_width)
+
+
+def confidence_intervals(stream, higher, spec_limits=None, confidence=DEFAULT_CONFIDENCE):
+    """Confidence intervals on mean, std, Cpk and the two tail fractions
+
+    Mean and std use the normal approximation with the sample kurtosis, Cpk
+    uses Bissell's delta-method variance generalised to non-normal kurtosis,
+    and the tail fractions use Wilson score intervals.
+    """
+    z = float(norm.ppf(0.5 + confidence / 2))
+    n = stream.moments.count
+    mean = stream.moments.mean
+    std = stream.moments.std
+    kurtosis = higher.kurtosis()
+
+    mean_hw = z * std / np.sqrt(n)
+    std_hw = z * std * np.sqrt(max(kurtosis - 1, 0.0) / (4 * n))
+    intervals = {
+        "mean": (mean, mean - mean_hw, mean + mean_hw),
+        "std": (std, std - std_hw, std + std_hw),
+    }
+
+    if spec_limits is not None and std > 0:
+        LSL, USL = spec_limits
+        cpk = min(USL - mean, mean - LSL) / (3 * std)
+        cpk_hw = z * np.sqrt(1 / (9 * n) + cpk**2 * max(kurtosis - 1, 0.0) / (4 * n))
+        intervals["cpk"] = (cpk, cpk - cpk_hw, cpk + cpk_hw)
+
+    if spec_limits is not None:
+        for key, count in (("cdf_at_lsl", stream.below_lsl), ("cdf_right_of_usl", stream.above_usl)):
+            intervals[key] = (count / n,) + wilson_interval(count, n, z)
+
+    return intervals
+
+
+def precision_reached(intervals, relative_precision, tail_floor=DEFAULT_TAIL_FLOOR):
+    """Whether every interval is narrow enough to stop
+
+    Mean and std half-widths are measured against the std (the mean of a
+    gap chain can be zero); Cpk against its own magnitude. A tail fraction is
+    resolved when its half-width is within the target relative to the
+    estimate, or when its upper bound is below ``tail_floor``.
+    """
+    std = intervals["std"][0]
+    for key, (estimate, lower, upper) in intervals.items():
+        half_width = (upper - lower) / 2
+        if key in ("mean", "std"):
+            converged = half_width <= relative_precision * std
+        elif key == "cpk":
+            converged = half_width <= relative_precision * abs(estimate)
+        else:
+            converged = upper < tail_floor or (estimate > 0 and half_width <= relative_precision * estimate)
+        if not converged:
+            return False
+    return True
+
+
+def next_batch_size(n, intervals, relative_precision, chunk_size, tail_floor=DEFAULT_TAIL_FLOOR):
+    """Project the samples still needed from the slowest interval, at most doubling n
+
+    Half-widths shrink like 1/sqrt(n); the upper bound of an empty or tiny
+    tail shrinks like 1/n, so whichever stopping rule is closer is projected.
+    """
+    std = intervals["std"][0]
+    needed = n
+    for key, (estimate, lower, upper) in intervals.items():
+        half_width = (upper - lower) / 2
+        scale = std if key in ("mean", "std") else abs(estimate)
+        projected = n * (half_width / (relative_precision * scale))**2 if scale > 0 else np.inf
+        if key.startswith("cdf"):
+            projected = min(projected, n * upper / tail_floor)
+        needed = max(needed, projected)
+    return int(min(max(np.ceil(needed) - n, INITIAL_BATCH_SIZE), n, chunk_size))
+
+
+class AdaptiveRun:
+    """Result of an adaptive run: the streaming statistics plus the stop report"""
+
+    def __init__(self, stream, intervals, reason, elapsed, max_samples):
+        self.stream = stream
+        self.intervals = intervals
+        self.reason = reason
+        self.elapsed = elapsed
+        self.max_samples = max_samples
+
+    @property
+    def samples_used(self):
+        return self.stream.moments.count
+
+
+@instrumented("sampling")
+def run_adaptive_chain(chain, max_samples, relative_precision=DEFAULT_RELATIVE_PRECISION, time_budget=DEFAULT_TIME_BUDGET,
+                       seed=None, spec_limits=None, confidence=DEFAULT_CONFIDENCE, tail_floor=DEFAULT_TAIL_FLOOR,
+                       use_float32=False, chunk_size=DEFAULT_CHUNK_SIZE, hist_bins=DEFAULT_HIST_BINS):
+    """Draw batches until the confidence intervals reach the target precision
+
+    Stops on precision, on ``max_samples`` or on ``time_budget`` seconds,
+    whichever comes first. Batches continue the same per-dimension streams,
+    so for a given seed the samples drawn are a prefix of the standard run.
+    """
+    start_time = time.perf_counter()
+    max_samples = int(max_samples)
+    entropy = resolve_seed(seed)
+    n_dims = len(chain["codes"])
+    rngs = [dimension_stream(entropy, k) for k in range(n_dims)]
+
+    hist_range = chain_histogram_range(chain)
+    stream = StreamingSummary(
+        spec_limits=spec_limits,
+        hist_range=hist_range,
+        hist_bins=hist_bins,
+        sketch_seed=entropy
+    )
+    higher = CentralMoments(shift=(hist_range[0] + hist_range[1]) / 2)
+
+    batch = min(INITIAL_BATCH_SIZE, max_samples)
+    while True:
+        for chunk in iter_chain_chunks(chain, batch, use_float32=use_float32, chunk_size=chunk_size, rngs=rngs):
+            stream.update(chunk)
+            higher.update(chunk)
+            report_progress(stream.moments.count / max_samples, partial=stream.summary)
+
+        n = stream.moments.count
+        intervals = confidence_intervals(stream, higher, spec_limits, confidence)
+        elapsed = time.perf_counter() - start_time
+
+        if precision_reached(intervals, relative_precision, tail_floor):
+            reason = "precision reached"
+        elif n >= max_samples:
+            reason = "sample budget reached"
+        elif time_budget is not None and elapsed >= time_budget:
+            reason = "time budget reached"
+        else:
+            batch = min(next_batch_size(n, intervals, relative_precision, chunk_size, tail_floor), max_samples - n)
+            continue
+
+        return AdaptiveRun(stream, intervals, reason, elapsed, max_samples)
+
+
+def format_adaptive_notes(run, relative_precision, confidence=DEFAULT_CONFIDENCE):
+    """Stats panel lines describing the stop reason and the confidence intervals"""
+    labels = {
+        "mean": "Mean",
+        "std": "Std Dev",
+        "cpk": "Cpk",
+        "cdf_at_lsl": "CDF left of LSL",
+        "cdf_right_of_usl": "CDF right of USL",
+    }
+    notes = [
+        f"Engine: Adaptive (target ±{relative_precision * 100:g}%, {run.reason} after {run.elapsed:.2f} s)",
+        f"Samples used: {run.samples_used:,} of {run.max_samples:,} allowed",
+        f"{confidence * 100:g}% confidence intervals:",
+    ]
+    for key, (estimate, lower, upper) in run.intervals.items():
+        if key.startswith("cdf"):
+            notes.append(f"  {labels[key]}: {lower * 1e6:.1f} - {upper * 1e6:.1f} ppm")
+        else:
+            notes.append(f"  {labels[key]}: {lower:.4f} - {upper:.4f}")
+    return notes
@@ -0,0 +1,184 @@
+# src/utils/api_service.py
+
+import contextlib
+import io
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.utils.batch_runner import RESULT_COLUMNS, evaluate_definition
+from src.utils.bayesian_calculations import calculate_prior_parameters
+from src.utils.chain_definitions import ChainDefinitionError, bayesian_posterior, measurement_datasets
+from src.utils.measurements import summarize_measurements
+from src.utils.simulation_engine import DIST_CODES
+from src.utils.tolerance_params import tolerance_to_params
+
+# Worker processes behind the JSON API; BAYESTOLSIM_API_WORKERS overrides the default, 1 runs requests in-process
+API_WORKERS = int(os.environ.get("BAYESTOLSIM_API_WORKERS") or 0) or (os.cpu_count() or 1)
+
+# Largest batch accepted in one request
+API_MAX_ITEMS = 1000
+
+# Largest sample count accepted per chain
+API_MAX_SAMPLES = 10_000_000
+
+# Items handed to a worker at a time, per worker; large batches then cost few round trips
+ITEMS_PER_CHUNK = 8
+
+
+class ApiRequestError(ValueError):
+    """A request body that cannot be evaluated at all (as opposed to one failing item of a batch)"""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker():
+    """Runs once per worker so the first real request does not pay for process start-up and imports"""
+    return os.getpid()
+
+
+def get_api_pool():
+    """Shared process pool of the API, started on first use and kept warm for later requests"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=API_WORKERS)
+            for _ in range(API_WORKERS):
+                _pool.submit(_warm_worker)
+        return _pool
+
+
+def map_items(fn, items):
+    """fn over items in order, on the warm pool when there is more than one item to spread"""
+    if API_WORKERS <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    chunksize = max(1, min(ITEMS_PER_CHUNK, len(items) // API_WORKERS))
+    return list(get_api_pool().map(fn, items, chunksize=chunksize))
+
+
+def batch_items(body, key):
+    """(items, batched) of a request body: a single object, or a batch under key"""
+    if not isinstance(body, dict):
+        raise ApiRequestError("The request body must be a JSON object")
+    if key not in body:
+        return [body], False
+    items = body[key]
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ApiRequestError(f"'{key}' must be a list of objects")
+    if len(items) > API_MAX_ITEMS:
+        raise ApiRequestError(f"At most {API_MAX_ITEMS} {key} per request, got {len(items)}")
+    return items, True
+
+
+def json_safe(value):
+    """value with NumPy scalars and arrays made plain, and NaN/inf replaced by None (not valid JSON)"""
+    if isinstance(value, dict):
+        return {str(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _error(e):
+    return {"status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def _distribution(item):
+    dist = item.get("distribution", item.get("dist"))
+    if dist not in DIST_CODES:
+        raise ChainDefinitionError(f"Unsupported distribution {dist!r} (use one of {', '.join(DIST_CODES)})")
+    return dist
+
+
+def prior_result(item):
+    """Prior hyperparameters and tolerance-derived parameters of one dimension"""
+    try:
+        dist = _distribution(item)
+        nominal, upper_tol, lower_tol = item.get("nominal"), item.get("upper_tol"), item.get("lower_tol")
+        # The estimators report progress with print(); keep server output clean
+        with contextlib.redirect_stdout(io.StringIO()):
+            prior_params, error = calculate_prior_parameters(dist, nominal, upper_tol, lower_tol)
+        if prior_params is None:
+            raise ChainDefinitionError(error)
+        para1, para2 = tolerance_to_params(dist, nominal, upper_tol, lower_tol)
+        return json_safe({"status": "ok", "distribution": dist, "prior_params": prior_params,
+                          "para1": float(para1), "para2": float(para2)})
+    except Exception as e:
+        return _error(e)
+
+
+def posterior_result(item):
+    """Posterior point estimates of one dimension from raw measurements or their summaries
+
+    Measurements come as "data" (one list of values), "summary" (one
+    summary dict) or "measurements" (a list of either, applied as sequential
+    updates). "posterior": {"para1", "para2"} continues from an earlier
+    posterior instead of the tolerance prior.
+    """
+    try:
+        dist = _distribution(item)
+        if item.get("measurements") is not None:
+            measurements = item["measurements"]
+        elif item.get("data") is not None:
+            measurements = [item["data"]]
+        elif item.get("summary") is not None:
+            measurements = [item["summary"]]
+        else:
+            raise ChainDefinitionError("Give 'data', 'summary' or 'measurements'")
+        previous = item.get("posterior")
+        if previous is not None:
+            previous = (previous["para1"], previous["para2"])
+
+        datasets = measurement_datasets(measurements, item.get("name", ""), base_dir=None)
+        if item.get("seed") is not None:
+            # The uniform update draws its MCMC steps from the global NumPy generator
+            np.random.seed(int(item["seed"]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            posterior = bayesian_posterior(dist, item.get("nominal"), item.get("upper_tol"), item.get("lower_tol"),
+                                           datasets, item.get("name", ""), posterior=previous)
+
+        summaries = [d if isinstance(d, dict) else summarize_measurements(d) for d in datasets]
+        return json_safe({"status": "ok", "distribution": dist, **posterior, "summaries": summaries})
+    except Exception as e:
+        return _error(e)
+
+
+def stackup_result(job):
+    """Final dimension statistics of one chain definition; job is (definition, defaults)"""
+    definition, defaults = job
+    try:
+        too_many = int(definition.get("samples") or defaults.get("samples") or 0) > API_MAX_SAMPLES
+    except (TypeError, ValueError):
+        too_many = False  # evaluate_definition reports the bad value
+    if too_many:
+        row = dict.fromkeys(RESULT_COLUMNS)
+        row.update(chain=definition.get("name") or "api", source="api", status="error",
+                   error=f"ValueError: at most {API_MAX_SAMPLES:,} samples per chain")
+        return row
+    # base_dir None: measurements must be sent inline, the API reads no server files
+    return json_safe(evaluate_definition(("api", None, definition, defaults)))
+
+
+def evaluate_stackups(body):
+    """Results for a stack-up request body: one chain definition, or {"chains": [...]} with shared defaults"""
+    chains, batched = batch_items(body, "chains")
+    defaults = {key: body.get(key) for key in ("engine", "samples", "seed")} if batched else {}
+    return map_items(stackup_result, [(chain, defaults) for chain in chains]), batched
+
+
+def batch_response(results, started):
+    """Response body of a batch request"""
+    return {
+        "results": results,
+        "count": len(results),
+        "failed": sum(1 for result in results if result.get("status") != "ok"),
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,201 @@
+# src/utils/batch_runner.py
+
+import contextlib
+import csv
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.utils.adaptive_sampling import DEFAULT_RELATIVE_PRECISION, DEFAULT_TIME_BUDGET, run_adaptive_chain
+from src.utils.chain_definitions import build_definition_chain, definition_spec_limits, resolve_dimension, stack_nominal
+from src.utils.convolution_engine import convolve_chain, summarize_convolution
+from src.utils.final_statistics import summarize_samples
+from src.utils.importance_sampling import IMPORTANCE_PILOT_SAMPLES, rare_event_tails
+from src.utils.qmc_engine import QMC_SEQUENCES, run_qmc_replicates
+from src.utils.simulation_engine import simulate_chain
+from src.utils.streaming_stats import summarize_chain_stream
+
+# Engines available without the dashboard; "parallel" is left out because chains already run one per worker
+BATCH_ENGINES = ("standard", "streaming", "convolution", "adaptive", "importance") + QMC_SEQUENCES
+
+# Samples per chain when neither the definition nor the command line sets them
+DEFAULT_BATCH_SAMPLES = 100_000
+
+# Chains in flight per worker; bounds memory while keeping every worker busy
+JOBS_PER_WORKER = 4
+
+# Rows buffered into one Parquet row group
+PARQUET_ROW_GROUP = 256
+
+# One row per chain, in this column order
+RESULT_COLUMNS = (
+    "chain", "source", "status", "error", "engine", "dimensions", "methods", "samples", "mean", "std", "median",
+    "p5", "p95", "min", "max", "nominal", "lsl", "usl", "cp", "cpk", "cdf_at_lsl", "cdf_right_of_usl", "ppm_out",
+    "elapsed",
+)
+
+
+def stackup_summary(chain, engine, num_samples, spec_limits=None, seed=None, relative_precision=None, time_budget=None):
+    """Final dimension statistics of a chain from one engine, as (summary, samples_used)
+
+    The same engines as the dashboard's final dimension panel, without
+    building any plot data.
+    """
+    if engine == "convolution":
+        if chain.get("expression") is not None:
+            raise ValueError("The convolution engine needs a linear stack")
+        return summarize_convolution(convolve_chain(chain), spec_limits), None
+    if engine == "adaptive":
+        run = run_adaptive_chain(chain, num_samples, relative_precision=relative_precision or DEFAULT_RELATIVE_PRECISION,
+                                 time_budget=time_budget or DEFAULT_TIME_BUDGET, seed=seed, spec_limits=spec_limits)
+        return run.stream.summary(), run.samples_used
+    if engine in QMC_SEQUENCES:
+        final_samples, _ = run_qmc_replicates(chain, num_samples, sequence=engine, seed=seed, spec_limits=spec_limits)
+        return summarize_samples(final_samples, spec_limits), final_samples.size
+    if engine in ("streaming", "importance"):
+        if engine == "importance":
+            # Central statistics from a pilot run; the tail estimator has its own budget
+            num_samples = min(num_samples, IMPORTANCE_PILOT_SAMPLES)
+        summary = summarize_chain_stream(chain, num_samples, seed=seed, spec_limits=spec_limits).summary()
+        if engine == "importance" and spec_limits is not None:
+            tails = rare_event_tails(chain, spec_limits, seed=seed)
+            summary["cdf_at_lsl"] = tails["cdf_at_lsl"]["probability"]
+            summary["cdf_right_of_usl"] = tails["cdf_right_of_usl"]["probability"]
+        return summary, num_samples
+    if engine == "standard":
+        final_samples = simulate_chain(chain, num_samples, seed=seed)
+        return summarize_samples(final_samples, spec_limits), final_samples.size
+    raise ValueError(f"Unknown engine {engine!r} (batch engines: {', '.join(BATCH_ENGINES)})")
+
+
+def evaluate_definition(job):
+    """Result row of one chain definition; failures become a row with status 'error'
+
+    job is (source, base_dir, definition, defaults) where defaults fill in
+    engine, samples and seed missing from the definition.
+    """
+    source, base_dir, definition, defaults = job
+    started = time.perf_counter()
+    row = dict.fromkeys(RESULT_COLUMNS)
+    row.update(chain=definition.get("name") or source, source=source, status="ok")
+
+    try:
+        engine = definition.get("engine") or defaults.get("engine") or "standard"
+        num_samples = int(definition.get("samples") or defaults.get("samples") or DEFAULT_BATCH_SAMPLES)
+        seed = definition.get("seed", defaults.get("seed"))
+        row.update(engine=engine)
+
+        if seed is not None:
+            # The uniform Bayesian update draws its MCMC steps from the global NumPy generator
+            np.random.seed(int(seed))
+        # The estimators report progress with print(); keep worker output to the progress lines
+        with contextlib.redirect_stdout(io.StringIO()):
+            dimensions = [resolve_dimension(dimension, base_dir) for dimension in definition.get("dimensions") or []]
+        if not dimensions:
+            raise ValueError("Chain has no dimensions")
+
+        expression = definition.get("expression")
+        chain = build_definition_chain(dimensions, expression)
+        spec_limits = definition_spec_limits(definition, dimensions)
+        summary, samples_used = stackup_summary(chain, engine, num_samples, spec_limits, seed=seed,
+                                                relative_precision=definition.get("relative_precision"),
+                                                time_budget=definition.get("time_budget"))
+
+        row.update(
+            dimensions=len(dimensions),
+            methods=",".join(d["method"] for d in dimensions),
+            samples=samples_used,
+            **{key: summary[key] for key in ("mean", "std", "median", "p5", "p95", "min", "max", "cdf_at_lsl", "cdf_right_of_usl")}
+        )
+        if spec_limits is not None:
+            LSL, USL = spec_limits
+            row.update(nominal=stack_nominal(dimensions, expression), lsl=LSL, usl=USL)
+            std = summary["std"]
+            if std > 0:
+                row["cp"] = (USL - LSL) / (6 * std)
+                row["cpk"] = min(USL - summary["mean"], summary["mean"] - LSL) / (3 * std)
+            row["ppm_out"] = (summary["cdf_at_lsl"] + summary["cdf_right_of_usl"]) * 1e6
+
+    except Exception as e:
+        row.update(status="error", error=f"{type(e).__name__}: {e}")
+
+    row["elapsed"] = time.perf_counter() - started
+    return row
+
+
+def iter_batch_results(jobs, workers=1):
+    """Evaluate jobs on a process pool and yield their rows in input order as they complete"""
+    if workers <= 1:
+        for job in jobs:
+            yield evaluate_definition(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(evaluate_definition, job))
+            if len(pending) >= workers * JOBS_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class CsvResultWriter:
+    """Result rows written to CSV and flushed one by one, so partial output survives an interrupted run"""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=RESULT_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetResultWriter:
+    """Result rows written to Parquet in row groups of PARQUET_ROW_GROUP rows (needs pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from None
+
+        self.pa = pa
+        text = ("chain", "source", "status", "error", "engine", "methods")
+        integer = ("dimensions", "samples")
+        self.schema = pa.schema([
+            (name, pa.string() if name in text else pa.int64() if name in integer else pa.float64())
+            for name in RESULT_COLUMNS
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= PARQUET_ROW_GROUP:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def open_result_writer(path, output_format=None):
+    """CSV or Parquet writer, chosen by output_format or else by the file extension"""
+    output_format = output_format or ("parquet" if os.path.splitext(path)[1].lower() in (".parquet", ".pq") else "csv")
+    if output_format == "parquet":
+        return ParquetResultWriter(path)
+    return CsvResultWriter(path)
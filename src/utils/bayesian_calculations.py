@@ -5,6 +5,8 @@ import pandas as pd
 from scipy import stats
 from scipy.optimize import minimize
 import warnings
+from src.utils.jobs import report_progress
+from src.utils.metrics import instrumented
 
 def calculate_prior_parameters(distribution, nominal, upper_tol, lower_tol):
     """Calculate prior distribution parameters from tolerance specifications"""
@@ -310,6 +312,7 @@ def bayesian_update_uniform(data, prior_params):
         if i >= burn_in:
             a_samples.append(a_current)
             b_samples.append(b_current)
+        report_progress((i + 1) / (n_samples + burn_in))
     
     # Posterior estimates
     a_posterior = np.mean(a_samples)
@@ -436,4 +439,25 @@ def create_prior_from_posterior(distribution, post_para1, post_para2):
             
     except Exception as e:
         print(f"Error creating prior from posterior: {e}")
-        return None
\ No newline at end of file
+        return None
+
+@instrumented("bayesian_update", samples="data")
+def perform_bayesian_update(data, distribution, prior_params):
+    """Perform Bayesian updating based on distribution type"""
+    try:
+        if distribution == "normal":
+            return bayesian_update_normal(data, prior_params)
+        elif distribution == "gamma":
+            return bayesian_update_gamma(data, prior_params)
+        elif distribution == "lognormal":
+            return bayesian_update_lognormal(data, prior_params)
+        elif distribution == "uniform":
+            return bayesian_update_uniform(data, prior_params)
+        else:
+            print(f"Unsupported distribution for Bayesian updating: {distribution}")
+            return None, None
+    except Exception as e:
+        print(f"Error in Bayesian updating for {distribution}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None, None
@@ -0,0 +1,291 @@
+# src/utils/benchmarks.py
+
+import contextlib
+import io
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import scipy
+from src.callbacks.final_dimension_simulation import (calculate_final_dimension_statistics,
+                                                      create_final_dimension_plot_with_data, run_monte_carlo_simulation)
+from src.stores.dimension_state import DimensionState
+from src.stores.global_store import set_current_scope, set_dimension
+from src.utils import bayesian_calculations
+from src.utils.measurements import load_measurements
+from src.utils.mle_calculations import calculate_mle_parameters
+from src.utils.simulation_engine import build_chain, simulate_chain
+from src.utils.tolerance_params import tolerance_to_params
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+# Dimension types of the synthetic chains, cycled in this order
+BENCHMARK_DISTRIBUTIONS = ("normal", "lognormal", "gamma", "uniform")
+
+# Problem sizes; "full" covers everything up to 300 dimensions and 1e8 samples
+BENCHMARK_PRESETS = {
+    "quick": {"dimensions": (3, 30), "samples": (10_000, 100_000, 1_000_000), "measurements": (30, 1_000, 100_000)},
+    "full": {
+        "dimensions": (3, 30, 300),
+        "samples": (10_000, 100_000, 1_000_000, 10_000_000, 100_000_000),
+        "measurements": (30, 1_000, 100_000, 1_000_000),
+    },
+}
+
+# Hot paths timed by the suite
+BENCHMARK_GROUPS = ("simulation", "plot", "statistics", "mle", "bayes", "csv")
+
+# Dimension columns of the CSV ingestion files
+CSV_COLUMNS = 30
+
+# Relative slowdown (wall time) and growth (peak RSS) over the baseline reported as regressions
+DEFAULT_TIME_THRESHOLD = 0.15
+DEFAULT_RSS_THRESHOLD = 0.10
+
+# Slowdowns smaller than this (seconds) are timer and scheduler noise, whatever the ratio
+TIME_NOISE_FLOOR = 0.002
+
+
+def synthetic_dimensions(num_dimensions):
+    """Reproducible dimensions cycling through the four distributions
+
+    Dimension i has nominal 10 + i and a symmetric tolerance band of
+    +/-0.05 * (1 + i % 5); parameters come from the same tolerance mapping
+    as the dimension cards.
+    """
+    dimensions = []
+    for i in range(num_dimensions):
+        dist = BENCHMARK_DISTRIBUTIONS[i % len(BENCHMARK_DISTRIBUTIONS)]
+        nominal, tol = 10.0 + i, 0.05 * (1 + i % 5)
+        para1, para2 = tolerance_to_params(dist, nominal, tol, -tol)
+        dimensions.append({
+            "name": f"D{i + 1}",
+            "dist": dist,
+            "para1": float(para1),
+            "para2": float(para2),
+            "dir": "-" if i % 3 == 2 else "+",
+            "nominal": nominal,
+            "upper_tol": tol,
+            "lower_tol": -tol,
+        })
+    return dimensions
+
+
+def synthetic_measurements(dist, size, seed=0):
+    """Measurements of the first synthetic dimension with the given distribution"""
+    dimension = synthetic_dimensions(len(BENCHMARK_DISTRIBUTIONS))[BENCHMARK_DISTRIBUTIONS.index(dist)]
+    rng = np.random.default_rng(seed)
+    para1, para2 = dimension["para1"], dimension["para2"]
+    if dist == "normal":
+        return dimension, rng.normal(para1, para2, size)
+    if dist == "lognormal":
+        return dimension, rng.lognormal(para1, para2, size)
+    if dist == "gamma":
+        return dimension, rng.gamma(para1, para2, size)
+    return dimension, rng.uniform(para1, para2, size)
+
+
+def benchmark_cases(preset="quick", only=None):
+    """Cases of a preset as dicts with name, group and params; only keeps names containing any of its strings"""
+    sizes = BENCHMARK_PRESETS[preset]
+    cases = []
+
+    def add(group, label, **params):
+        cases.append({"name": f"{group}[{label}]", "group": group, "params": params})
+
+    for dims in sizes["dimensions"]:
+        for n in sizes["samples"]:
+            add("simulation", f"dims={dims},n={n:.0e}", dimensions=dims, samples=n)
+    for n in sizes["samples"]:
+        add("plot", f"n={n:.0e}", samples=n)
+        add("statistics", f"n={n:.0e}", samples=n)
+    for dist in BENCHMARK_DISTRIBUTIONS:
+        for n in sizes["measurements"]:
+            add("mle", f"{dist},n={n:.0e}", dist=dist, size=n)
+            add("bayes", f"{dist},n={n:.0e}", dist=dist, size=n)
+    for n in sizes["measurements"]:
+        add("csv", f"rows={n:.0e}", rows=n)
+
+    if only:
+        cases = [case for case in cases if any(pattern in case["name"] for pattern in only)]
+    return cases
+
+
+def _time_calls(prepare, call, repeat):
+    """Wall times of repeat calls of call(*prepare()); preparing the inputs is not timed"""
+    times = []
+    for i in range(repeat):
+        args = prepare(i)
+        started = time.perf_counter()
+        call(*args)
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def _final_samples(num_samples, seed=1):
+    """Final dimension samples of the 3-dimension synthetic chain, the input of the plot and statistics cases"""
+    dimensions = synthetic_dimensions(3)
+    chain = build_chain([d["dist"] for d in dimensions], [d["para1"] for d in dimensions],
+                        [d["para2"] for d in dimensions], [d["dir"] for d in dimensions])
+    return dimensions, simulate_chain(chain, num_samples, seed=seed)
+
+
+def _bench_simulation(params, repeat):
+    dimensions = synthetic_dimensions(params["dimensions"])
+    columns = [[d[key] for d in dimensions] for key in ("name", "dist", "para1", "para2", "dir")]
+    # A scope of its own, and a new seed per call: every call is a full (cold) run, not an incremental one
+    set_current_scope(f"benchmark:{uuid.uuid4().hex}")
+    times = _time_calls(lambda i: (*columns, params["samples"], i + 1), run_monte_carlo_simulation, repeat)
+    return times, params["dimensions"] * params["samples"], "draws"
+
+
+def _bench_plot(params, repeat):
+    _, samples = _final_samples(params["samples"])
+    times = _time_calls(lambda i: (samples,), create_final_dimension_plot_with_data, repeat)
+    return times, params["samples"], "samples"
+
+
+def _bench_statistics(params, repeat):
+    dimensions, samples = _final_samples(params["samples"])
+    # The spec limits are centred on the nominals of the stored dimensions
+    set_current_scope(f"benchmark:{uuid.uuid4().hex}")
+    for i, d in enumerate(dimensions):
+        set_dimension(f"dim_{i}", DimensionState(name=d["name"], dist=d["dist"], nominal=d["nominal"]))
+    names, dirs = [d["name"] for d in dimensions], [d["dir"] for d in dimensions]
+    times = _time_calls(lambda i: (samples, params["samples"], 0.3, -0.3, names, dirs),
+                        calculate_final_dimension_statistics, repeat)
+    return times, params["samples"], "samples"
+
+
+def _bench_mle(params, repeat):
+    _, data = synthetic_measurements(params["dist"], params["size"])
+    times = _time_calls(lambda i: (data, params["dist"]), calculate_mle_parameters, repeat)
+    return times, params["size"], "values"
+
+
+def _bench_bayes(params, repeat):
+    dimension, data = synthetic_measurements(params["dist"], params["size"])
+    prior_params, _ = bayesian_calculations.calculate_prior_parameters(
+        params["dist"], dimension["nominal"], dimension["upper_tol"], dimension["lower_tol"])
+    update = getattr(bayesian_calculations, f"bayesian_update_{params['dist']}")
+
+    def prepare(i):
+        np.random.seed(i)  # the uniform update's MCMC draws from the global generator
+        return data, prior_params
+
+    times = _time_calls(prepare, update, repeat)
+    return times, params["size"], "values"
+
+
+def _bench_csv(params, repeat):
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(10.0, 0.01, (params["rows"], CSV_COLUMNS)),
+                         columns=[f"D{j + 1}" for j in range(CSV_COLUMNS)])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "measurements.csv")
+        frame.to_csv(path, index=False)
+        # The last column: the name match has to scan all of them
+        times = _time_calls(lambda i: (path, f"D{CSV_COLUMNS}"), load_measurements, repeat)
+    return times, params["rows"], "rows"
+
+
+_BENCHMARKS = {
+    "simulation": _bench_simulation,
+    "plot": _bench_plot,
+    "statistics": _bench_statistics,
+    "mle": _bench_mle,
+    "bayes": _bench_bayes,
+    "csv": _bench_csv,
+}
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, repeat=3):
+    """Result dict of one case; meant to run in a fresh process so peak RSS is the case's own"""
+    rss_before = _peak_rss_mb()
+    # The estimators report progress with print(); keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        times, items, unit = _BENCHMARKS[case["group"]](case["params"], repeat)
+    best = min(times)
+    return {
+        "name": case["name"],
+        "group": case["group"],
+        "params": case["params"],
+        "wall_time": best,
+        "wall_times": times,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_at_start_mb": rss_before,
+        "items": items,
+        "unit": unit,
+        "throughput": items / best if best > 0 else None,
+    }
+
+
+def iter_benchmark_results(cases, repeat=3):
+    """Run each case in its own worker process and yield its result; a failing case yields an error result"""
+    # fork starts quickly and shares the parent's imports; elsewhere the default start method is used
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            try:
+                yield pool.submit(run_case, case, repeat).result()
+            except Exception as e:
+                yield {"name": case["name"], "group": case["group"], "params": case["params"],
+                       "error": f"{type(e).__name__}: {e}"}
+
+
+def environment_info():
+    """Machine and library versions, stored with the results since timings only compare on like hardware"""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare_results(results, baseline, time_threshold=DEFAULT_TIME_THRESHOLD, rss_threshold=DEFAULT_RSS_THRESHOLD):
+    """Comparison rows for the cases present in both result lists
+
+    Each row has the name, the wall time and peak RSS ratios (current /
+    baseline) and regression, a list of the metrics over their threshold.
+    Wall time also has to grow by more than TIME_NOISE_FLOOR.
+    """
+    reference = {result["name"]: result for result in baseline if "error" not in result}
+    rows = []
+    for result in results:
+        base = reference.get(result["name"])
+        if base is None or "error" in result:
+            continue
+        time_ratio = result["wall_time"] / base["wall_time"] if base["wall_time"] > 0 else None
+        rss_ratio = None
+        if result.get("peak_rss_mb") and base.get("peak_rss_mb"):
+            rss_ratio = result["peak_rss_mb"] / base["peak_rss_mb"]
+        regression = []
+        slowdown = result["wall_time"] - base["wall_time"]
+        if time_ratio is not None and time_ratio > 1 + time_threshold and slowdown > TIME_NOISE_FLOOR:
+            regression.append("wall_time")
+        if rss_ratio is not None and rss_ratio > 1 + rss_threshold:
+            regression.append("peak_rss")
+        rows.append({"name": result["name"], "time_ratio": time_ratio, "rss_ratio": rss_ratio, "regression": regression})
+    return rows
@@ -0,0 +1,233 @@
+# src/utils/chain_definitions.py
+
+import json
+import os
+import numpy as np
+from src.utils.bayesian_calculations import (calculate_likelihood_params, calculate_prior_parameters,
+                                            create_prior_from_posterior, perform_bayesian_update)
+from src.utils.measurements import load_measurements, summary_pseudo_data
+from src.utils.mle_calculations import calculate_mle_parameters
+from src.utils.simulation_engine import DIST_CODES, build_chain
+from src.utils.stack_expression import StackExpression
+from src.utils.tolerance_params import tolerance_to_params
+
+# File types read when a directory of chain definitions is given
+DEFINITION_SUFFIXES = (".json", ".jsonl")
+
+# Parameter sources of a dimension, in the order the dashboard prefers them
+PARAMETER_METHODS = ("tolerance", "entered", "mle", "bayes")
+
+
+class ChainDefinitionError(ValueError):
+    """A chain definition is incomplete or cannot be turned into a simulable chain"""
+
+
+def load_chain_definitions(path):
+    """Yield (source, base_dir, definition) for every chain in a file or directory
+
+    A .json file holds one chain object, a list of them or {"chains": [...]};
+    a .jsonl file holds one chain per line. Directories are read file by
+    file in sorted order. base_dir is where relative measurement paths of
+    the definition are resolved.
+    """
+    if os.path.isdir(path):
+        files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(DEFINITION_SUFFIXES)
+        )
+    else:
+        files = [path]
+
+    for file_path in files:
+        base_dir = os.path.dirname(os.path.abspath(file_path))
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        with open(file_path, encoding="utf-8") as f:
+            if file_path.lower().endswith(".jsonl"):
+                definitions = [json.loads(line) for line in f if line.strip()]
+            else:
+                definitions = json.load(f)
+        if isinstance(definitions, dict):
+            definitions = definitions.get("chains", [definitions])
+
+        for position, definition in enumerate(definitions):
+            source = f"{stem}[{position}]" if len(definitions) > 1 else stem
+            yield source, base_dir, definition
+
+
+def resolve_dimension(dimension, base_dir="."):
+    """Distribution parameters of one dimension, chosen the way the dashboard does
+
+    Bayesian posteriors come first, then MLE fits, then parameters entered
+    directly, then parameters derived from the tolerance band. Measurement
+    CSVs ("measurements": a path or a list of paths) are matched to the
+    dimension by column name; several files under "method": "bayes" are
+    applied as sequential updates, under "mle" they are pooled. Instead of
+    a path, a measurement set can be a list of values or a summary dict
+    (see measurement_datasets). With base_dir None, paths are refused.
+    Returns a dict with name, dist, para1, para2, dir, nominal and method.
+    """
+    name = dimension.get("name")
+    dist = dimension.get("distribution", dimension.get("dist"))
+    if not name:
+        raise ChainDefinitionError("Every dimension needs a name")
+    if dist not in DIST_CODES:
+        raise ChainDefinitionError(f"Dimension '{name}': unsupported distribution {dist!r}")
+
+    nominal = dimension.get("nominal")
+    upper_tol = dimension.get("upper_tol")
+    lower_tol = dimension.get("lower_tol")
+    measurements = dimension.get("measurements") or []
+    if isinstance(measurements, (str, dict)) or (measurements and not isinstance(measurements[0], (str, dict, list))):
+        # A single path, summary or list of values
+        measurements = [measurements]
+    method = dimension.get("method") or ("bayes" if measurements else None)
+
+    if method in ("mle", "bayes"):
+        if not measurements:
+            raise ChainDefinitionError(f"Dimension '{name}': method '{method}' needs measurements")
+        datasets = measurement_datasets(measurements, name, base_dir)
+
+        if method == "mle":
+            para1, para2 = calculate_mle_parameters(np.concatenate([dataset_values(d, dist) for d in datasets]), dist)
+        else:
+            posterior = bayesian_posterior(dist, nominal, upper_tol, lower_tol, datasets, name)
+            para1, para2 = posterior["para1"], posterior["para2"]
+    elif method not in (None, "tolerance", "entered"):
+        raise ChainDefinitionError(f"Dimension '{name}': unknown method {method!r} (use one of {', '.join(PARAMETER_METHODS)})")
+    elif method != "tolerance" and dimension.get("para1") is not None and dimension.get("para2") is not None:
+        para1, para2, method = dimension["para1"], dimension["para2"], "entered"
+    else:
+        para1, para2 = tolerance_to_params(dist, nominal, upper_tol, lower_tol)
+        method = "tolerance"
+
+    try:
+        para1, para2 = float(para1), float(para2)
+    except (TypeError, ValueError):
+        raise ChainDefinitionError(f"Dimension '{name}': no usable parameters (give para1/para2 or nominal and tolerances)")
+
+    return {
+        "name": name,
+        "dist": dist,
+        "para1": para1,
+        "para2": para2,
+        "dir": dimension.get("direction", dimension.get("dir", "+")),
+        "nominal": nominal,
+        "method": method,
+    }
+
+
+def measurement_datasets(measurements, name="", base_dir="."):
+    """Measurement sets of a dimension, each an array of values or a summary dict
+
+    An entry is a CSV path (relative to base_dir; refused when base_dir is
+    None), a list of values, or a summary {"n", "mean", "std"} ({"min",
+    "max"} for uniform, optionally "log_mean"/"log_std" for lognormal).
+    """
+    datasets = []
+    for entry in measurements:
+        if isinstance(entry, dict):
+            if entry.get("n") is not None and int(entry["n"]) < 2:
+                raise ChainDefinitionError(f"Dimension '{name}': a measurement summary needs n >= 2")
+            datasets.append(entry)
+            continue
+        if isinstance(entry, str):
+            if base_dir is None:
+                raise ChainDefinitionError(f"Dimension '{name}': measurement files are not accepted here, send the values")
+            data = load_measurements(os.path.join(base_dir, entry), name)
+        else:
+            try:
+                data = np.asarray(entry, dtype=np.float64).ravel()
+            except (TypeError, ValueError):
+                raise ChainDefinitionError(f"Dimension '{name}': measurements must be numbers")
+            data = data[np.isfinite(data)]
+        if len(data) < 2:
+            raise ChainDefinitionError(f"Dimension '{name}': every measurement set needs at least 2 data points")
+        datasets.append(data)
+    return datasets
+
+
+def dataset_values(dataset, dist, shift=0.0):
+    """Values of a measurement set; summaries are expanded with summary_pseudo_data"""
+    if isinstance(dataset, dict):
+        return summary_pseudo_data(dist, dataset, shift)
+    return dataset
+
+
+def bayesian_posterior(dist, nominal, upper_tol, lower_tol, datasets, name="", posterior=None):
+    """Posterior after updating the tolerance prior with each dataset in turn
+
+    posterior (para1, para2) continues from an earlier posterior instead of
+    the tolerance prior. Returns a dict with the point estimates para1 and
+    para2, the prior_params of the last update, the likelihood (MLE)
+    estimates of the last dataset and the number of updates.
+    """
+    if posterior is not None:
+        para1, para2 = float(posterior[0]), float(posterior[1])
+        prior_params = None
+    else:
+        prior_params, error = calculate_prior_parameters(dist, nominal, upper_tol, lower_tol)
+        if prior_params is None:
+            raise ChainDefinitionError(f"Dimension '{name}': {error}")
+        para1 = para2 = None
+
+    likelihood = (None, None)
+    for dataset in datasets:
+        if para1 is not None:
+            # Sequential update: the previous posterior becomes the prior
+            prior_params = create_prior_from_posterior(dist, para1, para2)
+            if prior_params is None:
+                raise ChainDefinitionError(f"Dimension '{name}': invalid earlier posterior")
+        data = dataset_values(dataset, dist, prior_params.get("shift", 0.0))
+        para1, para2 = perform_bayesian_update(data, dist, prior_params)
+        if para1 is None or para2 is None:
+            raise ChainDefinitionError(f"Dimension '{name}': Bayesian updating failed")
+        likelihood = calculate_likelihood_params(data, dist)
+
+    return {
+        "para1": para1,
+        "para2": para2,
+        "prior_params": prior_params,
+        "likelihood_para1": likelihood[0],
+        "likelihood_para2": likelihood[1],
+        "updates": len(datasets),
+    }
+
+
+def build_definition_chain(dimensions, expression=None):
+    """Simulation chain of resolved dimensions; unlike the dashboard, invalid dimensions are an error"""
+    chain = build_chain([d["dist"] for d in dimensions], [d["para1"] for d in dimensions],
+                        [d["para2"] for d in dimensions], [d["dir"] for d in dimensions],
+                        names=[d["name"] for d in dimensions])
+    kept = set(chain["indices"]) if chain is not None else set()
+    dropped = [d["name"] for i, d in enumerate(dimensions) if i not in kept]
+    if dropped:
+        raise ChainDefinitionError(f"Invalid distribution parameters for: {', '.join(map(str, dropped))}")
+
+    if expression and str(expression).strip():
+        chain["expression"] = StackExpression(expression, chain["names"])
+    return chain
+
+
+def stack_nominal(dimensions, expression=None):
+    """Final dimension nominal: signed sum of the nominals, or the stack expression at them (missing count as 0)"""
+    nominals = []
+    for dimension in dimensions:
+        try:
+            nominals.append(float(dimension["nominal"]) if dimension["nominal"] is not None else 0.0)
+        except (TypeError, ValueError):
+            nominals.append(0.0)
+
+    if expression and str(expression).strip():
+        stack = StackExpression(expression, [d["name"] for d in dimensions])
+        return float(stack.evaluate(np.array(nominals, dtype=np.float64).reshape(-1, 1))[0])
+    return float(sum(-n if d["dir"] == "-" else n for d, n in zip(dimensions, nominals)))
+
+
+def definition_spec_limits(definition, dimensions):
+    """(LSL, USL) from the definition's final tolerances, or None when it has none"""
+    final = definition.get("final_tolerance") or {}
+    upper_tol, lower_tol = final.get("upper"), final.get("lower")
+    if upper_tol is None or lower_tol is None:
+        return None
+    nominal = stack_nominal(dimensions, definition.get("expression"))
+    return nominal + float(lower_tol), nominal + float(upper_tol)
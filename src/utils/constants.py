@@ -5,4 +5,27 @@ DISTRIBUTION_OPTIONS = [
     {"label": "Lognormal", "value": "lognormal"},
     {"label": "Gamma", "value": "gamma"},
     {"label": "Uniform", "value": "uniform"},
-]
\ No newline at end of file
+]
+
+SIMULATION_ENGINE_OPTIONS = [
+    {"label": "Standard (in memory)", "value": "standard"},
+    {"label": "Streaming (constant memory)", "value": "streaming"},
+    {"label": "Parallel (process pool)", "value": "parallel"},
+    {"label": "Convolution (no sampling)", "value": "convolution"},
+    {"label": "Adaptive (stop at target precision)", "value": "adaptive"},
+    {"label": "Rare-event tails (importance sampling)", "value": "importance"},
+    {"label": "Quasi-Monte Carlo (scrambled Sobol)", "value": "sobol"},
+    {"label": "Quasi-Monte Carlo (scrambled Halton)", "value": "halton"},
+    {"label": "Sensitivity analysis (Sobol indices)", "value": "sensitivity"},
+]
+
+KDE_BANDWIDTH_OPTIONS = [
+    {"label": "FFT KDE - Silverman", "value": "silverman"},
+    {"label": "FFT KDE - Scott", "value": "scott"},
+    {"label": "FFT KDE - Plug-in", "value": "plugin"},
+]
+
+ALLOCATION_METRIC_OPTIONS = [
+    {"label": "Cpk at least", "value": "cpk"},
+    {"label": "ppm out of spec at most", "value": "ppm"},
+]
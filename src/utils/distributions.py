@@ -0,0 +1,89 @@
+# src/utils/distributions.py
+
+import numpy as np
+from scipy.stats import norm, lognorm, gamma, uniform
+
+
+def calculate_cdf(x_values, dist_name, para1, para2):
+    """Calculate cumulative distribution function values"""
+    try:
+        if dist_name == "normal":
+            return norm.cdf(x_values, loc=para1, scale=para2)
+        elif dist_name == "lognormal":
+            return lognorm.cdf(x_values, s=para2, scale=np.exp(para1))
+        elif dist_name == "gamma":
+            return gamma.cdf(x_values, a=para1, scale=para2)
+        elif dist_name == "uniform":
+            return uniform.cdf(x_values, loc=para1, scale=para2-para1)
+        else:
+            return np.zeros_like(x_values)
+    except:
+        return np.zeros_like(x_values)
+
+
+def calculate_pdf(x_values, dist_name, para1, para2):
+    """Calculate probability density function values"""
+    try:
+        if dist_name == "normal":
+            return norm.pdf(x_values, loc=para1, scale=para2)
+        elif dist_name == "lognormal":
+            return lognorm.pdf(x_values, s=para2, scale=np.exp(para1))
+        elif dist_name == "gamma":
+            return gamma.pdf(x_values, a=para1, scale=para2)
+        elif dist_name == "uniform":
+            return uniform.pdf(x_values, loc=para1, scale=para2-para1)
+        else:
+            return np.zeros_like(x_values)
+    except:
+        return np.zeros_like(x_values)
+
+
+def calculate_ppf(q_values, dist_name, para1, para2):
+    """Calculate quantile (inverse CDF) values"""
+    if dist_name == "normal":
+        return norm.ppf(q_values, loc=para1, scale=para2)
+    elif dist_name == "lognormal":
+        return lognorm.ppf(q_values, s=para2, scale=np.exp(para1))
+    elif dist_name == "gamma":
+        return gamma.ppf(q_values, a=para1, scale=para2)
+    elif dist_name == "uniform":
+        return uniform.ppf(q_values, loc=para1, scale=para2-para1)
+    else:
+        raise ValueError(f"Unsupported distribution: {dist_name}")
+
+
+def distribution_moments(dist_name, para1, para2):
+    """Analytic mean and variance of a dimension distribution"""
+    if dist_name == "normal":
+        return para1, para2**2
+    elif dist_name == "lognormal":
+        mean = np.exp(para1 + 0.5 * para2**2)
+        var = (np.exp(para2**2) - 1) * np.exp(2 * para1 + para2**2)
+        return mean, var
+    elif dist_name == "gamma":
+        return para1 * para2, para1 * para2**2
+    elif dist_name == "uniform":
+        return (para1 + para2) / 2, (para2 - para1)**2 / 12
+    else:
+        raise ValueError(f"Unsupported distribution: {dist_name}")
+
+
+def standard_normal_transform(z, dist_name, para1, para2):
+    """Map standard normal values z to a dimension distribution, X = F^-1(Phi(z))
+
+    Upper-half values go through the survival function so that far-tail
+    points keep their precision instead of rounding Phi(z) to 1.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    if dist_name == "normal":
+        return para1 + para2 * z
+    elif dist_name == "lognormal":
+        return np.exp(para1 + para2 * z)
+    elif dist_name == "gamma":
+        lower = gamma.ppf(norm.cdf(np.minimum(z, 0)), a=para1, scale=para2)
+        upper = gamma.isf(norm.sf(np.maximum(z, 0)), a=para1, scale=para2)
+        return np.where(z < 0, lower, upper)
+    elif dist_name == "uniform":
+        return np.where(z < 0, para1 + (para2 - para1) * norm.cdf(z), para2 - (para2 - para1) * norm.sf(z))
+    else:
+        raise ValueError(f"Unsupported distribution: {dist_name}")
@@ -0,0 +1,57 @@
+# src/utils/ecdf.py
+
+import numpy as np
+from src.utils.metrics import instrumented
+
+
+class EmpiricalCDF:
+    """Empirical CDF of a sample, sorted once and queried with searchsorted
+
+    With ``copy=False`` the input array is sorted in place to avoid a second
+    full-size buffer; only do that when the sample order is no longer needed.
+    """
+
+    @instrumented("ecdf", samples="samples")
+    def __init__(self, samples, copy=True):
+        samples = np.asarray(samples)
+        if copy:
+            self.sorted = np.sort(samples)
+        else:
+            samples.sort()
+            self.sorted = samples
+        self.n = self.sorted.size
+
+    @property
+    def min(self):
+        return float(self.sorted[0])
+
+    @property
+    def max(self):
+        return float(self.sorted[-1])
+
+    def cdf(self, x):
+        """Fraction of samples less than or equal to x"""
+        return np.searchsorted(self.sorted, x, side="right") / self.n
+
+    def quantile(self, q):
+        """Quantile(s) with the same linear interpolation as np.percentile"""
+        q = np.asarray(q, dtype=np.float64)
+        position = q * (self.n - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, self.n - 1)
+        fraction = position - lower
+        lower_values = self.sorted[lower].astype(np.float64)
+        upper_values = self.sorted[upper].astype(np.float64)
+        return lower_values + (upper_values - lower_values) * fraction
+
+    def percentile(self, p):
+        return self.quantile(np.asarray(p, dtype=np.float64) / 100)
+
+    @property
+    def median(self):
+        return float(self.quantile(0.5))
+
+    def exceedance(self, LSL, USL):
+        """Fractions at or below LSL and above USL"""
+        cdf_at_lsl, cdf_at_usl = self.cdf([LSL, USL])
+        return float(cdf_at_lsl), float(1 - cdf_at_usl)
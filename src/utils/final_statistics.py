@@ -0,0 +1,120 @@
+# src/utils/final_statistics.py
+
+import numpy as np
+from src.utils.ecdf import EmpiricalCDF
+from src.utils.metrics import instrumented
+
+
+@instrumented("statistics", samples="final_samples")
+def summarize_samples(final_samples, spec_limits=None, ecdf=None):
+    """Summary statistics of an in-memory final dimension sample
+
+    Percentiles and spec-limit fractions come from the (sorted-once) ECDF,
+    which can be passed in to share it with the plot.
+    """
+    if ecdf is None:
+        ecdf = EmpiricalCDF(final_samples)
+    median, p5, p95 = ecdf.quantile([0.5, 0.05, 0.95])
+
+    summary = {
+        "count": ecdf.n,
+        "mean": float(np.mean(final_samples, dtype=np.float64)),
+        "std": float(np.std(final_samples, ddof=1, dtype=np.float64)),
+        "min": ecdf.min,
+        "max": ecdf.max,
+        "median": float(median),
+        "p5": float(p5),
+        "p95": float(p95),
+        "cdf_at_lsl": None,
+        "cdf_right_of_usl": None,
+    }
+
+    if spec_limits is not None:
+        summary["cdf_at_lsl"], summary["cdf_right_of_usl"] = ecdf.exceedance(*spec_limits)
+
+    return summary
+
+
+def numeric_summary(summary):
+    """A summary with plain int/float values (None kept), as stored in the result cache"""
+    return {key: None if value is None else int(value) if key == "count" else float(value)
+            for key, value in summary.items()}
+
+
+def format_ppm(fraction):
+    """Format a probability as a fraction and parts per million (billion below 0.1 ppm)"""
+    if 0 < fraction < 1e-7:
+        return f"{fraction:.3e} ({fraction * 1e9:.2f} ppb)"
+    return f"{fraction:.4f} ({fraction * 1e6:.1f} ppm)"
+
+
+def _format_value(value):
+    return f"{value:.4f}" if value is not None else "n/a"
+
+
+def format_final_dimension_statistics(summary, num_samples, spec_limits=None, spec_message=None, notes=None,
+                                      title="MONTE CARLO SIMULATION RESULTS"):
+    """Format final dimension statistics for the stats panel
+
+    Sampling-free results pass ``num_samples=None`` and leave min/max unset.
+    """
+    sample_size = f"{num_samples:,}" if num_samples is not None else "n/a (sampling-free)"
+    stats_text = f"""=== {title} ===
+Sample Size: {sample_size}
+Mean: {summary['mean']:.4f}
+Std Dev: {summary['std']:.4f}
+Median: {summary['median']:.4f}
+Min: {_format_value(summary['min'])}
+Max: {_format_value(summary['max'])}
+5th Percentile: {summary['p5']:.4f}
+95th Percentile: {summary['p95']:.4f}"""
+
+    # Add process capability indices if tolerances are provided
+    if spec_limits is not None:
+        LSL, USL = spec_limits
+        mean_val = summary["mean"]
+        std_val = summary["std"]
+
+        if std_val > 0:
+            # Cp = (USL - LSL) / (6 * sigma)
+            Cp = (USL - LSL) / (6 * std_val)
+
+            # Cpk = min((USL - mean)/(3*sigma), (mean - LSL)/(3*sigma))
+            Cpu = (USL - mean_val) / (3 * std_val)  # Upper capability
+            Cpl = (mean_val - LSL) / (3 * std_val)  # Lower capability
+            Cpk = min(Cpu, Cpl)
+
+            stats_text += f"""
+Cp: {Cp:.3f}
+Cpk: {Cpk:.3f}"""
+        else:
+            stats_text += f"""
+Cp: Cannot calculate (std=0)
+Cpk: Cannot calculate (std=0)"""
+
+        stats_text += f"""
+CDF left of LSL: {format_ppm(summary['cdf_at_lsl'])}
+CDF right of USL: {format_ppm(summary['cdf_right_of_usl'])}"""
+    else:
+        message = spec_message or "Please set tolerance in final dimension"
+        stats_text += f"""
+Cp: {message}
+Cpk: {message}
+CDF left of LSL: {message}
+CDF right of USL: {message}"""
+
+    for note in notes or []:
+        stats_text += f"\n{note}"
+
+    return stats_text
+
+
+def format_partial_statistics(summary):
+    """Running statistics of an unfinished run, shown under its progress bar"""
+    text = (f"Partial results ({summary['count']:,} samples so far)\n"
+            f"Mean: {summary['mean']:.4f}   Std Dev: {summary['std']:.4f}\n"
+            f"5th-95th Percentile: {summary['p5']:.4f} - {summary['p95']:.4f}")
+    if summary["cdf_at_lsl"] is not None:
+        text += (f"\nCDF left of LSL: {format_ppm(summary['cdf_at_lsl'])}"
+                 f"\nCDF right of USL: {format_ppm(summary['cdf_right_of_usl'])}")
+    return text
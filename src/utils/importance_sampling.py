@@ -0,0 +1,141 @@
+# src/utils/importance_sampling.py
+
+import numpy as np
+from src.utils.distributions import standard_normal_transform
+from src.utils.jobs import report_progress
+from src.utils.metrics import instrumented
+from src.utils.simulation_engine import DEFAULT_CHUNK_SIZE, DIST_NAMES, dimension_stream, resolve_seed
+
+# Iterations of the design-point search
+DESIGN_POINT_ITERATIONS = 50
+
+# Design-point coordinates are kept within this many standard deviations
+MAX_SHIFT = 10.0
+
+# Step used for the numerical gradient of the stack in standard normal space
+GRADIENT_STEP = 1e-5
+
+# Draws per tail of the importance-sampling estimator, independent of the run's sample count
+IMPORTANCE_SAMPLES = 200_000
+
+# Cap on the plain sampling pass behind the importance engine's plot and central statistics
+IMPORTANCE_PILOT_SAMPLES = 100_000
+
+
+def chain_from_standard_normal(chain, z):
+    """Final dimension for standard normal coordinates z of shape (n_dims, ...)"""
+    if chain.get("expression") is not None:
+        shape = np.shape(z)[1:]
+        columns = np.empty((len(chain["codes"]), int(np.prod(shape))))
+        for k in range(len(chain["codes"])):
+            columns[k] = np.ravel(standard_normal_transform(z[k], DIST_NAMES[int(chain["codes"][k])], chain["para1"][k],
+                                                            chain["para2"][k]))
+        return chain["expression"].evaluate(columns).reshape(shape)
+
+    total = np.zeros(np.shape(z)[1:])
+    for k in range(len(chain["codes"])):
+        x = standard_normal_transform(z[k], DIST_NAMES[int(chain["codes"][k])], chain["para1"][k], chain["para2"][k])
+        total += chain["signs"][k] * x
+    return total
+
+
+def chain_gradient(chain, z):
+    """Gradient of the chain sum with respect to each standard normal coordinate"""
+    if chain.get("expression") is not None:
+        # Central differences of the whole expression, all coordinates in one evaluation
+        steps = np.eye(len(z)) * GRADIENT_STEP
+        points = np.concatenate([z[:, None] + steps, z[:, None] - steps], axis=1)
+        values = chain_from_standard_normal(chain, points)
+        return (values[:len(z)] - values[len(z):]) / (2 * GRADIENT_STEP)
+
+    gradient = np.empty(len(z))
+    for k in range(len(z)):
+        dist_name = DIST_NAMES[int(chain["codes"][k])]
+        points = np.array([z[k] - GRADIENT_STEP, z[k] + GRADIENT_STEP])
+        x = standard_normal_transform(points, dist_name, chain["para1"][k], chain["para2"][k])
+        gradient[k] = chain["signs"][k] * (x[1] - x[0]) / (2 * GRADIENT_STEP)
+    return gradient
+
+
+def design_point(chain, limit, side):
+    """Most probable point on the spec limit in standard normal space (HL-RF)
+
+    ``side`` is +1 for the region above ``limit`` and -1 for the region
+    below it. Returns the shift vector used as the sampling mean.
+    """
+    z = np.zeros(len(chain["codes"]))
+    for _ in range(DESIGN_POINT_ITERATIONS):
+        g = side * (chain_from_standard_normal(chain, z[:, None])[0] - limit)
+        gradient = side * chain_gradient(chain, z)
+        norm2 = np.dot(gradient, gradient)
+        if norm2 == 0:
+            break
+        z_new = np.clip((np.dot(gradient, z) - g) / norm2 * gradient, -MAX_SHIFT, MAX_SHIFT)
+        if np.max(np.abs(z_new - z)) < 1e-6:
+            z = z_new
+            break
+        z = z_new
+    return z
+
+
+def tail_probability(chain, limit, side, num_samples, entropy, stream_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Importance-sampling estimate of P(side * (X - limit) > 0) and its standard error
+
+    Standard normal coordinates are drawn around the design point and each
+    draw is reweighted by the likelihood ratio phi(z) / phi(z - shift).
+    """
+    shift = design_point(chain, limit, side)
+    n_dims = len(shift)
+    rngs = [dimension_stream(entropy, k, stream_id) for k in range(n_dims)]
+
+    num_samples = int(num_samples)
+    weight_sum = 0.0
+    weight_sq_sum = 0.0
+    hits = 0
+    for start in range(0, num_samples, chunk_size):
+        size = min(chunk_size, num_samples - start)
+        z = np.empty((n_dims, size))
+        for k in range(n_dims):
+            rngs[k].standard_normal(out=z[k])
+            z[k] += shift[k]
+
+        x = chain_from_standard_normal(chain, z)
+        log_weights = 0.5 * np.dot(shift, shift) - shift @ z
+        weights = np.where(side * (x - limit) > 0, np.exp(log_weights), 0.0)
+        weight_sum += weights.sum()
+        weight_sq_sum += np.dot(weights, weights)
+        hits += int(np.count_nonzero(weights))
+        report_progress((start + size) / num_samples, message=f"Rare-event tail {stream_id + 1} of 2")
+
+    probability = weight_sum / num_samples
+    variance = max(weight_sq_sum / num_samples - probability**2, 0.0) / num_samples
+    return {
+        "probability": float(probability),
+        "std_error": float(np.sqrt(variance)),
+        "hits": hits,
+        "samples": num_samples,
+        "shift_norm": float(np.linalg.norm(shift)),
+    }
+
+
+@instrumented("sampling", samples="num_samples")
+def rare_event_tails(chain, spec_limits, num_samples=IMPORTANCE_SAMPLES, seed=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Importance-sampling estimates for the fractions at or below LSL and above USL"""
+    entropy = resolve_seed(seed)
+    LSL, USL = spec_limits
+    return {
+        "cdf_at_lsl": tail_probability(chain, LSL, -1, num_samples, entropy, 0, chunk_size),
+        "cdf_right_of_usl": tail_probability(chain, USL, 1, num_samples, entropy, 1, chunk_size),
+    }
+
+
+def format_rare_event_notes(tails):
+    """Stats panel lines for the importance-sampling tail estimates"""
+    labels = {"cdf_at_lsl": "CDF left of LSL", "cdf_right_of_usl": "CDF right of USL"}
+    notes = [f"Rare-event tails (importance sampling, {tails['cdf_at_lsl']['samples']:,} draws per tail):"]
+    for key, tail in tails.items():
+        notes.append(
+            f"  {labels[key]}: {tail['probability']:.3e} ± {tail['std_error']:.2e} "
+            f"({tail['hits']:,} hits, shift {tail['shift_norm']:.2f} sigma)"
+        )
+    return notes
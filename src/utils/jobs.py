@@ -0,0 +1,277 @@
+# src/utils/jobs.py
+
+import contextvars
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from src.stores.backends import create_job_backend
+
+# Background job threads; BAYESTOLSIM_JOB_WORKERS overrides the default
+JOB_WORKERS = int(os.environ.get("BAYESTOLSIM_JOB_WORKERS") or 0) or min(4, os.cpu_count() or 1)
+
+# Seconds a finished job stays available to pollers
+JOB_RETENTION = 600.0
+
+# Shortest interval between two partial statistics snapshots of a job
+PARTIAL_INTERVAL = 0.5
+
+# Shortest interval between two publications of a running job's state to the shared backend
+SYNC_INTERVAL = 0.5
+
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+
+class JobCancelled(BaseException):
+    """Raised inside a job's work once cancellation was requested
+
+    A BaseException, like KeyboardInterrupt, so the engines' broad
+    ``except Exception`` error handling does not swallow it.
+    """
+
+
+# Job whose work runs in the current thread, if any
+_current_job = contextvars.ContextVar("current_job", default=None)
+
+
+class Job:
+    """State of one background job, shared between its worker thread and pollers
+
+    With a shared backend the job's state is also published there, so
+    pollers in other worker processes see it and can ask it to stop.
+    """
+
+    def __init__(self, kind, owner=None, backend=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.state = "queued"
+        self.progress = 0.0
+        self.message = ""
+        self.partial = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self.cancel_requested = threading.Event()
+        self.backend = backend
+        self._partial_at = 0.0
+        self._synced_at = 0.0
+
+    @classmethod
+    def from_record(cls, record, backend=None):
+        """Job as last published by the process running it"""
+        job = cls(record["kind"], record["owner"], backend)
+        for field in ("id", "state", "progress", "message", "partial", "result", "error", "created", "finished"):
+            setattr(job, field, record[field])
+        if record["cancel_requested"]:
+            job.cancel_requested.set()
+        return job
+
+    @property
+    def done(self):
+        return self.state in FINISHED_STATES
+
+    def cancel(self):
+        """Ask the job to stop; a job still in the queue never starts"""
+        self.cancel_requested.set()
+        if self.future is None:
+            # Runs in another worker process, which picks the request up from the backend
+            if self.backend is not None:
+                self.backend.request_cancel(self.id)
+        elif self.future.cancel():
+            self._finish("cancelled")
+            self.sync(force=True)
+
+    def _finish(self, state):
+        self.state = state
+        self.finished = time.time()
+
+    def record(self):
+        """The job's state as stored by the shared backend"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "owner": self.owner,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "partial": self.partial,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+    def sync(self, force=False):
+        """Publish the state to the shared backend and pick up cancellation requested by other processes
+
+        Unless forced, runs at most every SYNC_INTERVAL seconds; a no-op
+        without a shared backend.
+        """
+        if self.backend is None:
+            return
+        now = time.perf_counter()
+        if not force and now - self._synced_at < SYNC_INTERVAL:
+            return
+        self._synced_at = now
+        if self.backend.publish(self.record()):
+            self.cancel_requested.set()
+
+    def snapshot(self):
+        """JSON-friendly view of the job for progress displays"""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "partial": self.partial,
+            "error": self.error,
+            "elapsed": (self.finished or time.time()) - self.created,
+        }
+
+
+def report_progress(fraction, message=None, partial=None):
+    """Progress hook for long-running work; a no-op outside background jobs
+
+    fraction is the share of the work done (0-1). partial is a statistics
+    dict, or a callable returning one, taken at most every PARTIAL_INTERVAL
+    seconds. Raises JobCancelled once the job was asked to stop, so callers
+    get cancellation points for free.
+    """
+    job = _current_job.get()
+    if job is None:
+        return
+    if job.cancel_requested.is_set():
+        raise JobCancelled()
+
+    job.progress = min(max(float(fraction), 0.0), 1.0)
+    if message is not None:
+        job.message = message
+    if partial is not None:
+        now = time.perf_counter()
+        if now - job._partial_at >= PARTIAL_INTERVAL:
+            job.partial = partial() if callable(partial) else partial
+            job._partial_at = now
+    job.sync()
+    if job.cancel_requested.is_set():
+        raise JobCancelled()
+
+
+def check_cancelled():
+    """Raise JobCancelled if the current job was asked to stop; a no-op outside background jobs
+
+    For work without progress to report, before a step that must not run
+    once a newer job superseded this one (such as writing a store).
+    """
+    job = _current_job.get()
+    if job is None:
+        return
+    job.sync(force=True)
+    if job.cancel_requested.is_set():
+        raise JobCancelled()
+
+
+class JobManager:
+    """Runs work on a local thread pool and keeps its jobs pollable by id
+
+    Work runs in a copy of the submitting context, so per-request state such
+    as the dimension store scope carries over into the job. The heavy
+    lifting happens in NumPy (which releases the GIL) or in the parallel
+    engine's own process pool, so threads suffice.
+
+    Jobs run in the worker process that submitted them. With a shared
+    backend (the SQLite store of a multi-worker deployment), their state is
+    published there too, so a poll or cancel that reaches another worker
+    still finds the job; results (plots, samples) are then pickled.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, backend=None):
+        self.workers = workers
+        self.backend = backend
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def executor(self):
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bayestolsim-job")
+            return self._executor
+
+    def submit(self, kind, fn, *args, owner=None, **kwargs):
+        """Queue fn(*args, **kwargs) and return its Job right away"""
+        self.purge()
+        job = Job(kind, owner, self.backend)
+        with self.lock:
+            self.jobs[job.id] = job
+        job.sync(force=True)
+        context = contextvars.copy_context()
+        job.future = self.executor().submit(context.run, self._run, job, fn, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job, fn, args, kwargs):
+        job.state = "running"
+        job.sync(force=True)
+        if job.cancel_requested.is_set():
+            job._finish("cancelled")
+            job.sync(force=True)
+            return
+        token = _current_job.set(job)
+        try:
+            job.result = fn(*args, **kwargs)
+            job.progress = 1.0
+            job._finish("done")
+        except JobCancelled:
+            job._finish("cancelled")
+        except Exception as e:
+            job.error = str(e)
+            job._finish("failed")
+        finally:
+            _current_job.reset(token)
+        try:
+            job.sync(force=True)
+        except Exception as e:
+            # E.g. a result that cannot be pickled; pollers elsewhere must still see the job end
+            job.result = None
+            job.error = f"Could not share the job result: {e}"
+            job._finish("failed")
+            job.sync(force=True)
+
+    def get(self, job_id, owner=None):
+        """Job by id, or None when it is unknown, expired or belongs to another owner
+
+        A job submitted by another worker process is read back from the
+        shared backend, as it was last published.
+        """
+        job = self.jobs.get(job_id) if job_id else None
+        if job is None and job_id and self.backend is not None:
+            record = self.backend.load(job_id)
+            job = Job.from_record(record, self.backend) if record is not None else None
+        if job is None or (owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def cancel(self, job_id, owner=None):
+        job = self.get(job_id, owner)
+        if job is not None and not job.done:
+            job.cancel()
+        return job
+
+    def purge(self):
+        """Forget jobs that finished more than JOB_RETENTION seconds ago"""
+        cutoff = time.time() - JOB_RETENTION
+        with self.lock:
+            for job_id in [job_id for job_id, job in self.jobs.items() if job.done and job.finished < cutoff]:
+                del self.jobs[job_id]
+        if self.backend is not None:
+            self.backend.purge(cutoff)
+
+
+# Jobs are shared between worker processes when the dimension store is (BAYESTOLSIM_STORE_BACKEND=sqlite)
+job_manager = JobManager(backend=create_job_backend(os.environ.get("BAYESTOLSIM_STORE_BACKEND"),
+                                                    os.environ.get("BAYESTOLSIM_STORE_PATH")))
@@ -0,0 +1,79 @@
+# src/utils/measurements.py
+
+import numpy as np
+import pandas as pd
+from src.utils.metrics import stage
+
+
+def match_dimension_column(columns, dim_name):
+    """Column holding a dimension's measurements: exact (case-insensitive) name match, else a partial match"""
+    target = str(dim_name).strip().lower()
+    for col in columns:
+        if str(col).strip().lower() == target:
+            return col
+
+    # If exact match not found, try partial match
+    for col in columns:
+        name = str(col).strip().lower()
+        if target in name or name in target:
+            return col
+    return None
+
+
+def load_measurements(path, dim_name):
+    """Measured values of a dimension from a CSV file, matched by column name"""
+    with stage("csv_parsing") as record:
+        df = pd.read_csv(path)
+        record["samples"] = len(df)
+    column_name = match_dimension_column(df.columns, dim_name)
+    if column_name is None:
+        raise ValueError(f"No matching column found for dimension '{dim_name}' in {path}")
+    return df[column_name].dropna().values.astype(np.float64)
+
+
+def summarize_measurements(data):
+    """Statistics the parameter updates depend on: n, mean, sample std, min, max (and log moments when positive)"""
+    data = np.asarray(data, dtype=np.float64)
+    summary = {
+        "n": int(data.size),
+        "mean": float(np.mean(data)),
+        "std": float(np.std(data, ddof=1)) if data.size > 1 else 0.0,
+        "min": float(np.min(data)),
+        "max": float(np.max(data)),
+    }
+    if np.all(data > 0):
+        log_data = np.log(data)
+        summary["log_mean"] = float(np.mean(log_data))
+        summary["log_std"] = float(np.std(log_data, ddof=1)) if data.size > 1 else 0.0
+    return summary
+
+
+def summary_pseudo_data(distribution, summary, shift=0.0):
+    """Values with exactly the given summary statistics, to run the data-based updates on a summary
+
+    The normal and gamma updates and fits use the data only through n, mean
+    and sample std, the uniform ones only through min and max, and the
+    lognormal ones through n and the mean/std of log(x + shift). So
+    evaluating them on these pseudo values gives the same result as on the
+    original measurements. Lognormal summaries should carry log_mean and
+    log_std; plain mean/std are converted by moment matching.
+    """
+    if distribution == "uniform":
+        return np.array([float(summary["min"]), float(summary["max"])])
+
+    n = int(summary["n"])
+    if n < 2:
+        raise ValueError("A measurement summary needs n >= 2")
+    z = np.linspace(-1.0, 1.0, n)
+    z = (z - z.mean()) / z.std(ddof=1)  # exactly mean 0, sample std 1
+
+    if distribution == "lognormal":
+        if "log_mean" in summary and "log_std" in summary:
+            log_mean, log_std = float(summary["log_mean"]), float(summary["log_std"])
+        else:
+            mean, std = float(summary["mean"]) + shift, float(summary["std"])
+            log_std = np.sqrt(np.log(1 + (std / mean) ** 2))
+            log_mean = np.log(mean) - 0.5 * log_std ** 2
+        return np.exp(log_mean + log_std * z) - shift
+
+    return float(summary["mean"]) + float(summary["std"]) * z
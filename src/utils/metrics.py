@@ -0,0 +1,341 @@
+# src/utils/metrics.py
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from src.utils.jobs import JobCancelled
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS gauge
+    resource = None
+
+# Upper bounds (seconds) of the latency histogram buckets, as in the Prometheus client defaults plus long runs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Peak allocation per stage needs tracemalloc, which slows every allocation down; BAYESTOLSIM_TRACE_MEMORY=1 turns it on
+TRACE_ALLOCATIONS = os.environ.get("BAYESTOLSIM_TRACE_MEMORY") == "1"
+
+METRIC_PREFIX = "bayestolsim"
+
+if TRACE_ALLOCATIONS and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs, ending with +Inf"""
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class MetricsRegistry:
+    """Latency, call, error, sample and allocation metrics of callbacks and compute stages
+
+    Series are keyed by kind ("callback" or "stage") and name. Updates take
+    a lock, so callbacks, background jobs and API requests can record
+    concurrently.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+        self.started = time.time()
+
+    def observe(self, kind, name, seconds, samples=None, peak_alloc=None, outcome="ok"):
+        with self.lock:
+            series = self.series.get((kind, name))
+            if series is None:
+                series = self.series[(kind, name)] = {
+                    "latency": Histogram(), "outcomes": {}, "samples": 0, "peak_alloc": None, "last_peak_alloc": None,
+                }
+            series["latency"].observe(seconds)
+            series["outcomes"][outcome] = series["outcomes"].get(outcome, 0) + 1
+            if samples:
+                series["samples"] += int(samples)
+            if peak_alloc is not None:
+                series["last_peak_alloc"] = peak_alloc
+                series["peak_alloc"] = max(series["peak_alloc"] or 0, peak_alloc)
+
+    def reset(self):
+        with self.lock:
+            self.series.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """JSON-friendly view of every series plus process gauges"""
+        with self.lock:
+            series = [
+                {
+                    "kind": kind,
+                    "name": name,
+                    "calls": s["latency"].count,
+                    "outcomes": dict(s["outcomes"]),
+                    "seconds_total": s["latency"].sum,
+                    "seconds_mean": s["latency"].sum / s["latency"].count,
+                    "buckets": [[bound if bound != float("inf") else "+Inf", count]
+                                for bound, count in s["latency"].cumulative()],
+                    "samples": s["samples"],
+                    "peak_alloc_bytes": s["peak_alloc"],
+                    "last_peak_alloc_bytes": s["last_peak_alloc"],
+                }
+                for (kind, name), s in sorted(self.series.items())
+            ]
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "allocation_tracing": tracemalloc.is_tracing(),
+            "series": series,
+        }
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, metric_type, help_text):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+
+        for kind in ("callback", "stage"):
+            series = [s for s in snapshot["series"] if s["kind"] == kind]
+            family(f"{kind}_duration_seconds", "histogram", f"Wall time of {kind} calls")
+            for s in series:
+                label = f'{kind}="{_escape(s["name"])}"'
+                for bound, count in s["buckets"]:
+                    le = bound if bound == "+Inf" else repr(float(bound))
+                    lines.append(f'{METRIC_PREFIX}_{kind}_duration_seconds_bucket{{{label},le="{le}"}} {count}')
+                lines.append(f"{METRIC_PREFIX}_{kind}_duration_seconds_sum{{{label}}} {s['seconds_total']}")
+                lines.append(f"{METRIC_PREFIX}_{kind}_duration_seconds_count{{{label}}} {s['calls']}")
+            family(f"{kind}_calls_total", "counter", f"{kind.capitalize()} calls by outcome")
+            for s in series:
+                for outcome, count in sorted(s["outcomes"].items()):
+                    lines.append(f'{METRIC_PREFIX}_{kind}_calls_total{{{kind}="{_escape(s["name"])}",outcome="{outcome}"}} {count}')
+
+        stages = [s for s in snapshot["series"] if s["kind"] == "stage"]
+        family("stage_samples_total", "counter", "Samples (or values, rows) processed by each stage")
+        for s in stages:
+            lines.append(f'{METRIC_PREFIX}_stage_samples_total{{stage="{_escape(s["name"])}"}} {s["samples"]}')
+        if snapshot["allocation_tracing"]:
+            family("stage_peak_alloc_bytes", "gauge", "Largest Python/NumPy allocation peak of one stage call")
+            for s in stages:
+                if s["peak_alloc_bytes"] is not None:
+                    lines.append(f'{METRIC_PREFIX}_stage_peak_alloc_bytes{{stage="{_escape(s["name"])}"}} {s["peak_alloc_bytes"]}')
+
+        if snapshot["peak_rss_bytes"] is not None:
+            family("process_peak_rss_bytes", "gauge", "Peak resident memory of the app process")
+            lines.append(f"{METRIC_PREFIX}_process_peak_rss_bytes {snapshot['peak_rss_bytes']}")
+        family("uptime_seconds", "gauge", "Seconds since the metrics were started or reset")
+        lines.append(f"{METRIC_PREFIX}_uptime_seconds {snapshot['uptime_seconds']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+metrics = MetricsRegistry()
+
+# Stages open in the current thread/job, innermost last
+_active_stages = contextvars.ContextVar("active_stages", default=())
+
+# Per-run list collecting finished stages, set by record_stages()
+_stage_log = contextvars.ContextVar("stage_log", default=None)
+
+
+@contextlib.contextmanager
+def stage(name, samples=None):
+    """Time a compute stage and record it in the metrics and the current run's breakdown
+
+    Yields a dict whose "samples" the body may set once it knows the count.
+    A stage nested in a stage of the same name (a sampling engine calling
+    another) is folded into the outer one. Breakdown entries carry the
+    stage's own time, without the time of nested stages.
+    """
+    active = _active_stages.get()
+    if active and active[-1]["name"] == name:
+        yield active[-1]
+        return
+
+    record = {"name": name, "samples": samples, "child_seconds": 0.0, "child_peak": 0}
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        start_alloc, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    token = _active_stages.set(active + (record,))
+    outcome = "ok"
+    started = time.perf_counter()
+    try:
+        yield record
+    except JobCancelled:
+        outcome = "cancelled"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        _active_stages.reset(token)
+        peak_alloc = None
+        if tracing:
+            # Nested stages reset the peak; their peaks are carried up in child_peak
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, record["child_peak"])
+            peak_alloc = max(0, peak - start_alloc)
+            if active:
+                active[-1]["child_peak"] = max(active[-1]["child_peak"], peak)
+        if active:
+            active[-1]["child_seconds"] += seconds
+
+        metrics.observe("stage", name, seconds, samples=record["samples"], peak_alloc=peak_alloc, outcome=outcome)
+        log = _stage_log.get()
+        if log is not None:
+            log.append({"stage": name, "seconds": seconds - record["child_seconds"], "samples": record["samples"],
+                        "peak_alloc": peak_alloc})
+
+
+def instrumented(name, samples=None):
+    """Decorator running the function as stage name
+
+    samples names the argument holding the sample count, or an array whose
+    length is the count.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            count = None
+            if samples is not None:
+                value = signature.bind(*args, **kwargs).arguments.get(samples)
+                count = _sample_count(value)
+            with stage(name, count):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _sample_count(value):
+    if value is None:
+        return None
+    if hasattr(value, "__len__"):
+        return len(value)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@contextlib.contextmanager
+def record_stages():
+    """Collect the stages finished in this context (and the jobs it runs) into the yielded list"""
+    log = []
+    token = _stage_log.set(log)
+    try:
+        yield log
+    finally:
+        _stage_log.reset(token)
+
+
+def summarize_stages(log):
+    """Stage breakdown of one run: per stage its calls, own seconds, samples and peak allocation, slowest first"""
+    totals = {}
+    for entry in log:
+        total = totals.setdefault(entry["stage"], {"stage": entry["stage"], "calls": 0, "seconds": 0.0, "samples": 0,
+                                                   "peak_alloc": None})
+        total["calls"] += 1
+        total["seconds"] += entry["seconds"]
+        total["samples"] += entry["samples"] or 0
+        if entry["peak_alloc"] is not None:
+            total["peak_alloc"] = max(total["peak_alloc"] or 0, entry["peak_alloc"])
+    return sorted(totals.values(), key=lambda total: total["seconds"], reverse=True)
+
+
+def format_stage_timings(log, elapsed=None):
+    """Timing breakdown lines appended to the statistics text"""
+    lines = ["", "TIMING BREAKDOWN", "-" * 40]
+    for total in summarize_stages(log):
+        line = f"{total['stage']:<16} {total['seconds'] * 1e3:10.1f} ms"
+        if total["calls"] > 1:
+            line += f"  ({total['calls']} calls)"
+        if total["samples"]:
+            line += f"  {total['samples']:,} samples"
+        if total["peak_alloc"] is not None:
+            line += f"  peak {total['peak_alloc'] / 2**20:,.1f} MB"
+        lines.append(line)
+    if elapsed is not None:
+        accounted = sum(entry["seconds"] for entry in log)
+        lines.append(f"{'other':<16} {max(elapsed - accounted, 0.0) * 1e3:10.1f} ms")
+        lines.append(f"{'total':<16} {elapsed * 1e3:10.1f} ms")
+    return "\n".join(lines)
+
+
+def instrument_callbacks(app):
+    """Time every callback registered on app from now on
+
+    Wraps app.callback, so call it before the register_* functions. Each
+    call is recorded under the callback function's name with outcome "ok",
+    "prevented" (PreventUpdate) or "error".
+    """
+    from dash.exceptions import PreventUpdate
+
+    register = app.callback
+
+    @functools.wraps(register)
+    def callback(*args, **kwargs):
+        decorator = register(*args, **kwargs)
+
+        def wrap(func):
+            @functools.wraps(func)
+            def timed(*func_args, **func_kwargs):
+                outcome = "ok"
+                started = time.perf_counter()
+                try:
+                    return func(*func_args, **func_kwargs)
+                except PreventUpdate:
+                    outcome = "prevented"
+                    raise
+                except BaseException:
+                    outcome = "error"
+                    raise
+                finally:
+                    metrics.observe("callback", func.__name__, time.perf_counter() - started, outcome=outcome)
+            return decorator(timed)
+        return wrap
+
+    app.callback = callback
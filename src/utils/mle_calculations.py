@@ -0,0 +1,85 @@
+# src/utils/mle_calculations.py
+
+import numpy as np
+from src.utils.metrics import instrumented
+
+@instrumented("mle", samples="data")
+def calculate_mle_parameters(data, distribution):
+    """Calculate MLE parameters for different distributions"""
+    try:
+        print(f"Calculating MLE for {distribution} with {len(data)} data points")
+        
+        if distribution == "normal":
+            # MLE for normal distribution
+            mu_mle = np.mean(data)
+            sigma_mle = np.std(data, ddof=0)  # MLE uses population std (ddof=0)
+            print(f"Normal MLE: mu={mu_mle:.6f}, sigma={sigma_mle:.6f}")
+            return mu_mle, sigma_mle
+            
+        elif distribution == "lognormal":
+            # Ensure all data points are positive
+            if np.any(data <= 0):
+                print(f"Lognormal MLE failed: data contains non-positive values (min={np.min(data)})")
+                return None, None
+            
+            # For lognormal, we fit to log(data) which should be normal
+            log_data = np.log(data)
+            mu_mle = np.mean(log_data)
+            sigma_mle = np.std(log_data, ddof=0)
+            
+            # Validate parameters to avoid overflow
+            if sigma_mle <= 0 or sigma_mle > 5:  # Limit sigma to reasonable range
+                print(f"Lognormal MLE: sigma out of range ({sigma_mle}), using fallback")
+                sigma_mle = min(sigma_mle, 1.0)
+            
+            print(f"Lognormal MLE: mu={mu_mle:.6f}, sigma={sigma_mle:.6f}")
+            return mu_mle, sigma_mle
+            
+        elif distribution == "uniform":
+            # MLE for uniform distribution - simple min/max
+            a_mle = np.min(data)
+            b_mle = np.max(data)
+            
+            # Add small buffer to ensure proper uniform distribution
+            range_buffer = (b_mle - a_mle) * 0.001
+            a_mle -= range_buffer
+            b_mle += range_buffer
+            
+            print(f"Uniform MLE: a={a_mle:.6f}, b={b_mle:.6f}")
+            return a_mle, b_mle
+            
+        elif distribution == "gamma":
+            # Ensure all data points are positive
+            if np.any(data <= 0):
+                print(f"Gamma MLE failed: data contains non-positive values (min={np.min(data)})")
+                return None, None
+            
+            # Method of moments for gamma distribution
+            sample_mean = np.mean(data)
+            sample_var = np.var(data, ddof=0)
+            
+            if sample_var <= 0:
+                print(f"Gamma MLE failed: no variance in data")
+                return None, None
+                
+            # Method of moments: shape = mean²/var, scale = var/mean
+            shape_mle = (sample_mean ** 2) / sample_var
+            scale_mle = sample_var / sample_mean
+            
+            # Ensure reasonable parameter ranges
+            if shape_mle <= 0 or scale_mle <= 0:
+                print(f"Gamma MLE failed: invalid parameters (shape={shape_mle}, scale={scale_mle})")
+                return None, None
+            
+            print(f"Gamma MLE: shape={shape_mle:.6f}, scale={scale_mle:.6f}")
+            return shape_mle, scale_mle
+            
+        else:
+            print(f"Unknown distribution: {distribution}")
+            return None, None
+            
+    except Exception as e:
+        print(f"MLE parameter calculation error for {distribution}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None, None
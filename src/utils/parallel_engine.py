@@ -0,0 +1,114 @@
+# src/utils/parallel_engine.py
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+import numpy as np
+from src.utils.jobs import JobCancelled, report_progress
+from src.utils.metrics import instrumented
+from src.utils.simulation_engine import (
+    DEFAULT_CHUNK_SIZE,
+    dimension_stream,
+    iter_chain_chunks,
+    resolve_seed
+)
+from src.utils.streaming_stats import DEFAULT_HIST_BINS, StreamingSummary, chain_histogram_range
+
+# One process pool is kept warm between runs; a run with another worker count replaces it
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# Seconds between progress/cancel checks while waiting for a shard
+SHARD_POLL_INTERVAL = 0.25
+
+
+def default_worker_count():
+    """Number of worker processes used when none is requested"""
+    return os.cpu_count() or 1
+
+
+def resolve_worker_count(workers=None):
+    """Requested worker count clamped to 1..cpu_count; None means all cores
+
+    The count comes from the browser, so the server bounds it: more
+    processes than cores only add start-up time and memory.
+    """
+    return max(1, min(int(workers or default_worker_count()), default_worker_count()))
+
+
+def get_process_pool(workers):
+    """Return the shared process pool, resized to the given number of workers"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                # Shards already submitted to the old pool still finish; its processes exit afterwards
+                _pool.shutdown(wait=False)
+            _pool, _pool_workers = ProcessPoolExecutor(max_workers=workers), workers
+        return _pool
+
+
+def shard_sizes(num_samples, shards):
+    """Split a sample count into near-equal shard sizes"""
+    base, extra = divmod(int(num_samples), shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+
+def run_shard(chain, shard_samples, entropy, shard, spec_limits, hist_range, hist_bins, use_float32, chunk_size):
+    """Stream one shard of the chain on its own SeedSequence children"""
+    n_dims = len(chain["codes"])
+    rngs = [dimension_stream(entropy, k, shard) for k in range(n_dims)]
+
+    stream = StreamingSummary(
+        spec_limits=spec_limits,
+        hist_range=hist_range,
+        hist_bins=hist_bins,
+        sketch_seed=np.random.SeedSequence(entropy, spawn_key=(shard,))
+    )
+    for chunk in iter_chain_chunks(chain, shard_samples, use_float32=use_float32, chunk_size=chunk_size, rngs=rngs):
+        stream.update(chunk)
+    return stream
+
+
+@instrumented("sampling", samples="num_samples")
+def summarize_chain_parallel(chain, num_samples, workers=None, seed=None, spec_limits=None, use_float32=False,
+                             chunk_size=DEFAULT_CHUNK_SIZE, hist_bins=DEFAULT_HIST_BINS):
+    """Shard the chain across a process pool and merge the partial statistics
+
+    Shard ``i`` draws dimension ``k`` from child ``(i, k)`` of the run's
+    SeedSequence and partial results are merged in shard order, so a given
+    seed and worker count always reproduce the same statistics bit for bit.
+    """
+    workers = resolve_worker_count(workers)
+    entropy = resolve_seed(seed)
+    hist_range = chain_histogram_range(chain)
+    sizes = shard_sizes(num_samples, workers)
+
+    pool = get_process_pool(workers)
+    futures = [
+        pool.submit(run_shard, chain, size, entropy, shard, spec_limits, hist_range, hist_bins, use_float32, chunk_size)
+        for shard, size in enumerate(sizes) if size > 0
+    ]
+
+    merged = None
+    try:
+        for done, future in enumerate(futures):
+            while True:
+                try:
+                    partial = future.result(timeout=SHARD_POLL_INTERVAL)
+                    break
+                except TimeoutError:
+                    # Lets a background job be cancelled while shards are still running
+                    report_progress(done / len(futures))
+            if merged is None:
+                merged = partial
+            else:
+                merged.merge(partial)
+            report_progress((done + 1) / len(futures), partial=merged.summary)
+    except JobCancelled:
+        # Shards already running finish in their processes; queued ones never start
+        for future in futures:
+            future.cancel()
+        raise
+    return merged
@@ -0,0 +1,144 @@
+# src/utils/result_cache.py
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Entries kept in the in-memory tier
+DEFAULT_MEMORY_ENTRIES = 64
+
+# Total size of the on-disk tier before the least recently used files are evicted
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+
+# On-disk location, overridable with the BAYESTOLSIM_CACHE_DIR environment variable
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "bayestolsim")
+
+# Bump when the cached result layout changes so stale entries are not reused
+CACHE_VERSION = 2
+
+
+def _jsonable(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, tuple):
+        return list(value)
+    raise TypeError(f"Cannot fingerprint {type(value).__name__}")
+
+
+def chain_fingerprint(chain, **settings):
+    """Stable hash of a chain's distributions, parameters, directions and run settings"""
+    payload = {
+        "version": CACHE_VERSION,
+        "codes": chain["codes"],
+        "para1": chain["para1"],
+        "para2": chain["para2"],
+        "signs": chain["signs"],
+        "settings": settings,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=_jsonable)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Two-tier result cache: an in-memory LRU in front of a size-bounded directory
+
+    Values must be JSON serializable. Disk writes go through a temporary file
+    and an atomic rename, so several app processes can share one directory.
+    """
+
+    def __init__(self, cache_dir=None, memory_entries=DEFAULT_MEMORY_ENTRIES, disk_bytes=DEFAULT_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        value = self._read_disk(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        self._remember(key, value)
+        self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            # Reads count as use for the least-recently-used eviction
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, default=_jsonable)
+            os.replace(tmp_path, self._path(key))
+            self._evict_disk()
+        except OSError as e:
+            print(f"Result cache write error: {e}")
+
+    def _evict_disk(self):
+        """Delete the least recently used files until the directory fits the size budget"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+                total -= size
+            except OSError:
+                pass
+
+
+# Shared cache for final dimension simulation results
+simulation_cache = ResultCache(cache_dir=os.environ.get("BAYESTOLSIM_CACHE_DIR", DEFAULT_CACHE_DIR))
@@ -0,0 +1,136 @@
+# src/utils/sensitivity.py
+
+import numpy as np
+from src.utils.metrics import instrumented
+
+# Equal-count bins used to estimate E[Y | X_k] for the correlation ratio
+DEFAULT_RATIO_BINS = 50
+
+# Largest sample count behind the contribution report: the matrix drawn for engines that keep no
+# per-dimension samples, and the subsample taken from larger standard runs
+SENSITIVITY_MAX_SAMPLES = 200_000
+
+# Seed of the row subsample, so the same run always reports the same table
+SUBSAMPLE_SEED = 0
+
+
+def correlation_ratio(x, y, bins=DEFAULT_RATIO_BINS):
+    """Binned estimate of eta^2 = Var(E[Y | X]) / Var(Y)
+
+    X is cut into equal-count bins, so the estimate also holds for
+    non-linear and non-monotonic dependence.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    var_y = y.var()
+    if y.size < 2 or var_y <= 0:
+        return 0.0
+
+    bins = max(1, min(int(bins), y.size // 2))
+    order = np.argsort(x, kind="stable")
+    bin_index = np.empty(y.size, dtype=np.intp)
+    bin_index[order] = np.arange(y.size) * bins // y.size
+    counts = np.bincount(bin_index, minlength=bins)
+    sums = np.bincount(bin_index, weights=y, minlength=bins)
+
+    mean_y = y.mean()
+    occupied = counts > 0
+    between = np.sum(counts[occupied] * (sums[occupied] / counts[occupied] - mean_y) ** 2) / y.size
+    return float(min(between / var_y, 1.0))
+
+
+def linear_share(centered, centered_total, var_total, additive=True):
+    """Cov(X_k, Y) / Var(Y) for an additive stack, else Corr(X_k, Y)^2"""
+    if var_total <= 0:
+        return 0.0
+    covariance = float(np.dot(centered, centered_total)) / centered_total.size
+    if additive:
+        return covariance / var_total
+    var_k = float(np.dot(centered, centered)) / centered.size
+    return covariance ** 2 / (var_k * var_total) if var_k > 0 else 0.0
+
+
+@instrumented("contributions", samples="total")
+def dimension_contributions(vectors, total, names=None, spec_limits=None, bins=DEFAULT_RATIO_BINS, additive=True,
+                            max_samples=None):
+    """Per-dimension share of the final variance and of the out-of-spec samples
+
+    vectors holds each dimension's signed samples, total their sum, row for
+    row. For every dimension this reports
+      variance_share  Cov(X_k, Y) / Var(Y); sums to 1 over the chain
+      eta2            correlation ratio Var(E[Y | X_k]) / Var(Y)
+      tail_share      share of the rejected samples' deviation from the mean
+                      carried by X_k; sums to 1, None without spec limits or
+                      rejected samples
+    For a non-additive stack (additive=False, vectors unsigned) the
+    variance share is the squared correlation Corr(X_k, Y)^2, which equals
+    the above for a linear sum, and the tail share is not reported.
+    Rows are ranked by variance share, largest first. With max_samples,
+    longer inputs are reduced to a fixed-seed subsample of that many rows
+    first, which bounds the per-dimension sorts of the correlation ratio.
+    """
+    total = np.asarray(total)
+    if max_samples is not None and total.size > max_samples:
+        keep = np.sort(np.random.default_rng(SUBSAMPLE_SEED).choice(total.size, int(max_samples), replace=False))
+        total = total[keep]
+        vectors = [np.asarray(vector)[keep] for vector in vectors]
+    total = np.asarray(total, dtype=np.float64)
+    centered_total = total - total.mean()
+    var_total = float(np.dot(centered_total, centered_total)) / total.size
+
+    rejected = None
+    if spec_limits is not None:
+        LSL, USL = spec_limits
+        # At or below LSL, above USL: the convention of the streaming and ECDF tail counts
+        rejected = (total <= LSL) | (total > USL)
+        if not rejected.any():
+            rejected = None
+
+    if rejected is not None:
+        # Deviations pointing away from the mean towards the violated limit count as positive
+        direction = np.sign(centered_total[rejected])
+        tail_norm = float(np.dot(centered_total[rejected], direction))
+
+    rows = []
+    for k, vector in enumerate(vectors):
+        vector = np.asarray(vector, dtype=np.float64)
+        centered = vector - vector.mean()
+        row = {
+            "position": k,
+            "name": names[k] if names is not None and k < len(names) and names[k] else f"Dim {k + 1}",
+            "variance_share": linear_share(centered, centered_total, var_total, additive),
+            "eta2": correlation_ratio(vector, total, bins),
+            "tail_share": None,
+        }
+        if additive and rejected is not None and tail_norm > 0:
+            row["tail_share"] = float(np.dot(centered[rejected], direction)) / tail_norm
+        rows.append(row)
+
+    rows.sort(key=lambda row: row["variance_share"], reverse=True)
+    return {
+        "rows": rows,
+        "samples": int(total.size),
+        "rejected": int(rejected.sum()) if rejected is not None else 0,
+    }
+
+
+def variance_contributions(variances, names=None):
+    """Contribution report of a linear stack from the analytic per-dimension variances
+
+    For a sum of independent dimensions both the variance share and the
+    correlation ratio of dimension k equal Var(X_k) / Var(Y), with no
+    sampling involved. Tail shares need samples and are not reported.
+    """
+    variances = np.asarray(variances, dtype=np.float64)
+    var_total = float(variances.sum())
+    rows = []
+    for k, variance in enumerate(variances):
+        share = float(variance / var_total) if var_total > 0 else 0.0
+        rows.append({
+            "position": k,
+            "name": names[k] if names is not None and k < len(names) and names[k] else f"Dim {k + 1}",
+            "variance_share": share,
+            "eta2": share,
+            "tail_share": None,
+        })
+    rows.sort(key=lambda row: row["variance_share"], reverse=True)
+    return {"rows": rows, "samples": None, "rejected": 0}
@@ -0,0 +1,238 @@
+# src/utils/simulation_engine.py
+
+import numpy as np
+from src.utils.distributions import distribution_moments
+from src.utils.jobs import report_progress
+from src.utils.metrics import instrumented
+
+# Numeric distribution codes used in compact chain descriptions
+DIST_CODES = {
+    "normal": 0,
+    "lognormal": 1,
+    "gamma": 2,
+    "uniform": 3,
+}
+
+DIST_NAMES = {code: name for name, code in DIST_CODES.items()}
+
+# Number of samples drawn per dimension before they are added to the total
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def is_valid_parameters(dist_type, para1, para2):
+    """Check distribution parameters using the same rules as the sampler"""
+    if dist_type == "normal" or dist_type == "lognormal":
+        return para2 > 0
+    elif dist_type == "gamma":
+        return para1 > 0 and para2 > 0
+    elif dist_type == "uniform":
+        return para2 > para1
+    return False
+
+
+def build_chain(dists, para1s, para2s, directions, names=None):
+    """Build a compact numeric chain description, skipping invalid dimensions"""
+    codes, p1, p2, signs, kept_names, indices = [], [], [], [], [], []
+
+    for i in range(len(dists)):
+        try:
+            para1 = float(para1s[i])
+            para2 = float(para2s[i])
+        except (TypeError, ValueError):
+            continue
+
+        if dists[i] not in DIST_CODES or not is_valid_parameters(dists[i], para1, para2):
+            continue
+
+        direction = directions[i] if i < len(directions) else "+"
+        codes.append(DIST_CODES[dists[i]])
+        p1.append(para1)
+        p2.append(para2)
+        signs.append(-1.0 if direction == "-" else 1.0)
+        kept_names.append(names[i] if names is not None and i < len(names) else f"Dim {i}")
+        indices.append(i)
+
+    if not codes:
+        return None
+
+    return {
+        "codes": np.array(codes, dtype=np.int8),
+        "para1": np.array(p1, dtype=np.float64),
+        "para2": np.array(p2, dtype=np.float64),
+        "signs": np.array(signs, dtype=np.float64),
+        "names": kept_names,
+        "indices": indices,
+    }
+
+
+def resolve_seed(seed=None):
+    """Return an integer entropy value, drawing fresh entropy when seed is None"""
+    if seed is None:
+        return int(np.random.SeedSequence().entropy)
+    return int(seed)
+
+
+def dimension_stream(entropy, dim_position, *spawn_prefix):
+    """Independent random generator for one chain position
+
+    Each dimension gets its own child stream of the run's SeedSequence so that
+    its samples depend only on the seed and its position, not on the others.
+    """
+    seq = np.random.SeedSequence(entropy, spawn_key=tuple(spawn_prefix) + (dim_position,))
+    return np.random.default_rng(seq)
+
+
+def draw_dimension(code, para1, para2, rng, out):
+    """Fill ``out`` in place with samples of one dimension"""
+    if code == 0:  # normal
+        rng.standard_normal(out=out, dtype=out.dtype)
+        out *= para2
+        out += para1
+    elif code == 1:  # lognormal
+        rng.standard_normal(out=out, dtype=out.dtype)
+        out *= para2
+        out += para1
+        np.exp(out, out=out)
+    elif code == 2:  # gamma (shape, scale)
+        rng.standard_gamma(para1, out=out, dtype=out.dtype)
+        out *= para2
+    elif code == 3:  # uniform (a, b)
+        rng.random(out=out, dtype=out.dtype)
+        out *= (para2 - para1)
+        out += para1
+    else:
+        raise ValueError(f"Unknown distribution code: {code}")
+    return out
+
+
+@instrumented("sampling", samples="num_samples")
+def simulate_chain(chain, num_samples, seed=None, use_float32=False, chunk_size=DEFAULT_CHUNK_SIZE, rngs=None):
+    """Draw the signed sum of all chain dimensions into one preallocated buffer
+
+    Dimensions are drawn chunk by chunk into a small scratch buffer and added
+    to the total in place, so peak memory is one final array plus one chunk.
+    """
+    dtype = np.float32 if use_float32 else np.float64
+    num_samples = int(num_samples)
+    n_dims = len(chain["codes"])
+
+    if rngs is None:
+        entropy = resolve_seed(seed)
+        rngs = [dimension_stream(entropy, k) for k in range(n_dims)]
+
+    if chain.get("expression") is not None:
+        total = np.empty(num_samples, dtype=dtype)
+        for start, block in iter_expression_chunks(chain, num_samples, rngs, chunk_size):
+            total[start:start + block.size] = block
+            report_progress((start + block.size) / num_samples)
+        return total
+
+    total = np.zeros(num_samples, dtype=dtype)
+    scratch = np.empty(min(chunk_size, num_samples), dtype=dtype)
+
+    for k in range(n_dims):
+        code = chain["codes"][k]
+        para1 = chain["para1"][k]
+        para2 = chain["para2"][k]
+        add = np.add if chain["signs"][k] > 0 else np.subtract
+
+        for start in range(0, num_samples, scratch.size):
+            stop = min(start + scratch.size, num_samples)
+            block = scratch[:stop - start]
+            draw_dimension(code, para1, para2, rngs[k], block)
+            add(total[start:stop], block, out=total[start:stop])
+            report_progress((k * num_samples + stop) / (n_dims * num_samples))
+
+    return total
+
+
+@instrumented("sampling", samples="num_samples")
+def sample_matrix(chain, num_samples, seed=None, use_float32=False, signed=True, rngs=None):
+    """Draw every chain dimension into one preallocated (n_dims, num_samples) matrix"""
+    dtype = np.float32 if use_float32 else np.float64
+    num_samples = int(num_samples)
+    n_dims = len(chain["codes"])
+
+    if rngs is None:
+        entropy = resolve_seed(seed)
+        rngs = [dimension_stream(entropy, k) for k in range(n_dims)]
+
+    matrix = np.empty((n_dims, num_samples), dtype=dtype)
+    for k in range(n_dims):
+        draw_dimension(chain["codes"][k], chain["para1"][k], chain["para2"][k], rngs[k], matrix[k])
+        if signed and chain["signs"][k] < 0:
+            np.negative(matrix[k], out=matrix[k])
+
+    return matrix
+
+
+def chain_moments(chain):
+    """Analytic mean and standard deviation of the signed chain sum"""
+    mean, var = 0.0, 0.0
+    for k in range(len(chain["codes"])):
+        dim_mean, dim_var = distribution_moments(DIST_NAMES[int(chain["codes"][k])], chain["para1"][k], chain["para2"][k])
+        mean += chain["signs"][k] * dim_mean
+        var += dim_var
+    return float(mean), float(np.sqrt(var))
+
+
+def iter_chain_chunks(chain, num_samples, seed=None, use_float32=False, chunk_size=DEFAULT_CHUNK_SIZE, rngs=None):
+    """Yield the final dimension in fixed-size chunks at constant memory
+
+    Every dimension stream is consumed in the same order as in simulate_chain,
+    so for a given seed the concatenated chunks equal the in-memory result.
+    The yielded array is reused between chunks; copy it to keep it.
+    """
+    dtype = np.float32 if use_float32 else np.float64
+    num_samples = int(num_samples)
+    n_dims = len(chain["codes"])
+
+    if rngs is None:
+        entropy = resolve_seed(seed)
+        rngs = [dimension_stream(entropy, k) for k in range(n_dims)]
+
+    if chain.get("expression") is not None:
+        for _, block in iter_expression_chunks(chain, num_samples, rngs, chunk_size):
+            yield block.astype(dtype, copy=False)
+        return
+
+    total = np.empty(min(chunk_size, num_samples), dtype=dtype)
+    scratch = np.empty_like(total)
+
+    for start in range(0, num_samples, total.size):
+        size = min(total.size, num_samples - start)
+        block_total = total[:size]
+        block_total.fill(0)
+        block = scratch[:size]
+
+        for k in range(n_dims):
+            draw_dimension(chain["codes"][k], chain["para1"][k], chain["para2"][k], rngs[k], block)
+            if chain["signs"][k] > 0:
+                block_total += block
+            else:
+                block_total -= block
+
+        yield block_total
+
+
+def iter_expression_chunks(chain, num_samples, rngs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (start, values) of a chain's stack expression, one chunk of columns at a time
+
+    Each chunk draws every dimension into a reused (n_dims, rows) block and
+    runs the compiled expression over it, so Python only loops over chunks
+    and dimensions. Each dimension stream is consumed in order, so the values
+    match a full-length draw with the same streams. The yielded array is
+    reused between chunks.
+    """
+    expression = chain["expression"]
+    n_dims = len(chain["codes"])
+    rows = min(expression.chunk_size(n_dims, chunk_size), num_samples)
+    columns = np.empty((n_dims, rows), dtype=np.float64)
+    values = np.empty(rows, dtype=np.float64)
+
+    for start in range(0, num_samples, rows):
+        size = min(rows, num_samples - start)
+        block = columns[:, :size]
+        for k in range(n_dims):
+            draw_dimension(chain["codes"][k], chain["para1"][k], chain["para2"][k], rngs[k], block[k])
+        yield start, expression.evaluate(block, out=values[:size])
@@ -0,0 +1,211 @@
+# src/utils/stack_expression.py
+
+import ast
+import math
+import re
+import numpy as np
+import numexpr as ne
+from numexpr.necompiler import getExprNames
+
+# Functions evaluated natively by numexpr; max, min, radians, degrees and hypot are rewritten into these
+NUMEXPR_FUNCTIONS = {
+    "sin", "cos", "tan", "arcsin", "arccos", "arctan", "arctan2", "sinh", "cosh", "tanh",
+    "sqrt", "exp", "log", "log10", "abs", "where",
+}
+
+CONSTANTS = {"pi": math.pi, "e": math.e}
+
+# Comparison and unary operators accepted; comparisons only as the condition of where() / 'a if cond else b'
+COMPARISONS = (ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+# Memory budget of the per-chunk column block (n_dims columns of one chunk)
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def variable_name(name):
+    """Identifier a dimension name is referenced by: non-alphanumerics become '_'"""
+    identifier = re.sub(r"\W", "_", str(name).strip())
+    if not identifier or identifier[0].isdigit():
+        identifier = f"_{identifier}"
+    return identifier
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Validate the parsed expression and rewrite it into numexpr's dialect"""
+
+    def __init__(self, variables):
+        self.variables = variables
+        self.used = set()
+
+    def generic_visit(self, node):
+        allowed = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.IfExp, ast.Call, ast.Name,
+                   ast.Constant, ast.Load, ast.operator) + COMPARISONS + UNARY_OPERATORS
+        if not isinstance(node, allowed):
+            raise ValueError(f"Unsupported syntax in stack expression: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+            raise ValueError(f"Only numbers are allowed as constants, got {node.value!r}")
+        return node
+
+    def visit_BinOp(self, node):
+        node = self.generic_visit(node)
+        if isinstance(node.op, (ast.FloorDiv, ast.MatMult, ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift)):
+            raise ValueError("Unsupported operator in stack expression")
+        return node
+
+    def visit_BoolOp(self, node):
+        raise ValueError("Use where(condition, a, b) instead of 'and'/'or'")
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, UNARY_OPERATORS):
+            raise ValueError("Use where(condition, a, b) instead of 'not'" if isinstance(node.op, ast.Not)
+                             else "Unsupported operator in stack expression")
+        return self.generic_visit(node)
+
+    def visit_Compare(self, node):
+        raise ValueError("Comparisons are only allowed as the condition of where(condition, a, b) or 'a if condition else b'")
+
+    def _condition(self, node):
+        """A single comparison between two values, the only form of condition numexpr's where() takes"""
+        if not isinstance(node, ast.Compare):
+            raise ValueError("The condition of where() / 'a if condition else b' must be a comparison such as A > B")
+        if len(node.ops) != 1:
+            raise ValueError("Chained comparisons are not supported; nest where() calls instead")
+        if not isinstance(node.ops[0], COMPARISONS):
+            raise ValueError(f"Unsupported comparison in stack expression: {type(node.ops[0]).__name__}")
+        node.left = self.visit(node.left)
+        node.comparators = [self.visit(node.comparators[0])]
+        return node
+
+    def visit_IfExp(self, node):
+        # a if cond else b -> where(cond, a, b)
+        return self._call("where", [self._condition(node.test), self.visit(node.body), self.visit(node.orelse)])
+
+    def visit_Name(self, node):
+        if node.id in CONSTANTS and node.id not in self.variables:
+            return ast.copy_location(ast.Constant(CONSTANTS[node.id]), node)
+        if node.id not in self.variables:
+            known = ", ".join(sorted(self.variables)) or "none"
+            raise ValueError(f"Unknown dimension '{node.id}' in stack expression (available: {known})")
+        self.used.add(node.id)
+        return node
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ValueError("Only plain function calls are allowed in stack expressions")
+        name = node.func.id
+        if name == "where":
+            if len(node.args) != 3:
+                raise ValueError("where() needs three arguments: where(condition, a, b)")
+            return self._call("where", [self._condition(node.args[0]), self.visit(node.args[1]), self.visit(node.args[2])])
+        args = [self.visit(arg) for arg in node.args]
+
+        if name in ("max", "min"):
+            if len(args) < 2:
+                raise ValueError(f"{name}() needs at least two arguments")
+            comparison = ast.Gt() if name == "max" else ast.Lt()
+            result = args[0]
+            for arg in args[1:]:
+                result = self._call("where", [ast.Compare(result, [comparison], [arg]), result, arg])
+            return result
+        if name == "radians":
+            return ast.BinOp(self._single(name, args), ast.Mult(), ast.Constant(math.pi / 180))
+        if name == "degrees":
+            return ast.BinOp(self._single(name, args), ast.Mult(), ast.Constant(180 / math.pi))
+        if name == "hypot":
+            if len(args) != 2:
+                raise ValueError("hypot() needs two arguments")
+            squares = ast.BinOp(ast.BinOp(args[0], ast.Pow(), ast.Constant(2)), ast.Add(),
+                                ast.BinOp(args[1], ast.Pow(), ast.Constant(2)))
+            return self._call("sqrt", [squares])
+        if name not in NUMEXPR_FUNCTIONS:
+            raise ValueError(f"Unknown function '{name}' in stack expression")
+        return self._call(name, args)
+
+    @staticmethod
+    def _single(name, args):
+        if len(args) != 1:
+            raise ValueError(f"{name}() needs one argument")
+        return args[0]
+
+    @staticmethod
+    def _call(name, args):
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[])
+
+
+class StackExpression:
+    """Final dimension as a user expression over named chain dimensions
+
+    The expression is validated, rewritten into numexpr's dialect and
+    compiled once, on construction, so any invalid expression raises
+    ValueError right away; evaluate() then runs the compiled program over
+    sample columns with numexpr's threads, one chunk at a time. Dimensions
+    enter with their sampled values, so directions are expressed in the
+    formula itself (e.g. 'A - B'). Pickling keeps only the source, so worker
+    processes recompile it when unpickling.
+    """
+
+    def __init__(self, expression, names):
+        self.source = str(expression).strip()
+        self.names = list(names)
+        self.variables = [variable_name(name) for name in self.names]
+        duplicates = {v for v in self.variables if self.variables.count(v) > 1}
+        if duplicates:
+            raise ValueError(f"Dimension names clash in stack expressions: {', '.join(sorted(duplicates))}")
+
+        try:
+            tree = ast.parse(self.source, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid stack expression: {e.msg}") from None
+
+        rewriter = _Rewriter(set(self.variables))
+        tree = ast.fix_missing_locations(rewriter.visit(tree))
+        self.text = ast.unparse(tree)
+        # Columns the program reads, in chain order
+        self.columns = [k for k, v in enumerate(self.variables) if v in rewriter.used]
+        self._program = None
+        try:
+            self.program()
+        except Exception as e:
+            raise ValueError(f"Invalid stack expression: {e}") from None
+
+    def __getstate__(self):
+        return {"source": self.source, "names": self.names}
+
+    def __setstate__(self, state):
+        self.__init__(state["source"], state["names"])
+
+    def program(self):
+        """Compiled numexpr program"""
+        if self._program is None:
+            signature = [(self.variables[k], np.float64) for k in self.columns]
+            self._program = ne.NumExpr(self.text, signature=signature)
+            self._uses_vml = getExprNames(self.text, {})[1]
+        return self._program
+
+    def evaluate(self, columns, out=None):
+        """Expression over a (n_dims, n) block of unsigned dimension samples"""
+        program = self.program()
+        args = [np.ascontiguousarray(columns[k], dtype=np.float64) for k in self.columns]
+        if not args:
+            # Constant expression
+            value = float(ne.evaluate(self.text))
+            n = np.shape(columns)[1]
+            if out is None:
+                return np.full(n, value)
+            out.fill(value)
+            return out
+        if out is not None and out.dtype == np.float64 and out.flags.c_contiguous:
+            return program(*args, out=out, order="K", casting="safe", ex_uses_vml=self._uses_vml)
+        result = program(*args, order="K", casting="safe", ex_uses_vml=self._uses_vml)
+        if out is None:
+            return result
+        out[...] = result
+        return out
+
+    def chunk_size(self, n_dims, chunk_size):
+        """Rows per chunk so that the column block stays within CHUNK_BYTES"""
+        return max(1, min(int(chunk_size), CHUNK_BYTES // (8 * max(n_dims, 1))))
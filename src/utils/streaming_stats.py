@@ -0,0 +1,232 @@
+# src/utils/streaming_stats.py
+
+import numpy as np
+from src.utils.jobs import report_progress
+from src.utils.metrics import instrumented
+from src.utils.simulation_engine import (
+    DEFAULT_CHUNK_SIZE,
+    chain_moments,
+    iter_chain_chunks,
+    resolve_seed,
+    sample_matrix
+)
+
+# Fine histogram kept alongside the streaming statistics for plotting
+DEFAULT_HIST_BINS = 2048
+
+# Histogram range in analytic standard deviations around the analytic mean
+HIST_RANGE_SIGMAS = 8.0
+
+# Pilot draws that place the histogram of a stack expression (no analytic moments)
+PILOT_SAMPLES = 20_000
+PILOT_SEED = 0
+
+
+class RunningMoments:
+    """Mergeable count, mean and second central moment (Chan et al.)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        n_b = values.size
+        if n_b == 0:
+            return
+        mean_b = float(np.mean(values, dtype=np.float64))
+        m2_b = float(np.sum(np.square(values - mean_b, dtype=np.float64)))
+        self._combine(n_b, mean_b, m2_b)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta**2 * n_a * n_b / n
+        self.count = n
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1)"""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch built from a hierarchy of compactors
+
+    Level ``h`` holds sorted items that each stand for ``2**h`` samples. A full
+    level is sorted and every other item, starting at a random offset, is
+    promoted to the next level (KLL-style compaction). Large chunks jump
+    straight to the level where they fit, so each chunk is sorted only once.
+    """
+
+    def __init__(self, capacity=8192, seed=None):
+        self.capacity = capacity
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.sort(np.asarray(values, dtype=np.float64).ravel())
+        if values.size == 0:
+            return
+        self.count += values.size
+
+        # Systematic sample of the sorted chunk at the first level it fits in
+        level = 0
+        while values.size > self.capacity:
+            level += 1
+            step = 2**level
+            if values.size // step <= self.capacity:
+                offset = self._rng.integers(step)
+                values = values[offset::step]
+                break
+
+        self._add(level, values)
+        self._compress()
+
+    def merge(self, other):
+        self.count += other.count
+        for level, items in enumerate(other.levels):
+            if items.size:
+                self._add(level, items)
+        self._compress()
+
+    def _add(self, level, items):
+        while len(self.levels) <= level:
+            self.levels.append(np.empty(0))
+        self.levels[level] = np.concatenate([self.levels[level], items])
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self.capacity:
+                items = np.sort(items)
+                # Keep an odd leftover item at this level so weights stay exact
+                n_even = items.size - items.size % 2
+                offset = self._rng.integers(2)
+                self.levels[level] = items[n_even:]
+                self._add(level + 1, items[offset:n_even:2])
+            level += 1
+
+    def quantile(self, q):
+        """Approximate quantile(s) for probabilities in [0, 1]; NaN while the sketch is empty"""
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(lv.size, 2.0**h) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items)
+        items = items[order]
+        cum_weights = np.cumsum(weights[order])
+        # Midpoint ranks, matching linear interpolation between order statistics
+        positions = (cum_weights - 0.5 * weights[order]) / cum_weights[-1]
+        return np.interp(q, positions, items)
+
+
+class StreamingSummary:
+    """Constant-memory statistics for a final dimension produced in chunks"""
+
+    def __init__(self, spec_limits=None, hist_range=None, hist_bins=DEFAULT_HIST_BINS, sketch_seed=None):
+        self.spec_limits = spec_limits
+        self.moments = RunningMoments()
+        self.min = np.inf
+        self.max = -np.inf
+        self.below_lsl = 0
+        self.above_usl = 0
+        self.sketch = QuantileSketch(seed=sketch_seed)
+
+        self.hist_edges = np.linspace(hist_range[0], hist_range[1], hist_bins + 1) if hist_range else None
+        self.hist_counts = np.zeros(hist_bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    def update(self, chunk):
+        self.moments.update(chunk)
+        self.min = min(self.min, float(np.min(chunk)))
+        self.max = max(self.max, float(np.max(chunk)))
+
+        if self.spec_limits is not None:
+            LSL, USL = self.spec_limits
+            self.below_lsl += int(np.count_nonzero(chunk <= LSL))
+            self.above_usl += int(np.count_nonzero(chunk > USL))
+
+        if self.hist_edges is not None:
+            counts, _ = np.histogram(chunk, bins=self.hist_edges)
+            self.hist_counts += counts
+            self.underflow += int(np.count_nonzero(chunk < self.hist_edges[0]))
+            self.overflow += int(np.count_nonzero(chunk > self.hist_edges[-1]))
+
+        self.sketch.update(chunk)
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.below_lsl += other.below_lsl
+        self.above_usl += other.above_usl
+        self.hist_counts += other.hist_counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.sketch.merge(other.sketch)
+
+    def summary(self):
+        """Statistics in the same layout as summarize_samples"""
+        n = self.moments.count
+        median, p5, p95 = self.sketch.quantile([0.5, 0.05, 0.95])
+        result = {
+            "count": n,
+            "mean": self.moments.mean,
+            "std": self.moments.std,
+            "min": self.min,
+            "max": self.max,
+            "median": float(median),
+            "p5": float(p5),
+            "p95": float(p95),
+            "cdf_at_lsl": None,
+            "cdf_right_of_usl": None,
+        }
+        if self.spec_limits is not None and n:
+            result["cdf_at_lsl"] = self.below_lsl / n
+            result["cdf_right_of_usl"] = self.above_usl / n
+        return result
+
+
+def chain_histogram_range(chain):
+    """Fixed histogram range for a chain, known before the run's samples are drawn
+
+    A signed sum uses its analytic moments. A stack expression has none, so
+    a small fixed-seed pilot sample stands in, widened to cover its extremes.
+    """
+    if chain.get("expression") is None:
+        mean, std = chain_moments(chain)
+        half_width = HIST_RANGE_SIGMAS * std if std > 0 else 1.0
+        return mean - half_width, mean + half_width
+
+    pilot = chain["expression"].evaluate(sample_matrix(chain, PILOT_SAMPLES, seed=PILOT_SEED, signed=False))
+    mean, std = float(pilot.mean()), float(pilot.std())
+    half_width = HIST_RANGE_SIGMAS * std if std > 0 else 1.0
+    return min(mean - half_width, float(pilot.min())), max(mean + half_width, float(pilot.max()))
+
+
+@instrumented("sampling", samples="num_samples")
+def summarize_chain_stream(chain, num_samples, seed=None, spec_limits=None, use_float32=False,
+                           chunk_size=DEFAULT_CHUNK_SIZE, hist_bins=DEFAULT_HIST_BINS):
+    """Stream the chain in chunks and return a filled StreamingSummary"""
+    entropy = resolve_seed(seed)
+
+    stream = StreamingSummary(
+        spec_limits=spec_limits,
+        hist_range=chain_histogram_range(chain),
+        hist_bins=hist_bins,
+        sketch_seed=entropy
+    )
+    for chunk in iter_chain_chunks(chain, num_samples, seed=entropy, use_float32=use_float32, chunk_size=chunk_size):
+        stream.update(chunk)
+        report_progress(stream.moments.count / num_samples, partial=stream.summary)
+    return stream
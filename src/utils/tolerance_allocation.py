@@ -0,0 +1,193 @@
+# src/utils/tolerance_allocation.py
+
+import time
+import numpy as np
+from scipy.optimize import minimize
+from src.utils.convolution_engine import convolution_cdf, convolve_chain
+from src.utils.simulation_engine import build_chain, chain_moments
+
+# Constraint metrics the optimizer can hold the final dimension to
+ALLOCATION_METRICS = ("cpk", "ppm")
+
+# Grid of the convolution evaluator inside the optimizer (coarser than for plots)
+EVALUATOR_GRID_POINTS = 4096
+
+# Allowed scaling of each tolerance band relative to its entered width
+MIN_SCALE = 1e-2
+MAX_SCALE = 1e2
+
+# Constraint margin reported for allocations the mapping cannot parameterize
+INVALID_PENALTY = 1e3
+
+# Coarse scan points and bisection steps on the overall tolerance scale
+SCAN_STEPS = 25
+BISECTION_STEPS = 30
+
+
+class AllocationError(ValueError):
+    """The allocation problem cannot be set up or has no feasible solution"""
+
+
+class StackEvaluator:
+    """Final dimension Cpk or out-of-spec ppm for candidate tolerance allocations
+
+    Variable dimensions are re-parameterized from their (scaled) tolerance
+    band through to_params; fixed dimensions keep their parameters. Cpk comes
+    from the analytic chain moments, ppm from the FFT convolution of the
+    component PDFs, so every candidate is exact and noise-free.
+    """
+
+    def __init__(self, variable, fixed, spec_limits, to_params, metric="cpk"):
+        if metric not in ALLOCATION_METRICS:
+            raise AllocationError(f"Unknown allocation metric: {metric}")
+        self.variable = variable
+        self.fixed = fixed
+        self.spec_limits = spec_limits
+        self.to_params = to_params
+        self.metric = metric
+        self.evaluations = 0
+
+    def parameters(self, scales):
+        """(para1, para2) of every variable dimension at the given band scales"""
+        params = []
+        for item, scale in zip(self.variable, scales):
+            para1, para2 = self.to_params(item["dist"], item["nominal"], item["upper_tol"] * scale, item["lower_tol"] * scale)
+            params.append((float(para1), float(para2)))
+        return params
+
+    def chain(self, scales):
+        items = list(self.fixed)
+        for item, (para1, para2) in zip(self.variable, self.parameters(scales)):
+            items.append({"dist": item["dist"], "para1": para1, "para2": para2, "dir": item["dir"]})
+        return build_chain([i["dist"] for i in items], [i["para1"] for i in items], [i["para2"] for i in items],
+                           [i["dir"] for i in items])
+
+    def __call__(self, scales):
+        """Metric value at the given band scales (Cpk, or ppm out of spec)"""
+        self.evaluations += 1
+        chain = self.chain(scales)
+        if chain is None or len(chain["codes"]) != len(self.fixed) + len(self.variable):
+            # The mapping gave unusable (e.g. rounded to zero) parameters for some band
+            return None
+
+        LSL, USL = self.spec_limits
+        if self.metric == "cpk":
+            mean, std = chain_moments(chain)
+            return min(USL - mean, mean - LSL) / (3 * std) if std > 0 else np.inf
+
+        result = convolve_chain(chain, grid_points=EVALUATOR_GRID_POINTS)
+        out_of_spec = convolution_cdf(result, LSL) + 1 - convolution_cdf(result, USL)
+        return float(out_of_spec) * 1e6
+
+    def margin(self, scales, target):
+        """Positive when the constraint holds with room to spare"""
+        value = self(scales)
+        if value is None:
+            return -INVALID_PENALTY
+        return value - target if self.metric == "cpk" else np.log(target) - np.log(max(value, 1e-300))
+
+
+def allocation_cost(widths, weights, exponent):
+    """Cost model sum(w_i / t_i^k) of tolerance widths t_i"""
+    return float(np.sum(weights / widths ** exponent))
+
+
+def refine_allocation(evaluator, start, widths0, weights, exponent, target):
+    """SLSQP on log band scales from a feasible start; keeps the start unless it finds a cheaper feasible point"""
+    def objective(log_scales):
+        return allocation_cost(widths0 * np.exp(log_scales), weights, exponent)
+
+    def gradient(log_scales):
+        return -exponent * weights / (widths0 * np.exp(log_scales)) ** exponent
+
+    refined = minimize(
+        objective, np.log(start), jac=gradient, method="SLSQP",
+        bounds=[(np.log(MIN_SCALE), np.log(MAX_SCALE))] * len(start),
+        constraints=[{"type": "ineq", "fun": lambda log_scales: evaluator.margin(np.exp(log_scales), target)}],
+        options={"maxiter": 100, "ftol": 1e-9}
+    )
+    if refined.success and evaluator.margin(np.exp(refined.x), target) >= 0 and refined.fun < objective(np.log(start)):
+        return np.exp(refined.x)
+    return start
+
+
+def allocate_tolerances(variable, fixed, spec_limits, to_params, target, metric="cpk", cost_exponent=1.0, weights=None):
+    """Widest (cheapest) tolerance bands meeting a final dimension Cpk or ppm target
+
+    variable: dimensions whose bands may change, as dicts with dist, nominal,
+    upper_tol, lower_tol and dir; each band is scaled about its nominal, so
+    asymmetric bands keep their shape. fixed: dimensions with dist, para1,
+    para2 and dir that stay as they are. The cost sum(w_i / t_i^k) is
+    minimized over the band widths t_i subject to Cpk >= target or
+    ppm <= target.
+
+    The start is the allocation that is optimal when the constraint depends
+    only on the stack variance, t_i proportional to (w_i / a_i^2)^(1/(k+2))
+    with a_i the std per unit of band width, scaled onto the constraint by
+    bisection on the exact evaluator. For Cpk, whose analytic evaluator is
+    smooth and cheap, SLSQP then refines it, which also accounts for mean
+    shifts of asymmetric bands. ppm evaluations are FFT convolutions whose
+    grid moves with the band widths, too noisy for finite-difference
+    gradients, so the ppm allocation stays on the variance-optimal shape.
+    """
+    if not variable:
+        raise AllocationError("No dimension has a complete nominal and tolerance band to optimize")
+
+    started = time.perf_counter()
+    evaluator = StackEvaluator(variable, fixed, spec_limits, to_params, metric)
+    widths0 = np.array([item["upper_tol"] - item["lower_tol"] for item in variable], dtype=np.float64)
+    if np.any(widths0 <= 0):
+        raise AllocationError("Every tolerance band to optimize needs upper > lower tolerance")
+    weights = np.ones(len(variable)) if weights is None else np.asarray(weights, dtype=np.float64)
+    k = float(cost_exponent)
+
+    # Std of each dimension per unit of band width, from its current band
+    unit_std = []
+    for item in variable:
+        single = StackEvaluator([item], [], spec_limits, to_params, "cpk").chain([1.0])
+        unit_std.append(chain_moments(single)[1] / (item["upper_tol"] - item["lower_tol"]))
+    unit_std = np.asarray(unit_std)
+
+    shape = (weights / unit_std ** 2) ** (1 / (k + 2))
+    shape = shape / shape.max() * widths0.max()
+    base = shape / widths0  # band scales at overall factor 1
+
+    def feasible(factor):
+        return evaluator.margin(np.clip(base * factor, MIN_SCALE, MAX_SCALE), target) >= 0
+
+    # Scan down from the widest bands to the first feasible factor, then bisect the step above it.
+    # Very narrow bands can be infeasible too when the mapping rounds their parameters away.
+    factors = np.geomspace(MAX_SCALE / base.max(), MIN_SCALE / base.min(), SCAN_STEPS)
+    low = high = None
+    for factor in factors:
+        if feasible(factor):
+            low = factor
+            break
+        high = factor
+    if low is None:
+        raise AllocationError("Target cannot be met even with the tightest bands; the fixed dimensions or centring dominate")
+    if high is not None:
+        for _ in range(BISECTION_STEPS):
+            middle = np.sqrt(low * high)
+            low, high = (middle, high) if feasible(middle) else (low, middle)
+    start = np.clip(base * low, MIN_SCALE, MAX_SCALE)
+
+    scales = start
+    if metric == "cpk":
+        scales = refine_allocation(evaluator, start, widths0, weights, k, target)
+
+    params = evaluator.parameters(scales)
+    return {
+        "upper_tols": [float(item["upper_tol"] * s) for item, s in zip(variable, scales)],
+        "lower_tols": [float(item["lower_tol"] * s) for item, s in zip(variable, scales)],
+        "params": params,
+        "cost": allocation_cost(widths0 * scales, weights, k),
+        "initial_cost": allocation_cost(widths0, weights, k),
+        "value": evaluator(scales),
+        "initial_value": evaluator(np.ones(len(variable))),
+        "scales": [float(s) for s in scales],
+        "metric": metric,
+        "target": target,
+        "evaluations": evaluator.evaluations,
+        "elapsed": time.perf_counter() - started,
+    }
@@ -0,0 +1,60 @@
+# tests/test_adaptive_sampling.py
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+from src.utils.adaptive_sampling import precision_reached, run_adaptive_chain, wilson_interval
+from src.utils.simulation_engine import build_chain, simulate_chain
+
+SPEC_LIMITS = (8.6, 9.4)
+
+
+@pytest.fixture
+def chain():
+    return build_chain(["normal", "uniform", "gamma"], [10.0, 1.0, 9.0], [0.1, 1.3, 0.01], ["+", "-", "+"])
+
+
+def test_wilson_interval_brackets_the_fraction():
+    z = norm.ppf(0.975)
+    lower, upper = wilson_interval(30, 1_000, z)
+    assert lower < 0.03 < upper
+    assert wilson_interval(0, 1_000, z)[0] == pytest.approx(0.0, abs=1e-15)
+    assert 0 < wilson_interval(0, 1_000, z)[1] < 0.01
+    assert wilson_interval(1_000, 1_000, z)[1] == 1.0
+
+
+def test_stops_on_precision_with_a_prefix_of_the_standard_run(chain):
+    run = run_adaptive_chain(chain, 10_000_000, relative_precision=0.01, seed=3, time_budget=None)
+    assert run.reason == "precision reached"
+    assert run.samples_used < 10_000_000
+    assert precision_reached(run.intervals, 0.01)
+
+    # Same per-dimension streams as the standard engine
+    samples = simulate_chain(chain, run.samples_used, seed=3)
+    assert run.stream.moments.mean == pytest.approx(samples.mean(), rel=1e-12)
+    assert run.stream.moments.std == pytest.approx(samples.std(ddof=1), rel=1e-9)
+
+
+def test_intervals_cover_the_standard_run(chain):
+    run = run_adaptive_chain(chain, 400_000, relative_precision=1e-4, seed=5, spec_limits=SPEC_LIMITS, time_budget=None)
+    assert run.reason == "sample budget reached"
+    assert run.samples_used == 400_000
+
+    reference = simulate_chain(chain, 4_000_000, seed=99)
+    _, lower, upper = run.intervals["mean"]
+    assert lower < reference.mean() < upper
+    _, lower, upper = run.intervals["cdf_at_lsl"]
+    assert lower < np.mean(reference <= SPEC_LIMITS[0]) < upper
+
+
+def test_stops_on_time_budget(chain):
+    run = run_adaptive_chain(chain, 10**9, relative_precision=1e-6, seed=1, time_budget=0.0)
+    assert run.reason == "time budget reached"
+    assert run.samples_used < 10**9
+
+
+def test_interval_keys_follow_spec_limits(chain):
+    run = run_adaptive_chain(chain, 20_000, seed=2, spec_limits=SPEC_LIMITS, time_budget=None)
+    assert set(run.intervals) == {"mean", "std", "cpk", "cdf_at_lsl", "cdf_right_of_usl"}
+    run = run_adaptive_chain(chain, 20_000, seed=2, time_budget=None)
+    assert set(run.intervals) == {"mean", "std"}
@@ -0,0 +1,105 @@
+# tests/test_api.py
+
+import math
+import numpy as np
+import pytest
+from flask import Flask
+from src.api import register_api
+from src.utils import api_service
+from src.utils.api_service import API_MAX_SAMPLES, json_safe
+
+CHAIN = {
+    "name": "gap",
+    "final_tolerance": {"upper": 0.03, "lower": -0.03},
+    "samples": 20_000,
+    "seed": 1,
+    "dimensions": [
+        {"name": "Bore", "distribution": "normal", "nominal": 10.1, "upper_tol": 0.03, "lower_tol": -0.03, "direction": "+"},
+        {"name": "Shaft", "distribution": "normal", "nominal": 10.0, "upper_tol": 0.03, "lower_tol": -0.03, "direction": "-"},
+    ],
+}
+PRIOR = {"distribution": "normal", "nominal": 10.0, "upper_tol": 0.05, "lower_tol": -0.05}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Evaluate in the test process rather than on the worker pool
+    monkeypatch.setattr(api_service, "API_WORKERS", 1)
+    server = Flask(__name__)
+    register_api(server)
+    return server.test_client()
+
+
+def test_health_reports_the_limits(client):
+    body = client.get("/api/v1/health").get_json()
+    assert body["status"] == "ok"
+    assert (body["max_items"], body["max_samples"]) == (api_service.API_MAX_ITEMS, API_MAX_SAMPLES)
+    assert "normal" in body["distributions"] and "importance" in body["engines"]
+
+
+def test_single_item_status_follows_its_result(client):
+    response = client.post("/api/v1/prior", json=PRIOR)
+    assert response.status_code == 200
+    assert (response.get_json()["para1"], response.get_json()["para2"]) == pytest.approx((10.0, 0.1 / 6), abs=1e-6)
+
+    response = client.post("/api/v1/prior", json=dict(PRIOR, distribution="cauchy"))
+    assert response.status_code == 400 and response.get_json()["status"] == "error"
+
+
+def test_batch_keeps_order_and_counts_failures(client):
+    chains = [dict(CHAIN, name="first"), dict(CHAIN, name="broken", dimensions=[]), dict(CHAIN, name="last")]
+    response = client.post("/api/v1/stackup", json={"chains": chains})
+    body = response.get_json()
+    assert response.status_code == 200
+    assert [result["chain"] for result in body["results"]] == ["first", "broken", "last"]
+    assert (body["count"], body["failed"]) == (3, 1)
+    assert body["results"][0]["cpk"] == pytest.approx(0.03 / (3 * 0.01 * math.sqrt(2)), rel=0.05)
+
+
+def test_batch_size_limit(client, monkeypatch):
+    monkeypatch.setattr(api_service, "API_MAX_ITEMS", 2)
+    response = client.post("/api/v1/prior", json={"dimensions": [PRIOR] * 3})
+    assert response.status_code == 400
+    assert "At most 2 dimensions" in response.get_json()["error"]
+    assert client.post("/api/v1/prior", json={"dimensions": [PRIOR] * 2}).status_code == 200
+
+
+def test_sample_limit_per_chain(client):
+    response = client.post("/api/v1/stackup", json=dict(CHAIN, samples=API_MAX_SAMPLES + 1))
+    assert response.status_code == 400
+    assert "samples per chain" in response.get_json()["error"]
+
+    # Batch-wide defaults are held to the same limit
+    body = client.post("/api/v1/stackup", json={"chains": [dict(CHAIN, samples=None)], "samples": API_MAX_SAMPLES + 1}).get_json()
+    assert body["failed"] == 1
+
+
+def test_malformed_bodies_are_rejected(client):
+    assert client.post("/api/v1/prior", data="not json", content_type="application/json").status_code == 400
+    assert client.post("/api/v1/prior", data="{}", content_type="text/plain").status_code == 400
+    assert client.post("/api/v1/prior", json=[PRIOR]).status_code == 400
+    assert client.post("/api/v1/prior", json={"dimensions": [1, 2]}).status_code == 400
+
+
+def test_server_files_are_not_read(client):
+    dimension = dict(CHAIN["dimensions"][0], measurements="data/mle_sample_data.csv", method="mle")
+    response = client.post("/api/v1/stackup", json=dict(CHAIN, dimensions=[dimension, CHAIN["dimensions"][1]]))
+    assert response.status_code == 400
+    assert "measurement files are not accepted" in response.get_json()["error"]
+
+
+def test_posterior_from_a_summary(client):
+    body = client.post("/api/v1/posterior", json=dict(PRIOR, summary={"n": 30, "mean": 10.02, "std": 0.01})).get_json()
+    assert body["status"] == "ok"
+    assert 10.0 < body["para1"] < 10.02
+
+
+def test_json_safe_values():
+    value = json_safe({"a": np.float64("nan"), "b": np.arange(3), "c": (np.inf, np.int64(2))})
+    assert value == {"a": None, "b": [0, 1, 2], "c": [None, 2]}
+
+
+def test_metrics_endpoint(client):
+    client.post("/api/v1/prior", json=PRIOR)
+    assert client.get("/api/v1/metrics").mimetype == "text/plain"
+    assert isinstance(client.get("/api/v1/metrics?format=json").get_json(), dict)
@@ -0,0 +1,80 @@
+# tests/test_batch_cli.py
+
+import csv
+import json
+import numpy as np
+import pytest
+import batch
+from scipy.stats import norm
+from src.utils.batch_runner import RESULT_COLUMNS, evaluate_definition
+
+# Bore N(10.1, 0.01) minus shaft N(10.0, 0.01): gap N(0.1, 0.01 * sqrt(2))
+GAP = {
+    "name": "gap",
+    "final_tolerance": {"upper": 0.03, "lower": -0.03},
+    "dimensions": [
+        {"name": "Bore", "distribution": "normal", "nominal": 10.1, "upper_tol": 0.03, "lower_tol": -0.03, "direction": "+"},
+        {"name": "Shaft", "distribution": "normal", "nominal": 10.0, "upper_tol": 0.03, "lower_tol": -0.03, "direction": "-"},
+    ],
+}
+GAP_STD = 0.01 * np.sqrt(2)
+
+
+def _write_definitions(tmp_path, definitions):
+    path = tmp_path / "chains.json"
+    path.write_text(json.dumps({"chains": definitions}), encoding="utf-8")
+    return str(path)
+
+
+def _read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        assert tuple(reader.fieldnames) == RESULT_COLUMNS
+        return list(reader)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rows_come_back_in_input_order(tmp_path, workers):
+    definitions = [dict(GAP, name=f"gap {i}", seed=i) for i in range(5)]
+    output = tmp_path / "results.csv"
+    assert batch.main([_write_definitions(tmp_path, definitions), "-o", str(output), "-w", str(workers), "-q"]) == 0
+    rows = _read_rows(output)
+    assert [row["chain"] for row in rows] == [f"gap {i}" for i in range(5)]
+    assert all(row["status"] == "ok" for row in rows)
+
+
+def test_failing_chain_gives_an_error_row_and_exit_code(tmp_path):
+    broken = {"name": "broken", "dimensions": [{"name": "X", "distribution": "cauchy", "para1": 0, "para2": 1}]}
+    output = tmp_path / "results.csv"
+    assert batch.main([_write_definitions(tmp_path, [GAP, broken]), "-o", str(output), "-w", "1", "-q"]) == 1
+    ok, error = _read_rows(output)
+    assert ok["status"] == "ok"
+    assert error["status"] == "error" and "cauchy" in error["error"]
+
+
+def test_command_line_defaults_fill_missing_settings(tmp_path):
+    output = tmp_path / "results.csv"
+    batch.main([_write_definitions(tmp_path, [GAP]), "-o", str(output), "-w", "1", "-q",
+                "--engine", "convolution", "--samples", "5000", "--seed", "2"])
+    row = _read_rows(output)[0]
+    assert row["engine"] == "convolution"
+
+
+@pytest.mark.parametrize("engine", ["standard", "streaming", "convolution", "adaptive", "importance", "sobol", "halton"])
+def test_engines_agree_with_the_analytic_stack(engine):
+    row = evaluate_definition(("gap", ".", dict(GAP, engine=engine, samples=200_000, seed=1), {}))
+    assert row["status"] == "ok", row["error"]
+    assert row["mean"] == pytest.approx(0.1, abs=2e-4)
+    assert row["std"] == pytest.approx(GAP_STD, rel=0.02)
+    assert row["nominal"] == pytest.approx(0.1)
+    assert (row["lsl"], row["usl"]) == pytest.approx((0.07, 0.13))
+    assert row["cpk"] == pytest.approx(0.03 / (3 * GAP_STD), rel=0.03)
+    assert row["ppm_out"] == pytest.approx(2 * norm.sf(0.03 / GAP_STD) * 1e6, rel=0.1)
+
+
+def test_measurements_select_the_parameters():
+    shaft = dict(GAP["dimensions"][1], measurements=[list(np.random.default_rng(0).normal(10.0, 0.01, 200))], method="mle")
+    definition = dict(GAP, dimensions=[GAP["dimensions"][0], shaft], seed=1)
+    row = evaluate_definition(("gap", None, definition, {}))
+    assert row["status"] == "ok", row["error"]
+    assert row["methods"] == "tolerance,mle"
@@ -0,0 +1,47 @@
+# tests/test_convolution_engine.py
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+from src.utils.convolution_engine import convolution_cdf, convolution_quantile, convolve_chain, summarize_convolution
+from src.utils.ecdf import EmpiricalCDF
+from src.utils.simulation_engine import build_chain, simulate_chain
+
+
+def test_normal_stack_matches_analytic_normal_into_the_tails():
+    chain = build_chain(["normal", "normal", "normal"], [10.0, 4.0, 2.5], [0.1, 0.05, 0.2], ["+", "-", "+"])
+    mean, std = 10.0 - 4.0 + 2.5, np.sqrt(0.1**2 + 0.05**2 + 0.2**2)
+    result = convolve_chain(chain)
+
+    assert result["mean"] == pytest.approx(mean)
+    assert result["std"] == pytest.approx(std)
+    for k in (1, 2, 3, 4, 5):
+        # Relative agreement of the tail probabilities down to about 0.3 ppm
+        assert convolution_cdf(result, mean - k * std) == pytest.approx(norm.cdf(-k), rel=0.02)
+        assert 1 - convolution_cdf(result, mean + k * std) == pytest.approx(norm.sf(k), rel=0.02)
+    q = [0.001, 0.05, 0.5, 0.95, 0.999]
+    np.testing.assert_allclose(convolution_quantile(result, q), norm.ppf(q, mean, std), atol=1e-3 * std)
+
+
+def test_mixed_stack_agrees_with_monte_carlo():
+    chain = build_chain(["normal", "uniform", "gamma", "lognormal"], [10.0, 1.0, 9.0, 0.5], [0.1, 1.3, 0.01, 0.05],
+                        ["+", "-", "+", "-"])
+    summary = summarize_convolution(convolve_chain(chain), spec_limits=(7.4, 8.6))
+    samples = simulate_chain(chain, 1_000_000, seed=1)
+    ecdf = EmpiricalCDF(samples)
+    std = samples.std()
+
+    assert summary["mean"] == pytest.approx(samples.mean(), abs=5 * std / 1e3)
+    assert summary["std"] == pytest.approx(std, rel=0.01)
+    for key, p in (("median", 0.5), ("p5", 0.05), ("p95", 0.95)):
+        assert summary[key] == pytest.approx(float(ecdf.quantile(p)), abs=0.01 * std)
+    cdf_at_lsl, cdf_right_of_usl = ecdf.exceedance(7.4, 8.6)
+    assert summary["cdf_at_lsl"] == pytest.approx(cdf_at_lsl, abs=2e-3)
+    assert summary["cdf_right_of_usl"] == pytest.approx(cdf_right_of_usl, abs=2e-3)
+
+
+def test_density_integrates_to_one():
+    chain = build_chain(["uniform", "gamma"], [0.0, 4.0], [1.0, 0.5], ["+", "+"])
+    result = convolve_chain(chain)
+    assert np.sum(result["density"]) * result["delta"] == pytest.approx(1.0)
+    assert result["cdf"][0] >= 0 and result["cdf"][-1] == pytest.approx(1.0, abs=1e-9)
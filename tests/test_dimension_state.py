@@ -0,0 +1,43 @@
+# tests/test_dimension_state.py
+
+import pickle
+import numpy as np
+import pytest
+from src.stores.dimension_state import DimensionState
+
+
+def test_measurements_become_contiguous_float64_arrays():
+    state = DimensionState(mle_data=[1, 2, 3])
+    assert state.mle_data.dtype == np.float64 and state.mle_data.flags.c_contiguous
+    state.update(bayes_data=np.arange(10)[::2])
+    assert state.bayes_data.dtype == np.float64 and state.bayes_data.flags.c_contiguous
+    np.testing.assert_array_equal(state.bayes_data, [0, 2, 4, 6, 8])
+    assert DimensionState().mle_data.shape == (0,)
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(AttributeError):
+        DimensionState().update(mle_aplied=True)
+
+
+def test_for_key_names_the_dimension():
+    assert DimensionState.for_key("dim_4").name == "Dim 4"
+
+
+def test_copy_is_independent_for_field_assignment():
+    state = DimensionState(name="A", mle_data=[1.0])
+    copy = state.copy()
+    copy.update(name="B", mle_data=[2.0])
+    assert state.name == "A"
+    np.testing.assert_array_equal(state.mle_data, [1.0])
+
+
+def test_pickle_round_trip_and_as_dict():
+    state = DimensionState(name="A", dist="normal", para1=10.0, para2=0.1, bayes_applied=True, bayes_data=[1.5, 2.5],
+                           prior_params_full={"mu": 10.0})
+    restored = pickle.loads(pickle.dumps(state))
+    values = restored.as_dict()
+    assert values["name"] == "A" and values["bayes_applied"] and values["prior_params_full"] == {"mu": 10.0}
+    np.testing.assert_array_equal(values["bayes_data"], [1.5, 2.5])
+    # Slotted records carry no per-instance dict
+    assert not hasattr(state, "__dict__")
@@ -0,0 +1,40 @@
+# tests/test_ecdf.py
+
+import numpy as np
+import pytest
+from src.utils.ecdf import EmpiricalCDF
+
+PROBABILITIES = [0.0, 0.001, 0.05, 0.25, 0.5, 0.75, 0.95, 0.999, 1.0]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1_000, 100_001])
+def test_quantiles_match_numpy_percentile(size):
+    samples = np.random.default_rng(size).gamma(2.0, 1.5, size)
+    ecdf = EmpiricalCDF(samples)
+    np.testing.assert_allclose(ecdf.quantile(PROBABILITIES), np.percentile(samples, np.multiply(PROBABILITIES, 100)),
+                               rtol=1e-12, atol=0)
+    np.testing.assert_allclose(ecdf.percentile([5, 95]), np.percentile(samples, [5, 95]), rtol=1e-12, atol=0)
+    assert ecdf.median == pytest.approx(np.median(samples), rel=1e-12)
+
+
+def test_quantiles_with_ties_and_float32():
+    samples = np.round(np.random.default_rng(0).normal(10, 0.1, 10_000), 2).astype(np.float32)
+    ecdf = EmpiricalCDF(samples)
+    np.testing.assert_allclose(ecdf.quantile(PROBABILITIES),
+                               np.percentile(samples.astype(np.float64), np.multiply(PROBABILITIES, 100)), rtol=1e-12)
+
+
+def test_in_place_sort_gives_the_same_ecdf():
+    samples = np.random.default_rng(1).normal(size=5_000)
+    expected = EmpiricalCDF(samples).quantile(PROBABILITIES)
+    shared = samples.copy()
+    np.testing.assert_array_equal(EmpiricalCDF(shared, copy=False).quantile(PROBABILITIES), expected)
+    assert np.all(np.diff(shared) >= 0)
+
+
+def test_cdf_and_exceedance_conventions():
+    ecdf = EmpiricalCDF([1.0, 2.0, 2.0, 3.0])
+    np.testing.assert_array_equal(ecdf.cdf([0.5, 1.0, 2.0, 3.0]), [0.0, 0.25, 0.75, 1.0])
+    # At or below LSL and strictly above USL count as out of spec
+    assert ecdf.exceedance(2.0, 2.0) == (0.75, 0.25)
+    assert (ecdf.min, ecdf.max) == (1.0, 3.0)
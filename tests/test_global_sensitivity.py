@@ -0,0 +1,57 @@
+# tests/test_global_sensitivity.py
+
+import numpy as np
+import pytest
+from src.utils.global_sensitivity import chain_sobol_analysis, sobol_indices
+from src.utils.simulation_engine import build_chain, dimension_stream, sample_matrix
+
+
+def linear_chain():
+    return build_chain(["normal", "uniform", "gamma", "normal"], [10.0, 0.0, 4.0, 2.0], [0.2, 1.2, 0.05, 0.05],
+                       ["+", "-", "+", "-"])
+
+
+def closed_form_indices(chain):
+    """S_i = ST_i = Var(X_i) / sum_j Var(X_j) for a sum of independent dimensions"""
+    variances = np.array([0.2**2, 1.2**2 / 12, 4.0 * 0.05**2, 0.05**2])
+    return variances / variances.sum()
+
+
+def test_additive_indices_match_closed_form():
+    chain = linear_chain()
+    _, result = chain_sobol_analysis(chain, 600_000, seed=3, bootstrap=100)
+    expected = closed_form_indices(chain)
+
+    np.testing.assert_allclose(result["first"], expected, atol=0.01)
+    np.testing.assert_allclose(result["total"], expected, atol=0.01)
+    assert result["first"].sum() == pytest.approx(1.0, abs=0.02)
+    # The bootstrap intervals cover the true values (with a little slack for the 95% level)
+    slack = 0.01
+    assert np.all(result["first_ci"][0] - slack <= expected) and np.all(expected <= result["first_ci"][1] + slack)
+    assert np.all(result["total_ci"][0] - slack <= expected) and np.all(expected <= result["total_ci"][1] + slack)
+
+
+def test_general_model_path_matches_additive_shortcut():
+    chain = linear_chain()
+    n = 20_000
+    A = sample_matrix(chain, n, rngs=[dimension_stream(1, k) for k in range(4)])
+    B = sample_matrix(chain, n, rngs=[dimension_stream(1, k, 99) for k in range(4)])
+    shortcut = sobol_indices(A, B, bootstrap=0)
+    general = sobol_indices(A, B, model=lambda matrix: matrix.sum(axis=0), bootstrap=0)
+    np.testing.assert_allclose(general["first"], shortcut["first"], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(general["total"], shortcut["total"], rtol=1e-9, atol=1e-12)
+
+
+def test_weighted_linear_model_matches_closed_form():
+    # Y = sum a_i X_i on unsigned samples: S_i = a_i^2 Var(X_i) / sum_j a_j^2 Var(X_j)
+    chain = build_chain(["normal", "uniform", "normal"], [0.0, 0.0, 5.0], [1.0, 1.0, 0.5], ["+", "+", "+"])
+    weights = np.array([1.0, 3.0, -2.0])
+    n = 200_000
+    A = sample_matrix(chain, n, signed=False, rngs=[dimension_stream(8, k) for k in range(3)])
+    B = sample_matrix(chain, n, signed=False, rngs=[dimension_stream(8, k, 99) for k in range(3)])
+    result = sobol_indices(A, B, model=lambda matrix: weights @ matrix, bootstrap=0)
+
+    contributions = weights**2 * np.array([1.0, 1 / 12, 0.25])
+    expected = contributions / contributions.sum()
+    np.testing.assert_allclose(result["first"], expected, atol=0.02)
+    np.testing.assert_allclose(result["total"], expected, atol=0.02)
@@ -0,0 +1,51 @@
+# tests/test_importance_sampling.py
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+from src.utils.importance_sampling import design_point, rare_event_tails
+from src.utils.simulation_engine import build_chain
+from src.utils.stack_expression import StackExpression
+
+# Gap of two normal parts: N(10, 0.1) - N(5, 0.1) ~ N(5, 0.1 * sqrt(2))
+MEAN = 5.0
+STD = 0.1 * np.sqrt(2)
+
+
+@pytest.fixture
+def chain():
+    return build_chain(["normal", "normal"], [10.0, 5.0], [0.1, 0.1], ["+", "-"], names=["A", "B"])
+
+
+@pytest.mark.parametrize("sigmas", [4.0, 6.0])
+def test_tails_match_the_analytic_normal_tail(chain, sigmas):
+    spec_limits = (MEAN - sigmas * STD, MEAN + sigmas * STD)
+    tails = rare_event_tails(chain, spec_limits, 200_000, seed=7)
+    expected = norm.sf(sigmas)
+    for key in ("cdf_at_lsl", "cdf_right_of_usl"):
+        tail = tails[key]
+        assert tail["probability"] == pytest.approx(expected, rel=0.02)
+        assert abs(tail["probability"] - expected) < 4 * tail["std_error"]
+        # Shifted sampling puts about half of the draws beyond the limit
+        assert 0.3 < tail["hits"] / tail["samples"] < 0.7
+        assert tail["shift_norm"] == pytest.approx(sigmas, rel=1e-3)
+
+
+def test_design_point_of_a_linear_stack(chain):
+    # Most probable point on X = limit lies along the gradient (+1, -1) at distance 4 sigma
+    shift = design_point(chain, MEAN + 4 * STD, 1)
+    np.testing.assert_allclose(shift, [4 / np.sqrt(2), -4 / np.sqrt(2)], rtol=1e-4)
+
+
+def test_stack_expression_gives_the_same_tails(chain):
+    spec_limits = (MEAN - 5 * STD, MEAN + 5 * STD)
+    expected = rare_event_tails(chain, spec_limits, 100_000, seed=3)
+    chain["expression"] = StackExpression("A - B", chain["names"])
+    tails = rare_event_tails(chain, spec_limits, 100_000, seed=3)
+    for key in expected:
+        assert tails[key]["probability"] == pytest.approx(expected[key]["probability"], rel=1e-6)
+
+
+def test_same_seed_reproduces(chain):
+    spec_limits = (MEAN - 5 * STD, MEAN + 5 * STD)
+    assert rare_event_tails(chain, spec_limits, 50_000, seed=11) == rare_event_tails(chain, spec_limits, 50_000, seed=11)
@@ -0,0 +1,81 @@
+# tests/test_incremental_engine.py
+
+import numpy as np
+import pytest
+from src.utils import incremental_engine
+from src.utils.incremental_engine import IncrementalChainSimulator, get_incremental_simulator, incremental_cache_bytes
+from src.utils.simulation_engine import build_chain, simulate_chain
+
+DISTS = ["normal", "uniform", "gamma", "lognormal"]
+PARA1S = [10.0, 1.0, 9.0, 0.5]
+PARA2S = [0.1, 1.3, 0.01, 0.05]
+DIRS = ["+", "-", "+", "-"]
+
+
+def _chain(para1s=PARA1S):
+    return build_chain(DISTS, para1s, PARA2S, DIRS)
+
+
+def test_full_run_matches_simulate_chain():
+    simulator = IncrementalChainSimulator()
+    total = simulator.simulate(_chain(), 50_000, seed=12)
+    np.testing.assert_allclose(total, simulate_chain(_chain(), 50_000, seed=12), rtol=1e-12)
+    assert simulator.last_redrawn == 4
+
+
+def test_changed_dimension_is_redrawn_alone():
+    simulator = IncrementalChainSimulator()
+    simulator.simulate(_chain(), 50_000, seed=12)
+    edited = _chain([10.0, 1.0, 9.5, 0.5])
+    total = simulator.simulate(edited, 50_000, seed=12)
+    assert simulator.last_redrawn == 1
+    np.testing.assert_allclose(total, simulate_chain(edited, 50_000, seed=12), rtol=1e-12, atol=1e-12)
+
+
+def test_returned_total_and_vectors():
+    simulator = IncrementalChainSimulator()
+    total, vectors = simulator.simulate(_chain(), 10_000, seed=3, return_vectors=True)
+    np.testing.assert_allclose(np.sum(vectors, axis=0), total, rtol=1e-12)
+    # The caller may sort the returned total without touching the kept one
+    total.sort()
+    np.testing.assert_allclose(simulator.simulate(_chain(), 10_000, seed=3), simulate_chain(_chain(), 10_000, seed=3),
+                               rtol=1e-12)
+
+
+def test_settings_change_forces_a_full_redraw():
+    simulator = IncrementalChainSimulator()
+    simulator.simulate(_chain(), 10_000, seed=3)
+    simulator.simulate(_chain(), 20_000, seed=3)
+    assert simulator.last_redrawn == 4
+    total = simulator.simulate(_chain(), 20_000, seed=4)
+    assert simulator.last_redrawn == 4
+    np.testing.assert_allclose(total, simulate_chain(_chain(), 20_000, seed=4), rtol=1e-12)
+
+
+def test_unseeded_rerun_draws_a_new_sample():
+    simulator = IncrementalChainSimulator()
+    first = simulator.simulate(_chain(), 10_000)
+    second = simulator.simulate(_chain(), 10_000)
+    assert not np.array_equal(first, second)
+
+
+def test_running_total_is_resummed(monkeypatch):
+    monkeypatch.setattr(incremental_engine, "RESUM_INTERVAL", 2)
+    simulator = IncrementalChainSimulator()
+    simulator.simulate(_chain(), 10_000, seed=1)
+    for nominal in (9.1, 9.2, 9.3):
+        total, vectors = simulator.simulate(_chain([10.0, 1.0, nominal, 0.5]), 10_000, seed=1, return_vectors=True)
+    assert simulator.updates_since_resum == 1
+    np.testing.assert_allclose(total, np.sum(vectors, axis=0), rtol=1e-12)
+
+
+def test_sessions_are_dropped_to_fit_the_budget(monkeypatch):
+    size = incremental_cache_bytes(4, 10_000)
+    monkeypatch.setattr(incremental_engine, "MAX_CACHE_BYTES", 2 * size)
+    monkeypatch.setattr(incremental_engine, "_simulators", incremental_engine.OrderedDict())
+    for session in ("a", "b"):
+        get_incremental_simulator(session, reserve_bytes=size).simulate(_chain(), 10_000, seed=1)
+    get_incremental_simulator("a", reserve_bytes=size)
+    # "b" is now the least recently used session and has to make room for "c"
+    get_incremental_simulator("c", reserve_bytes=size)
+    assert list(incremental_engine._simulators) == ["a", "c"]
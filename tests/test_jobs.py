@@ -0,0 +1,127 @@
+# tests/test_jobs.py
+
+import threading
+import time
+import pytest
+from src.stores.backends import SQLiteJobBackend
+from src.utils import jobs
+from src.utils.jobs import JobCancelled, JobManager, check_cancelled, report_progress
+
+
+def _wait(job, timeout=10.0):
+    deadline = time.time() + timeout
+    while not job.done and time.time() < deadline:
+        time.sleep(0.01)
+    assert job.done
+
+
+def _steps(count, delay=0.01):
+    for i in range(count):
+        time.sleep(delay)
+        report_progress((i + 1) / count, message=f"step {i + 1}", partial={"step": i + 1})
+    return count
+
+
+@pytest.fixture
+def manager():
+    return JobManager(workers=2)
+
+
+def test_result_and_progress(manager):
+    job = manager.submit("test", _steps, 5, owner="a")
+    _wait(job)
+    assert (job.state, job.result, job.progress) == ("done", 5, 1.0)
+    assert job.snapshot()["message"] == "step 5"
+
+
+def test_failure_is_reported(manager):
+    def fail():
+        raise ValueError("bad input")
+    job = manager.submit("test", fail)
+    _wait(job)
+    assert (job.state, job.error) == ("failed", "bad input")
+
+
+def test_jobs_are_private_to_their_owner(manager):
+    job = manager.submit("test", _steps, 1, owner="a")
+    assert manager.get(job.id, owner="a") is job
+    assert manager.get(job.id, owner="b") is None
+    assert manager.cancel(job.id, owner="b") is None
+    assert manager.get("unknown") is None and manager.get(None) is None
+
+
+def test_cancel_stops_a_running_job(manager):
+    job = manager.submit("test", _steps, 10_000)
+    time.sleep(0.05)
+    manager.cancel(job.id)
+    _wait(job)
+    assert job.state == "cancelled"
+    assert job.progress < 1.0
+
+
+def test_queued_job_never_starts():
+    manager = JobManager(workers=1)
+    release = threading.Event()
+    blocker = manager.submit("test", release.wait)
+    started = []
+    queued = manager.submit("test", started.append, True)
+    manager.cancel(queued.id)
+    release.set()
+    _wait(blocker)
+    assert queued.state == "cancelled" and not started
+
+
+def test_check_cancelled_guards_the_final_write(manager):
+    reached = threading.Event()
+    proceed = threading.Event()
+    written = []
+
+    def work():
+        reached.set()
+        proceed.wait()
+        check_cancelled()
+        written.append(True)
+
+    job = manager.submit("test", work)
+    reached.wait()
+    manager.cancel(job.id)
+    proceed.set()
+    _wait(job)
+    assert job.state == "cancelled" and not written
+
+
+def test_hooks_are_no_ops_outside_jobs():
+    report_progress(0.5, message="ignored")
+    check_cancelled()
+    assert issubclass(JobCancelled, BaseException) and not issubclass(JobCancelled, Exception)
+
+
+def test_shared_backend_serves_other_workers(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    # Two managers on one database stand in for two worker processes
+    local, remote = JobManager(backend=SQLiteJobBackend(path)), JobManager(backend=SQLiteJobBackend(path))
+
+    job = local.submit("test", _steps, 5, owner="a")
+    _wait(job)
+    seen = remote.get(job.id, owner="a")
+    assert seen is not job
+    assert (seen.state, seen.result, seen.partial) == ("done", 5, job.partial)
+    assert remote.get(job.id, owner="b") is None
+
+    job = local.submit("test", _steps, 10_000, owner="a")
+    time.sleep(0.1)
+    assert remote.get(job.id, owner="a").state == "running"
+    remote.cancel(job.id, owner="a")
+    _wait(job)
+    assert job.state == "cancelled"
+    assert remote.get(job.id).state == "cancelled"
+
+
+def test_shared_backend_forgets_old_jobs(tmp_path, monkeypatch):
+    path = str(tmp_path / "store.sqlite3")
+    local, remote = JobManager(backend=SQLiteJobBackend(path)), JobManager(backend=SQLiteJobBackend(path))
+    job = local.submit("test", _steps, 1)
+    _wait(job)
+    monkeypatch.setattr(jobs, "JOB_RETENTION", -1.0)
+    remote.purge()
+    assert remote.get(job.id) is None
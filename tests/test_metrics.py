@@ -0,0 +1,96 @@
+# tests/test_metrics.py
+
+import time
+import pytest
+from src.utils import metrics as metrics_module
+from src.utils.jobs import JobCancelled
+from src.utils.metrics import (Histogram, MetricsRegistry, format_stage_timings, instrumented, record_stages, stage,
+                               summarize_stages)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics_module, "metrics", registry)
+    return registry
+
+
+def _series(registry, name):
+    return next(s for s in registry.snapshot()["series"] if s["name"] == name)
+
+
+def test_histogram_is_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+    assert (histogram.count, histogram.sum) == (4, pytest.approx(3.65))
+
+
+def test_nested_stages_report_their_own_time(registry):
+    with record_stages() as log:
+        with stage("outer"):
+            time.sleep(0.02)
+            with stage("inner", samples=10):
+                time.sleep(0.05)
+    inner, outer = log
+    assert (inner["stage"], outer["stage"]) == ("inner", "outer")
+    assert inner["seconds"] >= 0.05
+    # The outer entry excludes the inner stage's time
+    assert 0.02 <= outer["seconds"] < 0.05
+    assert _series(registry, "outer")["seconds_total"] >= 0.07
+
+
+def test_same_name_stages_fold_into_one(registry):
+    with record_stages() as log:
+        with stage("sampling") as record:
+            with stage("sampling") as nested:
+                assert nested is record
+                nested["samples"] = 500
+    assert [entry["stage"] for entry in log] == ["sampling"]
+    assert _series(registry, "sampling")["calls"] == 1
+    assert _series(registry, "sampling")["samples"] == 500
+
+
+def test_instrumented_counts_samples_and_outcomes(registry):
+    @instrumented("work", samples="values")
+    def work(values, fail=None):
+        if fail is not None:
+            raise fail
+        return len(values)
+
+    assert work([1, 2, 3]) == 3
+    with pytest.raises(ValueError):
+        work([1], fail=ValueError())
+    with pytest.raises(JobCancelled):
+        work([1], fail=JobCancelled())
+    series = _series(registry, "work")
+    assert series["outcomes"] == {"ok": 1, "error": 1, "cancelled": 1}
+    assert series["samples"] == 5
+
+
+def test_stage_breakdown_text():
+    log = [{"stage": "kde", "seconds": 0.01, "samples": None, "peak_alloc": None},
+           {"stage": "sampling", "seconds": 0.2, "samples": 1000, "peak_alloc": 2**20},
+           {"stage": "sampling", "seconds": 0.1, "samples": 1000, "peak_alloc": 2**21}]
+    totals = summarize_stages(log)
+    assert [total["stage"] for total in totals] == ["sampling", "kde"]
+    assert (totals[0]["calls"], totals[0]["samples"], totals[0]["peak_alloc"]) == (2, 2000, 2**21)
+    text = format_stage_timings(log, elapsed=0.5)
+    assert "(2 calls)" in text and "2,000 samples" in text and "peak 2.0 MB" in text
+    assert text.splitlines()[-2].split()[:2] == ["other", "190.0"]
+
+
+def test_prometheus_text(registry):
+    registry.observe("callback", 'update "final"', 0.2)
+    registry.observe("stage", "sampling", 2.0, samples=100)
+    lines = registry.prometheus_text().splitlines()
+    assert '# TYPE bayestolsim_callback_duration_seconds histogram' in lines
+    assert 'bayestolsim_callback_duration_seconds_bucket{callback="update \\"final\\"",le="0.25"} 1' in lines
+    assert 'bayestolsim_callback_duration_seconds_bucket{callback="update \\"final\\"",le="+Inf"} 1' in lines
+    assert 'bayestolsim_stage_calls_total{stage="sampling",outcome="ok"} 1' in lines
+    assert 'bayestolsim_stage_samples_total{stage="sampling"} 100' in lines
+    # Every sample line is "name{labels} value" or "name value"
+    for line in lines:
+        if not line.startswith("#"):
+            float(line.rsplit(" ", 1)[1])
@@ -0,0 +1,72 @@
+# tests/test_parallel_engine.py
+
+import numpy as np
+import pytest
+from src.utils import parallel_engine
+from src.utils.parallel_engine import resolve_worker_count, run_shard, shard_sizes, summarize_chain_parallel
+from src.utils.simulation_engine import DEFAULT_CHUNK_SIZE, build_chain, dimension_stream, simulate_chain
+from src.utils.streaming_stats import DEFAULT_HIST_BINS, chain_histogram_range
+
+SPEC_LIMITS = (8.6, 9.4)
+
+
+@pytest.fixture
+def chain():
+    return build_chain(["normal", "uniform", "gamma"], [10.0, 1.0, 9.0], [0.1, 1.3, 0.01], ["+", "-", "+"])
+
+
+@pytest.fixture
+def four_cores(monkeypatch):
+    # Shard across several workers even on a single-core machine
+    monkeypatch.setattr(parallel_engine, "default_worker_count", lambda: 4)
+
+
+def test_worker_count_is_clamped_to_cores(four_cores):
+    assert resolve_worker_count(None) == 4
+    assert resolve_worker_count(500) == 4
+    assert resolve_worker_count(0) == 4
+    assert resolve_worker_count(-3) == 1
+    assert resolve_worker_count(2) == 2
+
+
+def test_shard_sizes_cover_all_samples():
+    assert shard_sizes(10, 3) == [4, 3, 3]
+    assert sum(shard_sizes(1_000_003, 7)) == 1_000_003
+
+
+def test_same_seed_and_workers_reproduce_bit_for_bit(chain, four_cores):
+    first = summarize_chain_parallel(chain, 90_000, workers=3, seed=21, spec_limits=SPEC_LIMITS)
+    second = summarize_chain_parallel(chain, 90_000, workers=3, seed=21, spec_limits=SPEC_LIMITS)
+    assert first.summary() == second.summary()
+    np.testing.assert_array_equal(first.hist_counts, second.hist_counts)
+
+
+def test_merge_matches_statistics_of_all_shard_samples(chain, four_cores):
+    seed, workers, num_samples = 4, 3, 60_001
+    merged = summarize_chain_parallel(chain, num_samples, workers=workers, seed=seed, spec_limits=SPEC_LIMITS)
+
+    # Shard i draws dimension k from child (i, k) of the seed
+    samples = np.concatenate([
+        simulate_chain(chain, size, rngs=[dimension_stream(seed, k, shard) for k in range(3)])
+        for shard, size in enumerate(shard_sizes(num_samples, workers))
+    ])
+    summary = merged.summary()
+    assert summary["count"] == num_samples
+    assert summary["mean"] == pytest.approx(samples.mean(), rel=1e-12)
+    assert summary["std"] == pytest.approx(samples.std(ddof=1), rel=1e-9)
+    assert summary["min"] == samples.min() and summary["max"] == samples.max()
+    assert summary["cdf_at_lsl"] == np.mean(samples <= SPEC_LIMITS[0])
+    assert summary["cdf_right_of_usl"] == np.mean(samples > SPEC_LIMITS[1])
+    counts, _ = np.histogram(samples, bins=merged.hist_edges)
+    np.testing.assert_array_equal(merged.hist_counts, counts)
+
+
+def test_merge_in_shard_order_equals_pool_result(chain, four_cores):
+    seed, workers, num_samples = 9, 2, 30_000
+    hist_range = chain_histogram_range(chain)
+    shards = [run_shard(chain, size, seed, shard, SPEC_LIMITS, hist_range, DEFAULT_HIST_BINS, False, DEFAULT_CHUNK_SIZE)
+              for shard, size in enumerate(shard_sizes(num_samples, workers))]
+    for shard in shards[1:]:
+        shards[0].merge(shard)
+    pooled = summarize_chain_parallel(chain, num_samples, workers=workers, seed=seed, spec_limits=SPEC_LIMITS)
+    assert shards[0].summary() == pooled.summary()
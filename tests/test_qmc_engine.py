@@ -0,0 +1,42 @@
+# tests/test_qmc_engine.py
+
+import numpy as np
+import pytest
+from src.utils.qmc_engine import replicate_size, run_qmc_replicates, simulate_chain_qmc
+from src.utils.simulation_engine import build_chain, simulate_chain
+
+SPEC_LIMITS = (8.6, 9.4)
+
+
+@pytest.fixture
+def chain():
+    return build_chain(["normal", "uniform", "gamma"], [10.0, 1.0, 9.0], [0.1, 1.3, 0.01], ["+", "-", "+"])
+
+
+def test_replicate_sizes():
+    # Nearest power of two to 12,500
+    assert replicate_size(100_000, 8, "sobol") == 16_384
+    assert replicate_size(100_000, 8, "halton") == 12_500
+    assert replicate_size(3, 8, "sobol") == 2
+
+
+@pytest.mark.parametrize("sequence", ["sobol", "halton"])
+def test_replicates_agree_with_monte_carlo(chain, sequence):
+    samples, std_errors = run_qmc_replicates(chain, 2**16, sequence=sequence, seed=4, spec_limits=SPEC_LIMITS)
+    reference = simulate_chain(chain, 4_000_000, seed=8)
+    assert abs(samples.mean() - reference.mean()) < 5 * std_errors["mean"] + 1e-4
+    assert samples.std(ddof=1) == pytest.approx(reference.std(ddof=1), rel=0.01)
+    assert set(std_errors) == {"mean", "std", "median", "p5", "p95", "cdf_at_lsl", "cdf_right_of_usl"}
+
+
+def test_sobol_mean_error_beats_monte_carlo(chain):
+    # The replicate spread of the mean is well below the plain Monte Carlo standard error
+    samples, std_errors = run_qmc_replicates(chain, 2**16, sequence="sobol", seed=1)
+    assert std_errors["mean"] < 0.2 * samples.std(ddof=1) / np.sqrt(samples.size)
+
+
+def test_same_seed_reproduces(chain):
+    first, _ = run_qmc_replicates(chain, 4_096, seed=9)
+    second, _ = run_qmc_replicates(chain, 4_096, seed=9)
+    np.testing.assert_array_equal(first, second)
+    assert simulate_chain_qmc(chain, 1_024, "halton", 2).shape == (1_024,)
@@ -0,0 +1,61 @@
+# tests/test_result_cache.py
+
+import os
+import time
+import numpy as np
+from src.utils.result_cache import ResultCache, chain_fingerprint
+from src.utils.simulation_engine import build_chain
+
+
+def _chain(para2=0.1):
+    return build_chain(["normal", "uniform"], [10.0, 1.0], [para2, 1.3], ["+", "-"])
+
+
+def test_fingerprint_is_stable_and_sensitive():
+    key = chain_fingerprint(_chain(), num_samples=10_000, seed=1)
+    assert key == chain_fingerprint(_chain(), seed=1, num_samples=10_000)
+    assert key != chain_fingerprint(_chain(0.2), num_samples=10_000, seed=1)
+    assert key != chain_fingerprint(_chain(), num_samples=10_000, seed=2)
+    assert key != chain_fingerprint(_chain(), num_samples=20_000, seed=1)
+
+
+def test_memory_tier_is_lru():
+    cache = ResultCache(memory_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # "b" was the least recently used entry
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    value = {"x_data": np.linspace(0, 1, 5), "summary": {"mean": np.float64(0.5)}}
+    ResultCache(cache_dir=str(tmp_path)).set("key", value)
+    cached = ResultCache(cache_dir=str(tmp_path)).get("key")
+    assert cached == {"x_data": [0.0, 0.25, 0.5, 0.75, 1.0], "summary": {"mean": 0.5}}
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path), memory_entries=1, disk_bytes=2_500)
+    payload = "x" * 1_000
+    cache.set("old", payload)
+    cache.set("used", payload)
+    past = time.time() - 100
+    os.utime(tmp_path / "old.json", (past, past))
+    os.utime(tmp_path / "used.json", (past + 1, past + 1))
+    # Reading refreshes the file's age
+    cache._memory.clear()
+    assert cache.get("used") == payload
+    cache.set("new", payload)
+    assert sorted(os.listdir(tmp_path)) == ["new.json", "used.json"]
+
+
+def test_clear_empties_both_tiers(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    cache.set("key", [1, 2])
+    cache.clear()
+    assert cache.get("key") is None
+    assert os.listdir(tmp_path) == []
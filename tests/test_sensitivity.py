@@ -0,0 +1,62 @@
+# tests/test_sensitivity.py
+
+import numpy as np
+import pytest
+from src.utils.sensitivity import correlation_ratio, dimension_contributions, variance_contributions
+
+STDS = [0.3, 0.2, 0.1]
+
+
+@pytest.fixture
+def stack():
+    rng = np.random.default_rng(0)
+    vectors = [rng.normal(10.0, 0.3, 400_000), -rng.normal(5.0, 0.2, 400_000), rng.normal(2.0, 0.1, 400_000)]
+    return vectors, vectors[0] + vectors[1] + vectors[2]
+
+
+def test_variance_shares_match_the_analytic_shares(stack):
+    vectors, total = stack
+    report = dimension_contributions(vectors, total, names=["A", "B", "C"])
+    expected = np.square(STDS) / np.sum(np.square(STDS))
+    shares = {row["name"]: row for row in report["rows"]}
+    for name, share in zip("ABC", expected):
+        assert shares[name]["variance_share"] == pytest.approx(share, abs=0.005)
+        assert shares[name]["eta2"] == pytest.approx(share, abs=0.01)
+    assert sum(row["variance_share"] for row in report["rows"]) == pytest.approx(1.0)
+    assert [row["name"] for row in report["rows"]] == ["A", "B", "C"]
+
+
+def test_analytic_report_has_the_same_layout():
+    report = variance_contributions(np.square(STDS), names=["A", "B", "C"])
+    assert [row["name"] for row in report["rows"]] == ["A", "B", "C"]
+    assert report["rows"][0]["variance_share"] == pytest.approx(0.09 / 0.14)
+    assert report["rows"][0]["eta2"] == report["rows"][0]["variance_share"]
+    assert (report["samples"], report["rejected"]) == (None, 0)
+
+
+def test_tail_shares_sum_to_one(stack):
+    vectors, total = stack
+    mean, std = total.mean(), total.std()
+    report = dimension_contributions(vectors, total, spec_limits=(mean - 2 * std, mean + 2 * std))
+    assert report["rejected"] == np.count_nonzero((total <= mean - 2 * std) | (total > mean + 2 * std))
+    assert sum(row["tail_share"] for row in report["rows"]) == pytest.approx(1.0)
+    # Without rejected samples there is nothing to share out
+    report = dimension_contributions(vectors, total, spec_limits=(mean - 100, mean + 100))
+    assert report["rejected"] == 0 and all(row["tail_share"] is None for row in report["rows"])
+
+
+def test_correlation_ratio_sees_non_monotonic_dependence():
+    x = np.random.default_rng(1).uniform(-1, 1, 200_000)
+    y = x ** 2
+    # Zero correlation, yet Y is a function of X
+    assert abs(np.corrcoef(x, y)[0, 1]) < 0.01
+    assert correlation_ratio(x, y) > 0.99
+    assert correlation_ratio(x, np.random.default_rng(2).normal(size=x.size)) < 0.01
+
+
+def test_subsample_bounds_the_rows_and_is_repeatable(stack):
+    vectors, total = stack
+    first = dimension_contributions(vectors, total, max_samples=50_000)
+    second = dimension_contributions(vectors, total, max_samples=50_000)
+    assert first["samples"] == 50_000
+    assert first == second
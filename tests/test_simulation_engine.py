@@ -0,0 +1,38 @@
+# tests/test_simulation_engine.py
+
+import numpy as np
+from src.utils.simulation_engine import build_chain, sample_matrix, simulate_chain
+
+
+def make_chain(para2_of_second=2.0):
+    return build_chain(["normal", "uniform", "gamma", "lognormal"], [10.0, 1.0, 9.0, 0.5],
+                       [0.1, para2_of_second, 0.01, 0.05], ["+", "-", "+", "-"])
+
+
+def test_seeded_run_is_reproducible():
+    chain = make_chain()
+    np.testing.assert_array_equal(simulate_chain(chain, 50_000, seed=7), simulate_chain(chain, 50_000, seed=7))
+    assert not np.array_equal(simulate_chain(chain, 50_000, seed=7), simulate_chain(chain, 50_000, seed=8))
+
+
+def test_sum_of_sample_matrix_equals_simulated_chain():
+    chain = make_chain()
+    matrix = sample_matrix(chain, 20_000, seed=11)
+    np.testing.assert_allclose(matrix.sum(axis=0), simulate_chain(chain, 20_000, seed=11), rtol=0, atol=1e-12)
+
+
+def test_one_stream_per_dimension():
+    # Changing one dimension leaves every other dimension's draws untouched
+    before = sample_matrix(make_chain(2.0), 10_000, seed=5)
+    after = sample_matrix(make_chain(3.0), 10_000, seed=5)
+    assert not np.array_equal(before[1], after[1])
+    for k in (0, 2, 3):
+        np.testing.assert_array_equal(before[k], after[k])
+
+
+def test_streams_of_dimensions_are_independent():
+    chain = build_chain(["normal"] * 3, [0.0] * 3, [1.0] * 3, ["+"] * 3)
+    matrix = sample_matrix(chain, 200_000, seed=2)
+    correlation = np.corrcoef(matrix)
+    # 5 standard errors of a sample correlation of independent rows
+    assert np.all(np.abs(correlation[np.triu_indices(3, 1)]) < 5 / np.sqrt(matrix.shape[1]))
@@ -0,0 +1,71 @@
+# tests/test_stack_expression.py
+
+import pickle
+import numpy as np
+import pytest
+from src.utils.simulation_engine import build_chain, simulate_chain
+from src.utils.stack_expression import StackExpression, variable_name
+
+NAMES = ["A", "B", "gap 1"]
+COLUMNS = np.array([[1.0, 3.0, -2.0], [2.0, 2.0, 0.5], [3.0, 1.0, 4.0]])
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("A - B + gap_1", lambda a, b, c: a - b + c),
+    ("hypot(A, B)", lambda a, b, c: np.hypot(a, b)),
+    ("max(A, B, gap_1)", lambda a, b, c: np.maximum(np.maximum(a, b), c)),
+    ("min(A, B)", lambda a, b, c: np.minimum(a, b)),
+    ("A if A > B else B", lambda a, b, c: np.where(a > b, a, b)),
+    ("where(A <= 1, -A, A ** 2)", lambda a, b, c: np.where(a <= 1, -a, a ** 2)),
+    ("degrees(radians(A)) * cos(pi) + e", lambda a, b, c: -a + np.e),
+    ("abs(A) / sqrt(B)", lambda a, b, c: np.abs(a) / np.sqrt(b)),
+])
+def test_expressions_match_numpy(expression, expected):
+    result = StackExpression(expression, NAMES).evaluate(COLUMNS)
+    np.testing.assert_allclose(result, expected(*COLUMNS), rtol=1e-12)
+    assert result.dtype == np.float64
+
+
+@pytest.mark.parametrize("expression", [
+    "A in B", "A not in B", "A is B", "A is not B", "not A", "~A",
+    "A < B < gap_1", "A and B", "A or B",
+    "A < B", "(A < B) * 2", "sqrt(A < B)", "where(A, A, B)", "A if B else gap_1", "where(A > 1, A < 2, B)",
+    "A // B", "A & B", "unknown + 1", "open(A)", "A.real", "A[0]", "'text'", "True", "lambda: A", "A +", "",
+    "where(A > B, A)", "hypot(A)", "max(A)", "sqrt(A, B)",
+])
+def test_invalid_expressions_raise_value_error_when_built(expression):
+    with pytest.raises(ValueError):
+        StackExpression(expression, NAMES)
+
+
+def test_name_clashes_are_rejected():
+    assert variable_name("gap 1") == "gap_1"
+    assert variable_name("2nd") == "_2nd"
+    with pytest.raises(ValueError):
+        StackExpression("a_b", ["a b", "a-b"])
+
+
+def test_only_used_columns_are_read_and_constants_broadcast():
+    expression = StackExpression("2 * B", NAMES)
+    assert expression.columns == [1]
+    np.testing.assert_array_equal(StackExpression("2 * pi", NAMES).evaluate(COLUMNS), np.full(3, 2 * np.pi))
+
+
+def test_evaluate_writes_into_out():
+    out = np.empty(3)
+    result = StackExpression("A * B", NAMES).evaluate(COLUMNS, out=out)
+    assert result is out
+    np.testing.assert_allclose(out, COLUMNS[0] * COLUMNS[1])
+
+
+def test_pickle_recompiles():
+    expression = pickle.loads(pickle.dumps(StackExpression("hypot(A, B) - gap_1", NAMES)))
+    np.testing.assert_allclose(expression.evaluate(COLUMNS), np.hypot(COLUMNS[0], COLUMNS[1]) - COLUMNS[2])
+
+
+def test_linear_expression_matches_the_signed_sum():
+    chain = build_chain(["normal", "uniform", "gamma"], [10.0, 1.0, 9.0], [0.1, 1.3, 0.01], ["+", "-", "+"], names=NAMES)
+    expected = simulate_chain(chain, 50_000, seed=5)
+    # With an expression, dimensions enter unsigned and directions live in the formula
+    chain["expression"] = StackExpression("A - B + gap_1", chain["names"])
+    np.testing.assert_allclose(simulate_chain(chain, 50_000, seed=5), expected, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,109 @@
+# tests/test_store_backends.py
+
+import multiprocessing
+import queue
+import threading
+import numpy as np
+import pytest
+from src.stores.backends import InProcessBackend, SQLiteBackend, create_backend
+from src.stores.dimension_state import DimensionState
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    return create_backend(request.param, str(tmp_path / "dimensions.sqlite3"))
+
+
+def test_set_get_update_remove(backend):
+    backend.set("s", "dim_0", DimensionState(name="A", dist="normal", para1=10.0, para2=0.1))
+    record = backend.update("s", "dim_0", {"mle_applied": True, "mle_data": [1.0, 2.0]})
+    assert record.mle_applied and record.mle_data.dtype == np.float64
+
+    stored = backend.get("s", "dim_0")
+    assert (stored.name, stored.para1, stored.mle_applied) == ("A", 10.0, True)
+    np.testing.assert_array_equal(stored.mle_data, [1.0, 2.0])
+
+    backend.remove("s", "dim_0")
+    assert backend.get("s", "dim_0") is None
+
+
+def test_update_creates_missing_records(backend):
+    record = backend.update("s", "dim_3", {"nominal": 5.0})
+    assert (record.name, record.nominal) == ("Dim 3", 5.0)
+
+
+def test_returned_records_are_copies(backend):
+    backend.set("s", "dim_0", DimensionState(name="A"))
+    backend.get("s", "dim_0").name = "changed"
+    assert backend.get("s", "dim_0").name == "A"
+
+
+def test_scopes_are_isolated_and_ordered(backend):
+    for i in (10, 2, 0):
+        backend.set("s1", f"dim_{i}", DimensionState(name=f"D{i}"))
+    backend.set("s2", "dim_0", DimensionState(name="other"))
+    assert list(backend.get_all("s1")) == ["dim_0", "dim_2", "dim_10"]
+
+    backend.clear("s1")
+    assert backend.get_all("s1") == {}
+    assert backend.get("s2", "dim_0").name == "other"
+
+
+def test_evict_idle_only_touches_matching_scopes(backend):
+    backend.set("session:a", "dim_0", DimensionState(name="A"))
+    backend.set("project:p", "dim_0", DimensionState(name="P"))
+    assert backend.evict_idle(3600, prefix="session:") == 0
+    # A negative idle time puts every scope past the cutoff
+    assert backend.evict_idle(-1, prefix="session:") == 1
+    assert backend.get_all("session:a") == {}
+    assert backend.get("project:p", "dim_0").name == "P"
+
+
+def _write_field(backend, field, count, results):
+    # Each writer owns one field; an update lost to a stale read would make the other field go backwards
+    other = "upper_tol" if field == "nominal" else "nominal"
+    seen = backwards = 0
+    for i in range(1, count + 1):
+        value = getattr(backend.update("s", "dim_0", {field: i}), other) or 0
+        backwards += value < seen
+        seen = max(seen, value)
+    results.put(backwards)
+
+
+def _write_field_in_process(path, field, count, results):
+    _write_field(SQLiteBackend(path), field, count, results)
+
+
+def test_concurrent_thread_updates_are_not_lost(backend):
+    results = queue.Queue()
+    threads = [threading.Thread(target=_write_field, args=(backend, field, 200, results)) for field in ("nominal", "upper_tol")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [results.get(), results.get()] == [0, 0]
+    record = backend.get("s", "dim_0")
+    assert (record.nominal, record.upper_tol) == (200, 200)
+
+
+def test_concurrent_process_updates_are_not_lost(tmp_path):
+    path = str(tmp_path / "dimensions.sqlite3")
+    SQLiteBackend(path)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [context.Process(target=_write_field_in_process, args=(path, field, 200, results))
+               for field in ("nominal", "upper_tol")]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get(timeout=60), results.get(timeout=60)]
+    for worker in workers:
+        worker.join()
+    assert outcomes == [0, 0]
+    record = SQLiteBackend(path).get("s", "dim_0")
+    assert (record.nominal, record.upper_tol) == (200, 200)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("redis")
+    assert isinstance(create_backend(), InProcessBackend)
@@ -0,0 +1,66 @@
+# tests/test_streaming_stats.py
+
+import numpy as np
+import pytest
+from src.utils.simulation_engine import build_chain, iter_chain_chunks, simulate_chain
+from src.utils.streaming_stats import QuantileSketch, RunningMoments, StreamingSummary, summarize_chain_stream
+
+
+def make_chain():
+    return build_chain(["normal", "uniform", "gamma", "lognormal"], [10.0, 1.0, 9.0, 0.5], [0.1, 2.0, 0.01, 0.05],
+                       ["+", "-", "+", "-"])
+
+
+def test_chunks_concatenate_to_the_in_memory_result():
+    chain = make_chain()
+    reference = simulate_chain(chain, 25_000, seed=3)
+    np.testing.assert_array_equal(simulate_chain(chain, 25_000, seed=3, chunk_size=999), reference)
+    chunks = np.concatenate([chunk.copy() for chunk in iter_chain_chunks(chain, 25_000, seed=3, chunk_size=4_096)])
+    np.testing.assert_array_equal(chunks, reference)
+
+
+def test_streamed_summary_matches_in_memory_statistics():
+    chain = make_chain()
+    spec_limits = (7.5, 8.5)
+    stream = summarize_chain_stream(chain, 300_000, seed=5, spec_limits=spec_limits, chunk_size=40_000)
+    samples = simulate_chain(chain, 300_000, seed=5)
+    summary = stream.summary()
+    assert summary["count"] == samples.size
+    assert summary["mean"] == pytest.approx(samples.mean(), rel=1e-12)
+    assert summary["std"] == pytest.approx(samples.std(ddof=1), rel=1e-9)
+    assert summary["cdf_at_lsl"] == np.mean(samples <= spec_limits[0])
+    assert summary["cdf_right_of_usl"] == np.mean(samples > spec_limits[1])
+    assert stream.hist_counts.sum() + stream.underflow + stream.overflow == samples.size
+
+
+def test_running_moments_match_numpy_across_chunks_and_merges():
+    samples = np.random.default_rng(0).normal(3.0, 0.2, 100_000)
+    first, second = RunningMoments(), RunningMoments()
+    for chunk in np.array_split(samples[:60_000], 7):
+        first.update(chunk)
+    second.update(samples[60_000:])
+    first.merge(second)
+    assert first.count == samples.size
+    assert first.mean == pytest.approx(samples.mean(), rel=1e-12)
+    assert first.std == pytest.approx(samples.std(ddof=1), rel=1e-9)
+
+
+def test_quantile_sketch_is_close_to_exact_quantiles():
+    samples = np.random.default_rng(1).lognormal(0.0, 0.5, 2_000_000)
+    sketch = QuantileSketch(seed=0)
+    for chunk in np.array_split(samples, 20):
+        sketch.update(chunk)
+    q = [0.05, 0.5, 0.95]
+    exact = np.quantile(samples, q)
+    # Rank error well under 1% of the distribution
+    ranks = np.searchsorted(np.sort(samples), sketch.quantile(q)) / samples.size
+    np.testing.assert_allclose(ranks, q, atol=0.005)
+    np.testing.assert_allclose(sketch.quantile(q), exact, rtol=0.02)
+
+
+def test_empty_sketch_returns_nan():
+    sketch = QuantileSketch()
+    assert np.isnan(sketch.quantile(0.5))
+    assert np.all(np.isnan(sketch.quantile([0.05, 0.95])))
+    summary = StreamingSummary(spec_limits=(0.0, 1.0)).summary()
+    assert summary["count"] == 0 and np.isnan(summary["median"])
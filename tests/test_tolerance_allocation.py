@@ -0,0 +1,65 @@
+# tests/test_tolerance_allocation.py
+
+import numpy as np
+import pytest
+from scipy.stats import norm
+from src.utils.tolerance_allocation import AllocationError, allocate_tolerances
+from src.utils.tolerance_params import tolerance_to_params
+
+# Final nominal 10 + 3 - 5 = 8
+SPEC_LIMITS = (7.7, 8.3)
+
+
+def _normal(nominal, tol, direction="+"):
+    return {"dist": "normal", "nominal": nominal, "upper_tol": tol, "lower_tol": -tol, "dir": direction}
+
+
+@pytest.fixture
+def variable():
+    return [_normal(10.0, 0.1), _normal(3.0, 0.2), _normal(5.0, 0.05, "-")]
+
+
+def test_cpk_allocation_matches_the_closed_form(variable):
+    result = allocate_tolerances(variable, [], SPEC_LIMITS, tolerance_to_params, 1.33)
+    # Equal weights and equal std per unit width: equal bands with 3 * (t / 6)^2 = (0.3 / (3 * 1.33))^2
+    width = 6 * 0.3 / (3 * 1.33) / np.sqrt(3)
+    widths = np.subtract(result["upper_tols"], result["lower_tols"])
+    np.testing.assert_allclose(widths, width, rtol=1e-3)
+    assert result["value"] == pytest.approx(1.33, rel=1e-3)
+    assert result["cost"] < result["initial_cost"]
+
+
+def test_weights_shift_the_bands(variable):
+    weights = [1.0, 8.0, 1.0]
+    result = allocate_tolerances(variable, [], SPEC_LIMITS, tolerance_to_params, 1.33, weights=weights)
+    widths = np.subtract(result["upper_tols"], result["lower_tols"])
+    # Cost w / t with Var ~ t^2: the optimum has t_i proportional to w_i^(1/3)
+    np.testing.assert_allclose(widths / widths[0], np.cbrt(weights), rtol=1e-2)
+    assert result["value"] >= 1.33 * (1 - 1e-6)
+
+
+def test_ppm_allocation_meets_the_target(variable):
+    result = allocate_tolerances(variable, [], SPEC_LIMITS, tolerance_to_params, 100.0, metric="ppm")
+    assert result["value"] <= 100.0 * (1 + 1e-6)
+    assert result["value"] > 90.0
+    # Normal stack: ppm = 2 * sf(0.3 / std) * 1e6
+    stds = [float(para2) for _, para2 in result["params"]]
+    assert 2 * norm.sf(0.3 / np.sqrt(np.sum(np.square(stds)))) * 1e6 == pytest.approx(result["value"], rel=0.02)
+
+
+def test_fixed_dimensions_stay_and_count(variable):
+    fixed = [{"dist": "normal", "para1": 0.0, "para2": 0.05, "dir": "+"}]
+    free = allocate_tolerances(variable, [], SPEC_LIMITS, tolerance_to_params, 1.33)
+    constrained = allocate_tolerances(variable, fixed, SPEC_LIMITS, tolerance_to_params, 1.33)
+    assert constrained["cost"] > free["cost"]
+    assert constrained["value"] == pytest.approx(1.33, rel=1e-3)
+
+
+def test_unreachable_targets_raise(variable):
+    fixed = [{"dist": "normal", "para1": 0.0, "para2": 0.5, "dir": "+"}]
+    with pytest.raises(AllocationError):
+        allocate_tolerances(variable, fixed, SPEC_LIMITS, tolerance_to_params, 1.33)
+    with pytest.raises(AllocationError):
+        allocate_tolerances([], [], SPEC_LIMITS, tolerance_to_params, 1.33)
+    with pytest.raises(AllocationError):
+        allocate_tolerances(variable, [], SPEC_LIMITS, tolerance_to_params, 1.33, metric="sigma")